@@ -1,6 +1,6 @@
 import sys
 import traceback
-from PySide2.QtCore import (Signal, QTimer, Qt, QLocale)
+from PySide2.QtCore import (Signal, Qt, QLocale)
 from PySide2.QtWidgets import (
 	QLineEdit, QPushButton, QApplication,
 	QVBoxLayout, QHBoxLayout,
@@ -8,8 +8,9 @@ from PySide2.QtWidgets import (
 	QWidget, QTableWidgetItem, QComboBox, QTreeWidget, QTreeWidgetItem, QAbstractItemView,
 	QLabel, QSpinBox, QRadioButton, QSplitter)
 from PySide2 import QtGui
-import os
 from STKODoubleItemDelegate import *
+from STKOMonitorData import *
+from STKOFileWatcher import *
 from numpy import arange, sin, pi
 import numpy as np
 
@@ -36,70 +37,6 @@ class TableWidget(QTableWidget):
 			exdata = traceback.format_exc().splitlines()
 
 
-class STKOPlotDataItem:
-	def __init__(self, fname):
-		self.file_name = fname
-		self.display_name = os.path.splitext(os.path.basename(fname))[0]
-		self.x = []
-		self.y = []
-		self.xmax = 0.0
-		self.xmin = 0.0
-		self.ymax = 0.0
-		self.ymin = 0.0
-		self.xLabel = ''
-		self.yLabel = ''
-
-	def load(self):
-		'''
-		loads the contents of file self.file_name.
-		it does it incrementally loading only new data.
-		returns the number of lines added
-		'''
-		if not os.path.exists(self.file_name):
-			return 0
-		n0 = len(self.x)
-		with open(self.file_name, 'r') as f:
-			counter = -1  # start at -1 to account for the first header line
-			while True:
-				line = f.readline()
-				if not line:
-					break
-				counter += 1
-				if counter <= n0 and counter != 0:
-					continue  # skip lines already read
-				# get line data
-				data = [y for y in [x.strip() for x in line.split('\t')] if y]
-				n = len(data)
-				if counter == 0:
-					# read first header line for axis labels
-					if n > 0: self.xLabel = data[0]
-					if n > 1: self.yLabel = data[1]
-				else:
-					# read plot values
-					x = float(data[0]) if n > 0 else 0.0
-					y = float(data[1]) if n > 1 else 0.0
-					self.x.append(x)
-					self.y.append(y)
-					# accumulate min/max
-					if len(self.x) == 1:
-						self.xmin = x
-						self.xmax = x
-						self.ymin = y
-						self.ymax = y
-					else:
-						self.xmin = min(self.xmin, x)
-						self.xmax = max(self.xmax, x)
-						self.ymin = min(self.ymin, y)
-						self.ymax = max(self.ymax, y)
-		# return true if some lines were added
-		return len(self.x) - n0
-
-
-class STKOPlotData:
-	def __init__(self, plot, bg_plot):
-		self.plot = plot
-		self.bg_plot = bg_plot
-
 class STKODataWidget(QWidget):
 
 	def __init__(self, parent=None):
@@ -128,9 +65,8 @@ class STKODataWidget(QWidget):
 		self.unique_container.table.setColumnCount(2)
 		self.reloadPlotData()
 
-		# timer
-		self.timer = QTimer(self)
-		self.timer.setInterval(1000)  # each second
+		# file watcher
+		self.watcher = getFileWatcher()
 
 		# add to layout
 		unique_layout.addWidget(self.comboBox)
@@ -146,20 +82,26 @@ class STKODataWidget(QWidget):
 		main_layout.addWidget(self.splitter)
 
 		# setup connections
-		self.timer.timeout.connect(self.findPlotData)
-		self.timer.timeout.connect(self.reloadPlotData)
+		self.watcher.fileListChanged.connect(self.onFileListChanged)
+		self.watcher.filesChanged.connect(self.onFilesChanged)
 		self.comboBox.currentIndexChanged.connect(self.onComboBoxIndexChanged)
 
-		# start timer
-		self.timer.start()
+		# first load
+		self.onFileListChanged()
+
+	def onFileListChanged(self):
+		self.findPlotData()
+		self.reloadPlotData()
+
+	def onFilesChanged(self, files):
+		for file in files:
+			if file in self.data:
+				self.reloadPlotData()
+				break
 
 	def findPlotData(self):
-		# check each file in the current directory
-		all_files = []
-		for root, subdirs, files in os.walk(os.getcwd()):
-			for file in files:
-				if file.endswith(".plt"):
-					all_files.append(os.path.join(root, file))
+		# check each file published by the file watcher
+		all_files = [file for file in self.watcher.files() if file.endswith(".plt")]
 		#
 		# remove data not available anymore
 		to_rem = []
@@ -209,10 +151,11 @@ class STKODataWidget(QWidget):
 			nadd = 0
 			if current_data.plot:
 				nadd += current_data.plot.load()
+				force_update = force_update or current_data.plot.restarted
 			do_update = (nadd > 0)
 		# done
 		if do_update or force_update:
-			self.updateTable(self.data)
+			self.updateTable(self.data, reset=force_update)
 
 	def onComboBoxIndexChanged(self):
 		self.prepareTable()
@@ -238,10 +181,12 @@ class STKODataWidget(QWidget):
 				# map it
 				self.keymap[key] = (plot, bg_plot)
 
-	def updateTable(self, all_data):
-		# auxiliary function
-		self.unique_container.table.setRowCount(0)
+	def updateTable(self, all_data, reset=False):
+		# only new rows are added, unless a reset is required
+		if reset:
+			self.unique_container.table.setRowCount(0)
 
+		# auxiliary function
 		def aux(plot, bg_plot, data, set_labels):
 			items = (
 				(plot, data.plot, data.plot.display_name),
@@ -259,14 +204,15 @@ class STKODataWidget(QWidget):
 							iy.setData(Qt.DisplayRole, value)
 							return iy
 
-						for rowPosition in range(len(plot_data.x)):
-							# insert a new row
-							self.unique_container.table.insertRow(rowPosition)
-							# first column is the stage id
+						x = plot_data.x
+						y = plot_data.y
+						n0 = self.unique_container.table.rowCount()
+						self.unique_container.table.setRowCount(len(x))
+						for rowPosition in range(n0, len(x)):
 							self.unique_container.table.setItem(rowPosition, 0,
-															  make_item(plot_data.x[rowPosition]))
+															  make_item(float(x[rowPosition])))
 							self.unique_container.table.setItem(rowPosition, 1,
-															  make_item(plot_data.y[rowPosition]))
+															  make_item(float(y[rowPosition])))
 
 		# process all
 		counter = 0
@@ -0,0 +1,127 @@
+import os
+from PySide2.QtCore import (QObject, QFileSystemWatcher, QTimer, Signal, QCoreApplication)
+
+class STKOFileWatcher(QObject):
+	'''
+	a single watcher service for the monitor files (.plt, .pltbg, .stats, .tim)
+	in the top directory of the analysis.
+	it uses a QFileSystemWatcher (inotify on linux) on the directory and on the monitor files.
+	since some file systems do not notify changes (i.e. network file systems on clusters),
+	it also checks the size of the monitor files every second, and scans the top
+	directory (never sub-directories) every 10 seconds.
+	notifications are collected and published to all widgets at most every 200 ms:
+	fileListChanged when monitor files are added or removed,
+	filesChanged(list) with the files whose contents changed.
+	'''
+	fileListChanged = Signal()
+	filesChanged = Signal(list)
+
+	EXTENSIONS = ('.plt', '.pltbg', '.stats', '.tim')
+
+	def __init__(self, directory, parent=None):
+		super(STKOFileWatcher, self).__init__(parent)
+		self.directory = directory
+		# file name -> (size, modification time)
+		self.stats = {}
+		# changes to be published
+		self.pending_files = set()
+		self.pending_list = False
+
+		# watcher
+		self.watcher = QFileSystemWatcher(self)
+		self.watcher.addPath(directory)
+		self.watcher.directoryChanged.connect(self.scan)
+		self.watcher.fileChanged.connect(self.onFileChanged)
+
+		# timers
+		self.publish_timer = QTimer(self)
+		self.publish_timer.setSingleShot(True)
+		self.publish_timer.setInterval(200)
+		self.publish_timer.timeout.connect(self.publish)
+		self.check_timer = QTimer(self)
+		self.check_timer.setInterval(1000) # each second
+		self.check_timer.timeout.connect(self.check)
+		self.scan_timer = QTimer(self)
+		self.scan_timer.setInterval(10000) # each 10 seconds
+		self.scan_timer.timeout.connect(self.scan)
+
+		# first scan and start timers
+		self.scan()
+		self.check_timer.start()
+		self.scan_timer.start()
+
+	def files(self):
+		return sorted(self.stats.keys())
+
+	def scan(self):
+		# monitor files in the top directory
+		found = {}
+		try:
+			with os.scandir(self.directory) as it:
+				for entry in it:
+					if entry.name.endswith(STKOFileWatcher.EXTENSIONS) and entry.is_file():
+						st = entry.stat()
+						found[entry.path] = (st.st_size, st.st_mtime_ns)
+		except OSError:
+			pass
+		# files removed and re-created are not watched anymore
+		watched = set(self.watcher.files())
+		to_watch = [f for f in found if f not in watched]
+		if to_watch:
+			self.watcher.addPaths(to_watch)
+		# compare with the previous scan
+		added = [f for f in found if f not in self.stats]
+		removed = [f for f in self.stats if f not in found]
+		changed = [f for f, s in found.items() if f in self.stats and self.stats[f] != s]
+		self.stats = found
+		self.notify(added + changed, len(added) > 0 or len(removed) > 0)
+
+	def check(self):
+		# size and modification time of known files only
+		changed = []
+		for f in self.stats:
+			try:
+				st = os.stat(f)
+			except OSError:
+				# removed
+				self.scan()
+				return
+			s = (st.st_size, st.st_mtime_ns)
+			if self.stats[f] != s:
+				self.stats[f] = s
+				changed.append(f)
+		self.notify(changed, False)
+
+	def onFileChanged(self, path):
+		if not os.path.exists(path):
+			self.scan()
+			return
+		st = os.stat(path)
+		self.stats[path] = (st.st_size, st.st_mtime_ns)
+		self.notify([path], False)
+
+	def notify(self, files, list_changed):
+		self.pending_files.update(files)
+		self.pending_list = self.pending_list or list_changed
+		if (self.pending_files or self.pending_list) and not self.publish_timer.isActive():
+			self.publish_timer.start()
+
+	def publish(self):
+		if self.pending_list:
+			self.pending_list = False
+			self.fileListChanged.emit()
+		if self.pending_files:
+			files = sorted(self.pending_files)
+			self.pending_files.clear()
+			self.filesChanged.emit(files)
+
+_file_watcher = None
+
+def getFileWatcher():
+	'''
+	returns the file watcher shared by all widgets of the monitor app
+	'''
+	global _file_watcher
+	if _file_watcher is None:
+		_file_watcher = STKOFileWatcher(os.getcwd(), QCoreApplication.instance())
+	return _file_watcher
@@ -9,4 +9,4 @@ if "%STKO_INSTALL_DIR%" == "" (
 	set PYEXE="%STKO_INSTALL_DIR%\python.exe"
 )
 
-%PYEXE% "%~dp0\STKOMonitorMain.py"
+%PYEXE% "%~dp0\STKOMonitorMain.py" %*
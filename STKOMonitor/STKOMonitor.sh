@@ -1,3 +1,3 @@
 #!/bin/sh
 BASEDIR=$(dirname $0)
-python3 ${BASEDIR}/STKOMonitorMain.py
+python3 ${BASEDIR}/STKOMonitorMain.py "$@"
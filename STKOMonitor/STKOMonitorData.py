@@ -0,0 +1,240 @@
+import os
+import numpy as np
+
+class STKOTailReader:
+	'''
+	reads a text file incrementally.
+	it remembers the byte offset after the last complete line read, so that
+	each call to read() returns only the complete lines appended since the previous call.
+	a partial last line (not yet flushed by the monitor) is left for the next call.
+	if the file is truncated or replaced (i.e. the analysis was restarted)
+	it starts reading again from the beginning.
+	'''
+	def __init__(self, fname):
+		self.file_name = fname
+		self.offset = 0
+		self.file_id = None
+
+	def reset(self):
+		self.offset = 0
+		self.file_id = None
+
+	def read(self):
+		'''
+		returns a tuple (restarted, start, data), where data is a bytes object
+		with the new complete lines, start is the byte offset of data in the file,
+		and restarted is True if the file was truncated or replaced
+		'''
+		try:
+			st = os.stat(self.file_name)
+		except OSError:
+			return (False, self.offset, b'')
+		restarted = False
+		file_id = (st.st_dev, st.st_ino)
+		if (self.file_id is not None and file_id != self.file_id) or st.st_size < self.offset:
+			restarted = True
+			self.offset = 0
+		self.file_id = file_id
+		start = self.offset
+		if st.st_size == start:
+			return (restarted, start, b'')
+		with open(self.file_name, 'rb') as f:
+			f.seek(start)
+			data = f.read(st.st_size - start)
+		# keep only complete lines
+		last = data.rfind(b'\n')
+		if last < 0:
+			return (restarted, start, b'')
+		data = data[:last+1]
+		self.offset += len(data)
+		return (restarted, start, data)
+
+class STKOGrowableArray:
+	'''
+	a 2D numpy array with a fixed number of columns, that grows by appending rows.
+	the capacity is doubled when needed, so that appending is amortized O(1)
+	'''
+	def __init__(self, ncols, capacity=1024):
+		self.buffer = np.zeros((capacity, ncols))
+		self.size = 0
+
+	def __len__(self):
+		return self.size
+
+	@property
+	def data(self):
+		return self.buffer[:self.size]
+
+	def clear(self):
+		self.size = 0
+
+	def append(self, rows):
+		n = rows.shape[0]
+		if self.size + n > self.buffer.shape[0]:
+			buffer = np.zeros((max(self.size + n, 2*self.buffer.shape[0]), self.buffer.shape[1]))
+			buffer[:self.size] = self.buffer[:self.size]
+			self.buffer = buffer
+		self.buffer[self.size:self.size+n] = rows
+		self.size += n
+
+def parseRows(data, ncols):
+	'''
+	parses the text lines in data (bytes) as a (n, ncols) array of floats.
+	missing values are set to 0.0, values that cannot be parsed to nan.
+	'''
+	text = data.decode('utf-8', errors='replace')
+	nlines = text.count('\n')
+	words = text.split()
+	# fast path: all lines are complete and valid
+	if len(words) == nlines*ncols:
+		try:
+			return np.array(words, dtype=float).reshape(nlines, ncols)
+		except ValueError:
+			pass
+	# slow path: line by line
+	rows = np.zeros((nlines, ncols))
+	for i, line in enumerate(text.split('\n')[:nlines]):
+		for j, word in enumerate(line.split()[:ncols]):
+			try:
+				rows[i, j] = float(word)
+			except ValueError:
+				rows[i, j] = np.nan
+	return rows
+
+class STKOPlotDataItem:
+	def __init__(self, fname):
+		self.file_name = fname
+		self.display_name = os.path.splitext(os.path.basename(fname))[0]
+		self.reader = STKOTailReader(fname)
+		self.values = STKOGrowableArray(2)
+		self.xmax = 0.0
+		self.xmin = 0.0
+		self.ymax = 0.0
+		self.ymin = 0.0
+		self.xLabel = ''
+		self.yLabel = ''
+		self.restarted = False # True if the last load restarted the file
+
+	@property
+	def x(self):
+		return self.values.data[:, 0]
+
+	@property
+	def y(self):
+		return self.values.data[:, 1]
+
+	def load(self):
+		'''
+		loads the contents of file self.file_name.
+		it does it incrementally, reading only the lines appended since the last call.
+		returns the number of lines added (plus the number of lines removed,
+		if the file was restarted)
+		'''
+		restarted, start, data = self.reader.read()
+		self.restarted = restarted
+		nrem = 0
+		if restarted:
+			nrem = len(self.values)
+			self.values.clear()
+			self.xLabel = ''
+			self.yLabel = ''
+		if not data:
+			return nrem
+		if start == 0:
+			# read first header line for axis labels
+			pos = data.find(b'\n')
+			header = [y for y in [x.strip() for x in data[:pos].decode('utf-8', errors='replace').split('\t')] if y ]
+			if len(header) > 0: self.xLabel = header[0]
+			if len(header) > 1: self.yLabel = header[1]
+			data = data[pos+1:]
+		if not data:
+			return nrem
+		# read plot values
+		rows = parseRows(data, 2)
+		first = (len(self.values) == 0)
+		self.values.append(rows)
+		# accumulate min/max (ignoring nan values)
+		xmin, ymin = np.fmin.reduce(rows)
+		xmax, ymax = np.fmax.reduce(rows)
+		if first:
+			self.xmin = xmin
+			self.xmax = xmax
+			self.ymin = ymin
+			self.ymax = ymax
+		else:
+			self.xmin = np.fmin(self.xmin, xmin)
+			self.xmax = np.fmax(self.xmax, xmax)
+			self.ymin = np.fmin(self.ymin, ymin)
+			self.ymax = np.fmax(self.ymax, ymax)
+		return nrem + rows.shape[0]
+
+class STKOPlotData:
+	def __init__(self, plot, bg_plot):
+		self.plot = plot
+		self.bg_plot = bg_plot
+
+class STKOEnvelopeDecimator:
+	'''
+	incremental min/max envelope decimation of a (x, y) series for plotting.
+	samples are grouped in buckets of consecutive samples, and for each bucket
+	only the samples with min/max x and min/max y are kept (in their original order),
+	so that peaks and hysteresis loops are preserved.
+	when the number of buckets exceeds 2*target, adjacent buckets are merged
+	(doubling the bucket size), so that each update processes only the new samples.
+	target should be the width of the canvas in pixels.
+	'''
+	def __init__(self, target=1000):
+		self.target = max(int(target), 1)
+		self.reset()
+
+	def reset(self):
+		self.bucket = 1
+		self.done = 0 # number of samples in full buckets
+		self.ids = np.zeros((0, 4), dtype=np.int64)
+
+	def update(self, x, y, restarted=False):
+		'''
+		returns the decimated (x, y) series.
+		x and y are the whole series, and they are assumed to grow by appending samples.
+		restarted should be True if the series has been replaced since the last call
+		(see STKOPlotDataItem.restarted), even if it is not shorter than before.
+		'''
+		n = len(x)
+		if restarted or n < self.done:
+			self.reset()
+		nfull = (n - self.done) // self.bucket
+		if nfull > 0:
+			end = self.done + nfull*self.bucket
+			self.ids = np.concatenate((self.ids, self._reduce(x, y, self.done, end)))
+			self.done = end
+		while self.ids.shape[0] > 2*self.target:
+			self._merge(x, y)
+		ids = np.unique(np.concatenate((self.ids.ravel(), np.arange(self.done, n))))
+		return (x[ids], y[ids])
+
+	def _reduce(self, x, y, begin, end):
+		nb = (end - begin) // self.bucket
+		offset = begin + np.arange(nb)*self.bucket
+		bx = x[begin:end].reshape(nb, self.bucket)
+		by = y[begin:end].reshape(nb, self.bucket)
+		return np.column_stack((
+			offset + np.argmin(bx, axis=1),
+			offset + np.argmax(bx, axis=1),
+			offset + np.argmin(by, axis=1),
+			offset + np.argmax(by, axis=1)))
+
+	def _merge(self, x, y):
+		if self.ids.shape[0] % 2 == 1:
+			# the last bucket will be processed again with the new bucket size
+			self.ids = self.ids[:-1]
+			self.done -= self.bucket
+		a = self.ids[0::2]
+		b = self.ids[1::2]
+		ids = np.empty_like(a)
+		for j, (values, pick_min) in enumerate(((x, True), (x, False), (y, True), (y, False))):
+			va = values[a[:, j]]
+			vb = values[b[:, j]]
+			take_a = (va <= vb) if pick_min else (va >= vb)
+			ids[:, j] = np.where(take_a, a[:, j], b[:, j])
+		self.ids = ids
+		self.bucket *= 2
@@ -0,0 +1,283 @@
+import os
+import time
+import json
+import socket
+import select
+from collections import deque
+from STKOMonitorData import *
+
+class STKOMonitorFile:
+	'''
+	tails a monitor plot file (.plt) keeping only the last values
+	'''
+	def __init__(self, fname):
+		self.file_name = fname
+		self.display_name = os.path.splitext(os.path.basename(fname))[0]
+		self.reader = STKOTailReader(fname)
+		self.xLabel = ''
+		self.yLabel = ''
+		self.last = None
+		self.count = 0
+
+	def load(self):
+		'''
+		reads the lines appended since the last call.
+		returns True if the last values changed
+		'''
+		restarted, start, data = self.reader.read()
+		if restarted:
+			self.xLabel = ''
+			self.yLabel = ''
+			self.last = None
+			self.count = 0
+		if not data:
+			return restarted
+		if start == 0:
+			# read first header line for axis labels
+			pos = data.find(b'\n')
+			header = [y for y in [x.strip() for x in data[:pos].decode('utf-8', errors='replace').split('\t')] if y ]
+			if len(header) > 0: self.xLabel = header[0]
+			if len(header) > 1: self.yLabel = header[1]
+			data = data[pos+1:]
+		if not data:
+			return restarted
+		# only the last line is needed
+		self.count += data.count(b'\n')
+		pos = data.rfind(b'\n', 0, len(data)-1)
+		self.last = [float(v) for v in parseRows(data[pos+1:], 2)[0]]
+		return True
+
+	def summary(self):
+		return {
+			'x' : self.last[0] if self.last else None,
+			'y' : self.last[1] if self.last else None,
+			'xLabel' : self.xLabel,
+			'yLabel' : self.yLabel,
+			'count' : self.count}
+
+class STKOMonitorHeadless:
+	'''
+	the monitor without GUI, for compute nodes without a display.
+	it tails the monitor files (.plt, .stats, .tim) in the analysis directory
+	and publishes a compact summary with the last value of each monitor,
+	the analysis progress, the step rate, the iterations and the ETA:
+	1) as a rolling summary file (a JSON object rewritten atomically at each change)
+	2) as a newline-delimited JSON stream on a TCP socket (optional).
+	clients connecting to the socket receive the full summary first,
+	and then only the changes.
+	'''
+	def __init__(self, directory, summary_file=None, host='127.0.0.1', port=None, interval=1.0, rate_window=60.0):
+		self.directory = directory
+		self.summary_file = summary_file
+		self.interval = interval
+		self.rate_window = rate_window
+		# monitor files
+		self.monitors = {}
+		self.stats_reader = STKOTailReader(os.path.join(directory, 'STKO_monitor_statistics.stats'))
+		self.time_file = os.path.join(directory, 'STKO_time_monitor.tim')
+		self.last_scan = 0.0
+		# analysis status
+		self.status = {}
+		self.resetStatus()
+		# (wall time, number of steps) for the step rate
+		self.history = deque()
+		# stream
+		self.server = None
+		self.clients = []
+		if port is not None:
+			self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+			self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+			self.server.bind((host, port))
+			self.server.listen(16)
+			self.server.setblocking(False)
+
+	def resetStatus(self):
+		self.status = {
+			'stage' : 1,
+			'step' : 0,
+			'steps' : 0,
+			'dt' : None,
+			'time' : None,
+			'iterations' : None,
+			'max_iterations' : None,
+			'norm' : None,
+			'percentage' : None,
+			'elapsed' : None,
+			'step_rate' : None,
+			'eta' : None}
+
+	def scan(self):
+		# monitor files in the top directory
+		found = set()
+		try:
+			with os.scandir(self.directory) as it:
+				for entry in it:
+					if entry.name.endswith('.plt') and entry.is_file():
+						found.add(entry.path)
+		except OSError:
+			pass
+		removed = [f for f in self.monitors if f not in found]
+		for f in removed:
+			del self.monitors[f]
+		added = [f for f in sorted(found) if f not in self.monitors]
+		for f in added:
+			self.monitors[f] = STKOMonitorFile(f)
+		if added:
+			self.monitors = dict(sorted(self.monitors.items()))
+		return len(added) > 0 or len(removed) > 0
+
+	def loadStatistics(self):
+		'''
+		returns the changed status fields
+		'''
+		restarted, start, data = self.stats_reader.read()
+		if restarted:
+			self.resetStatus()
+			self.history.clear()
+		if not data:
+			return dict(self.status) if restarted else {}
+		rows = parseRows(data, 6)
+		status = self.status
+		max_iter = status['max_iterations'] or 0
+		for row in rows:
+			# a decreasing step id means that a new stage started
+			step_id = int(row[0])
+			if step_id < status['step']:
+				status['stage'] += 1
+			status['step'] = step_id
+			max_iter = max(max_iter, int(row[3]))
+		status['steps'] += rows.shape[0]
+		last = rows[-1]
+		status['dt'] = float(last[1])
+		status['time'] = float(last[2])
+		status['iterations'] = int(last[3])
+		status['max_iterations'] = max_iter
+		status['norm'] = float(last[4])
+		status['percentage'] = float(last[5])
+		return dict(status)
+
+	def loadTime(self):
+		# elapsed time in seconds, from the .tim file
+		try:
+			with open(self.time_file) as f:
+				t = f.read().split()
+			if len(t) < 2:
+				return None # being rewritten by the monitor
+			return int(t[1]) - int(t[0])
+		except (OSError, ValueError):
+			return None
+
+	def updateRates(self, now, new_steps):
+		'''
+		returns the changed rate fields.
+		they are updated only when new steps are done or when the elapsed time changes,
+		so that an idle analysis does not produce records at each tick
+		'''
+		status = self.status
+		elapsed = self.loadTime()
+		if not new_steps and (elapsed is None or elapsed == status['elapsed']):
+			return {}
+		changes = {}
+		# step rate in the last rate_window seconds
+		self.history.append((now, status['steps']))
+		while len(self.history) > 2 and now - self.history[0][0] > self.rate_window:
+			self.history.popleft()
+		t0, n0 = self.history[0]
+		if now > t0:
+			changes['step_rate'] = (status['steps'] - n0) / (now - t0)
+		# elapsed time and eta
+		if elapsed is not None:
+			changes['elapsed'] = elapsed
+			p = status['percentage']
+			if p is not None and p > 0.0:
+				changes['eta'] = elapsed * max(0.0, 1.0 - p) / p
+		changes = {k : v for k, v in changes.items() if status[k] != v}
+		status.update(changes)
+		return changes
+
+	def summary(self):
+		return {
+			'directory' : self.directory,
+			'status' : dict(self.status),
+			'monitors' : {m.display_name : m.summary() for m in self.monitors.values()}}
+
+	def tick(self):
+		'''
+		reads the new data and returns the changes as a dictionary (or None if nothing changed)
+		'''
+		now = time.time()
+		changes = {}
+		list_changed = False
+		if now - self.last_scan >= 10.0*self.interval or not self.monitors:
+			self.last_scan = now
+			list_changed = self.scan()
+		status = self.loadStatistics()
+		status.update(self.updateRates(now, len(status) > 0))
+		if status:
+			changes['status'] = status
+		monitors = {}
+		for m in self.monitors.values():
+			if m.load():
+				monitors[m.display_name] = m.summary()
+		if monitors:
+			changes['monitors'] = monitors
+		if list_changed:
+			changes['monitor_list'] = [m.display_name for m in self.monitors.values()]
+		if not changes:
+			return None
+		changes['wall_time'] = now
+		return changes
+
+	def writeSummary(self):
+		if self.summary_file is None:
+			return
+		# write and replace, so that readers never see a partial file
+		temp = '{}.tmp'.format(self.summary_file)
+		with open(temp, 'w') as f:
+			json.dump(self.summary(), f)
+		os.replace(temp, self.summary_file)
+
+	def send(self, client, record):
+		try:
+			client.sendall((json.dumps(record) + '\n').encode('utf-8'))
+			return True
+		except OSError:
+			client.close()
+			return False
+
+	def acceptClients(self):
+		while True:
+			try:
+				client, address = self.server.accept()
+			except (BlockingIOError, OSError):
+				return
+			client.setblocking(True)
+			client.settimeout(self.interval)
+			# send the full summary first
+			if self.send(client, self.summary()):
+				self.clients.append(client)
+
+	def broadcast(self, record):
+		self.clients = [c for c in self.clients if self.send(c, record)]
+
+	def run(self):
+		try:
+			while True:
+				changes = self.tick()
+				if changes is not None:
+					self.writeSummary()
+					self.broadcast(changes)
+				if self.server is not None:
+					# wait for new clients or for the next tick
+					ready, _, _ = select.select([self.server], [], [], self.interval)
+					if ready:
+						self.acceptClients()
+				else:
+					time.sleep(self.interval)
+		except KeyboardInterrupt:
+			pass
+		finally:
+			for c in self.clients:
+				c.close()
+			if self.server is not None:
+				self.server.close()
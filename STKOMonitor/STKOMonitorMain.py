@@ -16,6 +16,32 @@ def run():
 	form.show()
 	sys.exit(app.exec_())
 
+def run_headless(args):
+	from STKOMonitorHeadless import STKOMonitorHeadless
+	summary_file = args.summary
+	if summary_file is None and args.port is None:
+		summary_file = os.path.join(os.getcwd(), 'STKO_monitor_summary.json')
+	monitor = STKOMonitorHeadless(
+		os.getcwd(), summary_file=summary_file, host=args.host, port=args.port, interval=args.interval)
+	monitor.run()
+
+def parse_args():
+	import argparse
+	parser = argparse.ArgumentParser(description='STKO Monitor')
+	parser.add_argument('--headless', action='store_true',
+		help='run without GUI, publishing a summary file and/or a newline-delimited JSON stream')
+	parser.add_argument('--summary', default=None,
+		help='headless mode: rolling summary file (default STKO_monitor_summary.json if --port is not given)')
+	parser.add_argument('--port', type=int, default=None,
+		help='headless mode: TCP port for the newline-delimited JSON stream')
+	parser.add_argument('--host', default='127.0.0.1',
+		help='headless mode: host for the JSON stream (default 127.0.0.1)')
+	parser.add_argument('--interval', type=float, default=1.0,
+		help='headless mode: update interval in seconds (default 1.0)')
+	# other arguments are left to Qt
+	args, _ = parser.parse_known_args()
+	return args
+
 # add current direcotry
 sys.path.insert(0, os.path.dirname(__file__))
 
@@ -32,4 +58,8 @@ if 'STKO_INSTALL_DIR' in os.environ:
 	path = '{}{}{}'.format(stko_dir, os.pathsep, path)
 	os.environ[path_name] = path
 
-run()
\ No newline at end of file
+args = parse_args()
+if args.headless:
+	run_headless(args)
+else:
+	run()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import sys
-from PySide2.QtCore import (Signal, QTimer, Qt)
+from PySide2.QtCore import (Signal, Qt)
 from PySide2.QtWidgets import (
 	QLineEdit, QPushButton, QApplication, 
 	QVBoxLayout, QHBoxLayout, QGridLayout, 
@@ -9,6 +9,8 @@ from PySide2.QtWidgets import (
 from PySide2 import QtGui
 import os
 from STKODoubleItemDelegate import *
+from STKOMonitorData import *
+from STKOFileWatcher import *
 
 import matplotlib
 # Make sure that we are using QT5
@@ -20,7 +22,6 @@ from matplotlib.figure import Figure
 from matplotlib import cm
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy import interpolate
 
 params = {
 	'legend.fontsize': 'x-small',
@@ -30,69 +31,6 @@ params = {
 	'ytick.labelsize':'x-small'
 	}
 
-class STKOPlotDataItem:
-	def __init__(self, fname):
-		self.file_name = fname
-		self.display_name = os.path.splitext(os.path.basename(fname))[0]
-		self.x = []
-		self.y = []
-		self.xmax = 0.0
-		self.xmin = 0.0
-		self.ymax = 0.0
-		self.ymin = 0.0
-		self.xLabel = ''
-		self.yLabel = ''
-		
-	def load(self):
-		'''
-		loads the contents of file self.file_name.
-		it does it incrementally loading only new data.
-		returns the number of lines added
-		'''
-		if not os.path.exists(self.file_name):
-			return 0
-		n0 = len(self.x)
-		with open(self.file_name, 'r') as f:
-			counter = -1 # start at -1 to account for the first header line
-			while True:
-				line = f.readline()
-				if not line:
-					break
-				counter += 1
-				if counter <= n0 and counter != 0:
-					continue # skip lines already read
-				# get line data
-				data = [y for y in [x.strip() for x in line.split('\t')] if y ]
-				n = len(data)
-				if counter == 0:
-					# read first header line for axis labels
-					if n > 0: self.xLabel = data[0]
-					if n > 1: self.yLabel = data[1]
-				else:
-					# read plot values
-					x = float(data[0]) if n > 0 else 0.0
-					y = float(data[1]) if n > 1 else 0.0
-					self.x.append(x)
-					self.y.append(y)
-					# accumulate min/max
-					if len(self.x) == 1:
-						self.xmin = x
-						self.xmax = x
-						self.ymin = y
-						self.ymax = y
-					else:
-						self.xmin = min(self.xmin, x)
-						self.xmax = max(self.xmax, x)
-						self.ymin = min(self.ymin, y)
-						self.ymax = max(self.ymax, y)
-		# return true if some lines were added
-		return len(self.x) - n0
-
-class STKOPlotData:
-	def __init__(self, plot, bg_plot):
-		self.plot = plot
-		self.bg_plot = bg_plot
-
 class STKOMonitorPlotWidget(QWidget):
 
 	def __init__(self, parent=None):
@@ -152,9 +90,8 @@ class STKOMonitorPlotWidget(QWidget):
 		# fourier amplitude
 		self.fft_check = QCheckBox('Fourier Amplitude')
 		
-		# timer
-		self.timer = QTimer(self)
-		self.timer.setInterval(1000) # each second
+		# file watcher
+		self.watcher = getFileWatcher()
 		
 		# splitter
 		self.splitter = QSplitter(Qt.Horizontal)
@@ -184,24 +121,30 @@ class STKOMonitorPlotWidget(QWidget):
 		main_layout.addWidget(self.splitter)
 		
 		# setup connections
-		self.timer.timeout.connect(self.findPlotData)
-		self.timer.timeout.connect(self.reloadPlotData)
+		self.watcher.fileListChanged.connect(self.onFileListChanged)
+		self.watcher.filesChanged.connect(self.onFilesChanged)
 		self.comboBox.currentIndexChanged.connect(self.onComboBoxIndexChanged)
 		self.tree.itemClicked.connect(self.onTreeItemClicked)
 		self.radio_single.toggled.connect(self.onSingleToggled)
 		self.seed.valueChanged.connect(self.onSeedChanged)
 		self.fft_check.toggled.connect(self.onFftToggled)
 		
-		# start timer
-		self.timer.start()
+		# first load
+		self.onFileListChanged()
+	
+	def onFileListChanged(self):
+		self.findPlotData()
+		self.reloadPlotData()
+	
+	def onFilesChanged(self, files):
+		for file in files:
+			if file in self.data:
+				self.reloadPlotData()
+				break
 	
 	def findPlotData(self):
-		# check each file in the current directory
-		all_files = []
-		for root, subdirs, files in os.walk(os.getcwd()):
-			for file in files:
-				if file.endswith(".plt"):
-					all_files.append(os.path.join(root, file))
+		# check each file published by the file watcher
+		all_files = [file for file in self.watcher.files() if file.endswith(".plt")]
 		#
 		# remove data not available anymore
 		to_rem = []
@@ -339,7 +282,55 @@ class STKOMonitorPlotWidget(QWidget):
 		# done
 		self.canvas.prepare(keys, force)
 
+# util for trimming
+def _trim(x, y, tmax):
+	if len(x) > 0 and x[-1] > tmax:
+		# find first value beyond tmax
+		last = np.argmax(x > tmax)
+		return (x[:last], y[:last])
+	return (x, y)
+
+# util for resampling
+def _resample(x, y):
+	try:
+		dtall = x[1:]-x[:-1]
+		dtmin = dtall.min()
+		dtmax = dtall.max()
+		if (dtmax - dtmin) < 1.0e-4*dtmax:
+			return (x, y)
+		dt = dtall.mean()
+		t0 = x[0]
+		t1 = x[-1]
+		N3 = max(1, int(round((t1-t0)/dt)))+1
+		xx = np.linspace(t0, t1, N3)
+		yy = np.interp(xx, x, y)
+		return (xx, yy)
+	except:
+		return (x, y)
+
+# util for fft with uniform dt
+def _fft(xs, ys):
+	try:
+		n_samples = len(xs)
+		xx, yy = _resample(xs, ys)
+		x = np.array(xx)
+		y = np.array(yy)
+		t0 = x[0]
+		t1 = x[-1]
+		np_fft = np.fft.fft(y)
+		amplitudes = (t1-t0) / n_samples * np.sqrt(np_fft.real**2 + np_fft.imag**2)
+		frequencies = np.fft.fftfreq(n_samples) * n_samples / (t1 - t0)
+		frequencies = frequencies[:len(frequencies) // 2]
+		amplitudes = amplitudes[:len(np_fft) // 2]
+		id = amplitudes.argmax()
+		return (frequencies, amplitudes, frequencies[id], amplitudes[id])
+	except:
+		return ([0.0], [0.0], 0.0, 0.0)
+
 class MyMplCanvas(FigureCanvas):
+	# emitted by the fft worker thread
+	fftDone = Signal(object)
+	
 	def __init__(self, parent=None, width=5, height=4, dpi=100):
 		# base initialization
 		fig = Figure(figsize=(width, height), dpi=dpi)
@@ -354,8 +345,17 @@ class MyMplCanvas(FigureCanvas):
 		self.subplot.plot()
 		# data (map plot names to plots)
 		self.keymap = {}
+		# decimators (map (plot name, 0=plot 1=background) to decimator)
+		self.decimators = {}
 		self.seed = 0
 		self.do_fft = False
+		# background for blitting, saved after each full draw
+		self.background = None
+		self.mpl_connect('draw_event', self.onDraw)
+		# fft worker
+		self.fft_thread = None
+		self.fft_pending = None
+		self.fftDone.connect(self.onFftDone)
 		# done
 		self.setParent(parent)
 		FigureCanvas.updateGeometry(self)
@@ -367,134 +367,173 @@ class MyMplCanvas(FigureCanvas):
 			self.subplot.clear()
 			self.subplot.grid(linestyle=':')
 			self.keymap.clear()
+			self.decimators.clear()
+			self.background = None
 			random.seed(self.seed)
 			for key in keys:
 				# random colors from 0 to 1
 				h = random.gauss(0.653, 0.25)
 				c1 = colorsys.hls_to_rgb(h, 0.45, 0.6)
 				c2 = colorsys.hls_to_rgb(h, 0.65, 0.5)
-				# 1 plot and 1 background for each key
-				bg_plot = self.subplot.plot([],[], color=c2, linestyle='--', linewidth=1.0)[0]
-				plot = self.subplot.plot([],[], color=c1, linestyle='-', linewidth=1.5)[0]
-				tip = self.subplot.plot([],[], 'o', markersize=6, markerfacecolor=(1,0,0,0.8), markeredgewidth=1, markeredgecolor=c1)[0]
+				# 1 plot and 1 background for each key.
+				# they are animated, so they can be updated with blitting
+				bg_plot = self.subplot.plot([],[], color=c2, linestyle='--', linewidth=1.0, animated=True)[0]
+				plot = self.subplot.plot([],[], color=c1, linestyle='-', linewidth=1.5, animated=True)[0]
+				tip = self.subplot.plot([],[], 'o', markersize=6, markerfacecolor=(1,0,0,0.8), markeredgewidth=1, markeredgecolor=c1, animated=True)[0]
 				# map it
 				self.keymap[key] = (plot, bg_plot, tip)
 			self.subplot.plot()
 	
+	def onDraw(self, event):
+		# a full draw does not render animated artists:
+		# save the background and draw them on top of it
+		self.background = self.copy_from_bbox(self.figure.bbox)
+		self.drawArtists()
+	
+	def drawArtists(self):
+		for plot, bg_plot, tip in self.keymap.values():
+			self.subplot.draw_artist(bg_plot)
+			self.subplot.draw_artist(plot)
+			self.subplot.draw_artist(tip)
+	
+	def blitArtists(self):
+		self.restore_region(self.background)
+		self.drawArtists()
+		self.blit(self.figure.bbox)
+	
+	def getDecimator(self, key, which):
+		# the target number of buckets is the width of the canvas in pixels
+		target = max(self.width(), 100)
+		decimator = self.decimators.get((key, which), None)
+		if decimator is None or decimator.target != target:
+			decimator = STKOEnvelopeDecimator(target)
+			self.decimators[(key, which)] = decimator
+		return decimator
+	
+	def resizeEvent(self, event):
+		# decimation depends on the canvas width
+		self.decimators.clear()
+		FigureCanvas.resizeEvent(self, event)
+	
 	def updatePlot(self, all_data):
 		
-		# util for trimming
-		def _trim(x, y, tmax):
-			if x[-1] > tmax:
-				# find last
-				last = 0
-				for i in range(len(x)):
-					last = i
-					if x[i] > tmax:
-						break
-				return (x[:last], y[:last])
-			return (x, y)
-		
-		# util for resampling
-		def _resample(x, y):
-			try:
-				dtall = x[1:]-x[:-1]
-				dtmin = dtall.min()
-				dtmax = dtall.max()
-				if (dtmax - dtmin) < 1.0e-4*dtmax:
-					return (x, y)
-				dt = dtall.mean()
-				t0 = x[0]
-				t1 = x[-1]
-				N3 = max(1, int(round((t1-t0)/dt)))+1
-				xx = np.linspace(t0, t1, N3)
-				interp = interpolate.interp1d(x, y)
-				yy = interp(xx)
-				return (xx, yy)
-			except:
-				return (x, y)
+		# in fft mode, the fourier amplitude is computed on demand in a worker thread
+		if self.do_fft:
+			self.requestFft(all_data)
+			return
 		
-		# util for fft with uniform dt
-		def _fft(xs, ys):
-			try:
-				n_samples = len(xs)
-				xx, yy = _resample(xs, ys)
-				x = np.array(xx)
-				y = np.array(yy)
-				t0 = x[0]
-				t1 = x[-1]
-				np_fft = np.fft.fft(y)
-				amplitudes = (t1-t0) / n_samples * np.sqrt(np_fft.real**2 + np_fft.imag**2)
-				frequencies = np.fft.fftfreq(n_samples) * n_samples / (t1 - t0)
-				frequencies = frequencies[:len(frequencies) // 2]
-				amplitudes = amplitudes[:len(np_fft) // 2]
-				id = amplitudes.argmax()
-				return (frequencies, amplitudes, frequencies[id], amplitudes[id])
-			except:
-				return ([0.0], [0.0], 0.0, 0.0)
-		
-		# util for plotting the i-th item
-		def plot_item(plot, bg_plot, tip, data, set_labels):
-			items = (
-				(plot, data.plot, data.plot.display_name), 
-				(bg_plot, data.bg_plot, '{} (Background)'.format(data.plot.display_name)))
-			# items: bg_plot and plot
-			if self.do_fft:
-				fft_tip_x = 0.0
-				fft_tip_y = 0.0
-				tmax = 0.0
-				if len(data.plot.x) > 0:
-					tmax = data.plot.x[-1]
-			for counter, item in enumerate(items):
-				plot = item[0]
-				plot_data = item[1]
-				label = item[2]
-				if plot_data is not None:
-					if self.do_fft:
-						(_trimmed_x, _trimmed_y) = (plot_data.x, plot_data.y) if counter == 0 else _trim(plot_data.x, plot_data.y, tmax)
-						fftx, ffty, fmax, amax = _fft(_trimmed_x, _trimmed_y)
-						plot.set_xdata(fftx)
-						plot.set_ydata(ffty)
-						if counter == 0:
-							fft_tip_x = fmax
-							fft_tip_y = amax
-					else:
-						plot.set_xdata(plot_data.x)
-						plot.set_ydata(plot_data.y)
-					if set_labels:
-						self.subplot.set_xlabel('Frequency (Hz)' if self.do_fft else plot_data.xLabel)
-						self.subplot.set_ylabel('Fourier Amplitude' if self.do_fft else plot_data.yLabel)
-					plot.set_label(label)
-				else:
-					plot.set_xdata([])
-					plot.set_ydata([])
-					plot.set_label('_nolegend_')
-			# tip
-			if self.do_fft:
-				tip.set_xdata(fft_tip_x)
-				tip.set_ydata(fft_tip_y)
-			else:
-				if data.plot is not None and len(data.plot.x) > 0:
-					tip.set_xdata(data.plot.x[-1])
-					tip.set_ydata(data.plot.y[-1])
-				else:
-					tip.set_xdata([])
-					tip.set_ydata([])
-			tip.set_label('_nolegend_')
+		# full draw if something changed the layout, otherwise just blit the new data
+		full = self.background is None
+		xlim = self.subplot.get_xlim()
+		ylim = self.subplot.get_ylim()
+		def _outside(plot_data):
+			return (plot_data.xmin < xlim[0] or plot_data.xmax > xlim[1] or
+				plot_data.ymin < ylim[0] or plot_data.ymax > ylim[1])
 		
 		# process all
 		counter = 0
 		for key, data in all_data.items():
 			if key in self.keymap:
 				plot, bg_plot, tip = self.keymap[key]
-				plot_item(plot, bg_plot, tip, data, (counter == 0))
+				items = (
+					(plot, data.plot, data.plot.display_name), 
+					(bg_plot, data.bg_plot, '{} (Background)'.format(data.plot.display_name)))
+				for which, item in enumerate(items):
+					line = item[0]
+					plot_data = item[1]
+					label = item[2]
+					if plot_data is not None:
+						xd, yd = self.getDecimator(key, which).update(plot_data.x, plot_data.y, plot_data.restarted)
+						line.set_data(xd, yd)
+						if plot_data.restarted or (len(xd) > 0 and _outside(plot_data)):
+							full = True
+						if counter == 0:
+							if self.subplot.get_xlabel() != plot_data.xLabel or self.subplot.get_ylabel() != plot_data.yLabel:
+								self.subplot.set_xlabel(plot_data.xLabel)
+								self.subplot.set_ylabel(plot_data.yLabel)
+								full = True
+						if line.get_label() != label:
+							line.set_label(label)
+							full = True
+					else:
+						line.set_data([], [])
+						line.set_label('_nolegend_')
+				# tip
+				if data.plot is not None and len(data.plot.x) > 0:
+					tip.set_data([data.plot.x[-1]], [data.plot.y[-1]])
+				else:
+					tip.set_data([], [])
+				tip.set_label('_nolegend_')
 				counter += 1
 		
+		# done
+		if full:
+			self.redraw(counter > 0)
+		else:
+			self.blitArtists()
+	
+	def redraw(self, legend):
 		# bounds
 		self.subplot.relim()
 		self.subplot.autoscale_view()
-		
-		# done
-		if counter > 0:
+		if legend:
 			self.subplot.legend()
-		self.draw()
\ No newline at end of file
+		self.draw_idle()
+	
+	def requestFft(self, all_data):
+		# copy the data now, the worker thread should not see it growing
+		jobs = []
+		for key, data in all_data.items():
+			if key in self.keymap:
+				jobs.append((key, data.plot.display_name, data.plot.x.copy(), data.plot.y.copy(),
+					None if data.bg_plot is None else (data.bg_plot.x.copy(), data.bg_plot.y.copy())))
+		if self.fft_thread is not None and self.fft_thread.is_alive():
+			# only the last request will be processed when the worker is done
+			self.fft_pending = jobs
+			return
+		import threading
+		self.fft_thread = threading.Thread(target=self.fftJob, args=(jobs,), daemon=True)
+		self.fft_thread.start()
+	
+	def fftJob(self, jobs):
+		# worker thread
+		results = []
+		for key, name, x, y, bg in jobs:
+			fftx, ffty, fmax, amax = _fft(x, y)
+			bg_fft = None
+			if bg is not None:
+				tmax = x[-1] if len(x) > 0 else 0.0
+				bg_fft = _fft(*_trim(bg[0], bg[1], tmax))[:2]
+			results.append((key, name, (fftx, ffty), bg_fft, (fmax, amax)))
+		self.fftDone.emit(results)
+	
+	def onFftDone(self, results):
+		# main thread
+		if self.fft_pending is not None:
+			jobs = self.fft_pending
+			self.fft_pending = None
+			import threading
+			self.fft_thread = threading.Thread(target=self.fftJob, args=(jobs,), daemon=True)
+			self.fft_thread.start()
+		if not self.do_fft:
+			return
+		target = max(self.width(), 100)
+		counter = 0
+		for key, name, plot_fft, bg_fft, fft_tip in results:
+			if key not in self.keymap:
+				continue
+			plot, bg_plot, tip = self.keymap[key]
+			for line, line_fft, label in ((plot, plot_fft, name), (bg_plot, bg_fft, '{} (Background)'.format(name))):
+				if line_fft is not None:
+					line.set_data(*STKOEnvelopeDecimator(target).update(np.asarray(line_fft[0]), np.asarray(line_fft[1])))
+					line.set_label(label)
+				else:
+					line.set_data([], [])
+					line.set_label('_nolegend_')
+			tip.set_data([fft_tip[0]], [fft_tip[1]])
+			tip.set_label('_nolegend_')
+			counter += 1
+		if counter > 0:
+			self.subplot.set_xlabel('Frequency (Hz)')
+			self.subplot.set_ylabel('Fourier Amplitude')
+		self.redraw(counter > 0)
@@ -1,9 +1,11 @@
 import sys
-from PySide2.QtCore import (Signal, QTimer)
+from PySide2.QtCore import (Signal)
 from PySide2.QtWidgets import (QLineEdit, QPushButton, QApplication, QVBoxLayout, QDialog, QTableWidget, QTabWidget, QGridLayout, QWidget, QTableWidgetItem, QCheckBox)
 from PySide2 import QtGui
 import os
 from STKODoubleItemDelegate import *
+from STKOMonitorData import *
+from STKOFileWatcher import *
 
 class STKOMonitorStatisticsWidget(QWidget):
 
@@ -35,57 +37,56 @@ class STKOMonitorStatisticsWidget(QWidget):
 		self.current_step_id = 0
 		self.current_stage_id = 1
 		
-		# timer
-		self.timer = QTimer(self)
-		self.timer.setInterval(1000) # each second
+		# incremental reader and data
+		self.reader = STKOTailReader(os.path.join(os.getcwd(), 'STKO_monitor_statistics.stats'))
+		self.values = STKOGrowableArray(6)
+		
+		# file watcher
+		self.watcher = getFileWatcher()
 		
 		# add to layout
 		self.layout().addWidget(self.cbox_autoscroll)
 		self.layout().addWidget(self.table)
 		
 		# setup connections
-		self.timer.timeout.connect(self.updateStatistics)
+		self.watcher.filesChanged.connect(self.onFilesChanged)
 		
-		# start timer
-		self.timer.start()
+		# first load
+		self.updateStatistics()
+	
+	def onFilesChanged(self, files):
+		if self.reader.file_name in files:
+			self.updateStatistics()
 		
 	def updateStatistics(self):
-		# check file
-		fname = '{}/STKO_monitor_statistics.stats'.format(os.getcwd())
-		if not os.path.exists(fname):
+		# read only new lines
+		restarted, start, data = self.reader.read()
+		if restarted:
+			# the analysis was restarted
+			self.table.setRowCount(0)
+			self.values.clear()
+			self.current_step_id = 0
+			self.current_stage_id = 1
+		if not data:
 			return
-		with open(fname) as stat:
-			line_counter = 0
-			while True:
-				line = stat.readline()
-				if(not line):
-					break
-				line_counter += 1
-				rowPosition = self.table.rowCount()
-				if line_counter > rowPosition:
-					# split and check words
-					words = [y for y in [x.strip() for x in line.split(' ')] if y ]
-					nkey = len(words)
-					if nkey != 6:
-						return
-					
-					# get current step id
-					previous_step_id = self.current_step_id
-					self.current_step_id = int(words[0])
-					if self.current_step_id < previous_step_id:
-						# this means a new stage started
-						self.current_stage_id += 1
-					
-					# insert a new row
-					self.table.insertRow(rowPosition)
-					# first column is the stage id
-					self.table.setItem(rowPosition, 0, QTableWidgetItem(str(self.current_stage_id)))
-					# insert words for other columns
-					for i in range(len(words)):
-						self.table.setItem(rowPosition, i+1, QTableWidgetItem(words[i]))
+		rows = parseRows(data, 6)
+		self.values.append(rows)
+		rowPosition = self.table.rowCount()
+		self.table.setRowCount(rowPosition + rows.shape[0])
+		for row in rows:
+			# get current step id
+			previous_step_id = self.current_step_id
+			self.current_step_id = int(row[0])
+			if self.current_step_id < previous_step_id:
+				# this means a new stage started
+				self.current_stage_id += 1
+			# first column is the stage id
+			self.table.setItem(rowPosition, 0, QTableWidgetItem(str(self.current_stage_id)))
+			# insert words for other columns
+			self.table.setItem(rowPosition, 1, QTableWidgetItem(str(self.current_step_id)))
+			for i in range(1, len(row)):
+				self.table.setItem(rowPosition, i+1, QTableWidgetItem(repr(float(row[i]))))
+			rowPosition += 1
 		# make sure the last item is visible
 		if self.cbox_autoscroll.isChecked():
 			self.table.scrollToBottom()
-
-
-
@@ -1,8 +1,9 @@
 import sys
-from PySide2.QtCore import (Signal, QTimer)
+from PySide2.QtCore import (Signal)
 from PySide2.QtWidgets import (QHBoxLayout, QWidget, QLabel)
 from PySide2 import QtGui
 import os
+from STKOFileWatcher import *
 
 class STKOMonitorTimerWidget(QWidget):
 
@@ -18,24 +19,30 @@ class STKOMonitorTimerWidget(QWidget):
 		# add to layout
 		self.layout().addWidget(self.label)
 		
-		# timer
-		self.timer = QTimer(self)
-		self.timer.setInterval(1000) # each second
+		# file watcher
+		self.file_name = os.path.join(os.getcwd(), 'STKO_time_monitor.tim')
+		self.watcher = getFileWatcher()
 		
 		# setup connections
-		self.timer.timeout.connect(self.updateTime)
+		self.watcher.filesChanged.connect(self.onFilesChanged)
 		
-		# start timer
-		self.timer.start()
+		# first load
+		self.updateTime()
+	
+	def onFilesChanged(self, files):
+		if self.file_name in files:
+			self.updateTime()
 		
 	def updateTime(self):
 		# check file
-		fname = '{}/STKO_time_monitor.tim'.format(os.getcwd())
+		fname = self.file_name
 		if not os.path.exists(fname):
 			return
 		with open(fname) as f:
 			t = f.read().splitlines()
 			n = len(t)
+			if n < 2:
+				return # being rewritten by the monitor
 			t0 = int(t[0]) if n > 0 else 0
 			t1 = int(t[1]) if n > 1 else t0
 			# times are in seconds
@@ -0,0 +1,99 @@
+'''
+Measures the per-step overhead of the adaptive transient analysis template
+(opensees/analysis_steps/Analyses/template_trans_rev.tcl and template_trans_adapt_proc.tcl).
+
+The OpenSees commands used by the template (integrator, analyze, testIter, testNorms)
+are replaced by trivial Tcl procedures, so that the measured time is only
+the driver overhead of the template. The analysis always converges
+with a constant number of iterations (a linear model).
+
+Usage:
+	python benchmarks/adaptive_transient_overhead.py [--increments N] [--tclsh PATH] [--baseline-rev REV]
+
+--baseline-rev runs also the template_trans_rev.tcl found at the given git revision
+(for example the parent of the commit that introduced STKO_AdaptiveTransientAnalyze),
+where the adaptive loop was written inline.
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TEMPLATE_DIR = os.path.join(_ROOT, 'opensees', 'analysis_steps', 'Analyses')
+
+# stubs for the STKO variables and procedures defined in the main script,
+# and for the OpenSees commands
+_HEADER = '''
+set STKO_VAR_process_id 0
+set STKO_VAR_OnBeforeAnalyze_CustomFunctions {}
+set STKO_VAR_OnAfterAnalyze_CustomFunctions {}
+set STKO_VAR_analyze_done 0
+set STKO_VAR_afterAnalyze_done 0
+set STKO_VAR_num_iter 0
+set STKO_VAR_error_norm 0.0
+set STKO_VAR_percentage 0.0
+proc STKO_CALL_OnBeforeAnalyze {} {global STKO_VAR_OnBeforeAnalyze_CustomFunctions; foreach item $STKO_VAR_OnBeforeAnalyze_CustomFunctions {$item}}
+proc STKO_CALL_OnAfterAnalyze {} {global STKO_VAR_OnAfterAnalyze_CustomFunctions; foreach item $STKO_VAR_OnAfterAnalyze_CustomFunctions {$item}}
+proc integrator {args} {}
+proc analyze {args} {return 0}
+proc testIter {} {return 3}
+proc testNorms {} {return {1.0e-3 1.0e-6 1.0e-9}}
+set __t0 [clock microseconds]
+'''
+
+_FOOTER = '''
+puts stderr [expr {([clock microseconds] - $__t0) / 1.0e6}]
+'''
+
+def _substitute(template, increments):
+	for key, value in (
+			('__initial_num_incr__', str(increments)),
+			('__max_iter__', '20'),
+			('__des_iter__', '10'),
+			('__total_time__', str(float(increments))),
+			('__max_factor__', '1.0'),
+			('__min_factor__', '1e-6'),
+			('__max_factor_incr__', '1.5'),
+			('__min_factor_incr__', '1e-6'),
+			('__integrator_type__', 'Newmark'),
+			('__more_int_data__', '0.5 0.25')):
+		template = template.replace(key, value)
+	return template
+
+def _run(tclsh, script):
+	with tempfile.NamedTemporaryFile('w', suffix='.tcl', delete=False) as f:
+		f.write(script)
+		file_name = f.name
+	try:
+		res = subprocess.run([tclsh, file_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+		return float(res.stderr.strip().splitlines()[-1])
+	finally:
+		os.remove(file_name)
+
+def _read(file_name):
+	with open(os.path.join(_TEMPLATE_DIR, file_name), 'r') as f:
+		return f.read()
+
+def main():
+	parser = argparse.ArgumentParser(description='adaptive transient template overhead')
+	parser.add_argument('--increments', type=int, default=200000)
+	parser.add_argument('--tclsh', default='tclsh')
+	parser.add_argument('--baseline-rev', default=None)
+	args = parser.parse_args()
+
+	current = _read('template_trans_adapt_proc.tcl') + _substitute(_read('template_trans_rev.tcl'), args.increments)
+	t = _run(args.tclsh, _HEADER + current + _FOOTER)
+	print('current : {:8.3f} s for {} increments ({:.2f} us/increment)'.format(t, args.increments, t / args.increments * 1.0e6))
+
+	if args.baseline_rev:
+		baseline = subprocess.run(
+			['git', '-C', _ROOT, 'show', '{}:opensees/analysis_steps/Analyses/template_trans_rev.tcl'.format(args.baseline_rev)],
+			stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+		t = _run(args.tclsh, _HEADER + _substitute(baseline, args.increments) + _FOOTER)
+		print('baseline: {:8.3f} s for {} increments ({:.2f} us/increment)'.format(t, args.increments, t / args.increments * 1.0e6))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,89 @@
+'''
+Measures the time to load the metadata of all OpenSees modules at solver initialization
+(opensees/utils/metadata_registry.py), without the cache, with a cold cache
+and with a warm cache.
+
+Each case runs in a new interpreter, that must be able to import PyMpc
+(i.e. the python of STKO). The namespaces are those loaded by opensees/mpc_solver_initialize.py,
+and the metadata are not registered in the document.
+The cache file of the solver directory is moved aside during the benchmark and restored at the end.
+
+Usage:
+	python benchmarks/metadata_registry_startup.py [--python PATH] [--repeat N]
+'''
+
+import argparse
+import ast
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BASEDIR = os.path.join(_ROOT, 'opensees')
+_CACHE = os.path.join(_BASEDIR, '__pycache__', 'metadata_cache.json')
+
+def _namespaces():
+	with open(os.path.join(_BASEDIR, 'mpc_solver_initialize.py'), 'r') as f:
+		source = f.read()
+	return [ast.literal_eval(i) for i in re.findall(r'__load_module_internal\((\[.*?\])', source)]
+
+def _child():
+	sys.path.insert(0, _ROOT)
+	t0 = time.perf_counter()
+	from opensees.utils.metadata_registry import MetadataRegistry
+	registry = MetadataRegistry(_BASEDIR, 'opensees')
+	count = [0]
+	def register(xom):
+		count[0] += 1
+	for namespace in _namespaces():
+		registry.load(namespace, register)
+	registry.save()
+	print('RESULT {} {} {} {}'.format(time.perf_counter() - t0, count[0], registry.num_cached, registry.num_imported))
+
+def _run(python, cache):
+	env = dict(os.environ)
+	env['STKO_METADATA_CACHE'] = '1' if cache else '0'
+	env.pop('STKO_METADATA_BENCHMARK', None)
+	res = subprocess.run([python, os.path.abspath(__file__), '--child'], env=env,
+		stdout=subprocess.PIPE, universal_newlines=True, check=True)
+	line = [i for i in res.stdout.splitlines() if i.startswith('RESULT ')][-1]
+	elapsed, count, cached, imported = line.split()[1:]
+	return float(elapsed), int(count), int(cached), int(imported)
+
+def main():
+	parser = argparse.ArgumentParser(description='metadata registry startup benchmark')
+	parser.add_argument('--python', default=sys.executable)
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+	args = parser.parse_args()
+	if args.child:
+		_child()
+		return
+
+	backup = '{}.bak'.format(_CACHE)
+	if os.path.exists(_CACHE):
+		shutil.move(_CACHE, backup)
+	try:
+		def report(label, cache):
+			times = []
+			for i in range(args.repeat if label != 'cold' else 1):
+				if label == 'cold' and os.path.exists(_CACHE):
+					os.remove(_CACHE)
+				elapsed, count, cached, imported = _run(args.python, cache)
+				times.append(elapsed)
+			print('{:8s}: {:8.3f} s  ({} metadata, {} from cache, {} imported)'.format(
+				label, min(times), count, cached, imported))
+		report('no cache', False)
+		report('cold', True)
+		report('warm', True)
+	finally:
+		if os.path.exists(_CACHE):
+			os.remove(_CACHE)
+		if os.path.exists(backup):
+			shutil.move(backup, _CACHE)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,125 @@
+'''
+Measures the time per step of the moving-load runtime procedures
+(opensees/conditions/Loads/Moving/MovingLoadFunctionTemplate.tcl), that locate
+the path segment under each axle and update the nodal masses and loads.
+
+The template is substituted as MovingLoad does, on a synthetic straight path
+(10 km, 10000 segments of random length between 0.5 and 1.5 m) with a 7-axle
+vehicle every 40 s at 27.5 m/s, and the time steps are run from t = 300 s,
+when the path is crowded.
+The OpenSees commands (nodeMass, mass, load, pattern, remove, getPID) are replaced
+by trivial Tcl procedures, so that the measured time is only that of the procedures.
+
+Usage:
+	python benchmarks/moving_load_path_search.py [--steps N] [--tclsh PATH] [--baseline-rev REV] [--check]
+
+--baseline-rev runs also the template found at the given git revision
+(for example the parent of the commit that introduced the bisection search,
+where the segments were searched linearly).
+--check logs the mass and load commands of both runs and compares them.
+'''
+
+import argparse
+import filecmp
+import os
+import random
+import subprocess
+import tempfile
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TEMPLATE = 'opensees/conditions/Loads/Moving/MovingLoadFunctionTemplate.tcl'
+
+def _make_script(template, steps, log_file):
+	rng = random.Random(1)
+	n = 10001
+	pos = [0.0]
+	for i in range(n - 1):
+		pos.append(pos[-1] + rng.uniform(0.5, 1.5))
+	axles = [-10.0, -8.5, -1.5, 0.0, 1.5, 8.5, 10.0]
+	lines = []
+	if log_file:
+		lines.append('set ::LOG [open {{{}}} w]'.format(log_file))
+		lines.append('proc mass {args} {puts $::LOG "mass $args"}')
+		lines.append('proc load {args} {puts $::LOG "load $args"}')
+	else:
+		lines.append('proc mass {args} {}')
+		lines.append('proc load {args} {}')
+	lines.append('proc getPID {} {return 0}')
+	lines.append('proc nodeMass {n d} {return [expr {$n*0.001 + $d}]}')
+	lines.append('proc remove {args} {}')
+	lines.append('proc pattern {type tag ts body} {uplevel 1 $body}')
+	lines.append('set P_path_nodes [list {}]'.format(' '.join(str(i + 1) for i in range(n))))
+	lines.append('set P_path_positions [list {}]'.format(' '.join('{:.10g}'.format(p) for p in pos)))
+	lines.append('set P_path_nodes_pid [list {}]'.format(' '.join('0' for i in range(n))))
+	lines.append('set P_path_nodes_ndf [list {}]'.format(' '.join('6' for i in range(n))))
+	lines.append('set P_axle_positions [list {}]'.format(' '.join(map(str, axles))))
+	lines.append('set P_axle_masses [list {}]'.format(' '.join('1000.0' for a in axles)))
+	lines.append('set P_axle_forces [list {}]'.format(' '.join('-9810.0' for a in axles)))
+	lines.append('set P_pattern 5')
+	lines.append('set P_ts 1')
+	lines.append('set P_modified_nodes [list]')
+	lines.append('set STKO_VAR_time 300.0')
+	lines.append('set STKO_VAR_time_increment 0.01')
+	lines.append('set STKO_VAR_increment 1')
+	for key, value in (
+			('__function_before__', 'P_before'),
+			('__function_after__', 'P_after'),
+			('__pattern__', 'P_pattern'),
+			('__ts__', 'P_ts'),
+			('__path_nodes__', 'P_path_nodes'),
+			('__path_nodes_ndf__', 'P_path_nodes_ndf'),
+			('__path_partitions__', 'P_path_nodes_pid'),
+			('__path_positions__', 'P_path_positions'),
+			('__axle_positions__', 'P_axle_positions'),
+			('__axle_masses__', 'P_axle_masses'),
+			('__axle_forces__', 'P_axle_forces'),
+			('__modified_nodes__', 'P_modified_nodes'),
+			('__velocity__', '27.5'),
+			('__period__', '40.0'),
+			('__t0__', '0.0')):
+		template = template.replace(key, value)
+	lines.append(template)
+	lines.append('set __t0 [clock microseconds]')
+	lines.append('for {{set i 0}} {{$i < {}}} {{incr i}} {{P_before; P_after; set STKO_VAR_time [expr {{$STKO_VAR_time + $STKO_VAR_time_increment}}]}}'.format(steps))
+	lines.append('puts stderr [expr {{([clock microseconds] - $__t0) / 1.0e3 / {}}}]'.format(steps))
+	if log_file:
+		lines.append('close $::LOG')
+	return '\n'.join(lines) + '\n'
+
+def _run(tclsh, template, steps, log_file):
+	with tempfile.NamedTemporaryFile('w', suffix='.tcl', delete=False) as f:
+		f.write(_make_script(template, steps, log_file))
+		file_name = f.name
+	try:
+		res = subprocess.run([tclsh, file_name], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+		return float(res.stderr.strip().splitlines()[-1])
+	finally:
+		os.remove(file_name)
+
+def main():
+	parser = argparse.ArgumentParser(description='moving-load path search benchmark')
+	parser.add_argument('--steps', type=int, default=50)
+	parser.add_argument('--tclsh', default='tclsh')
+	parser.add_argument('--baseline-rev', default=None)
+	parser.add_argument('--check', action='store_true')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as temp_dir:
+		log_current = os.path.join(temp_dir, 'current.log') if args.check else None
+		log_baseline = os.path.join(temp_dir, 'baseline.log') if args.check else None
+		with open(os.path.join(_ROOT, _TEMPLATE), 'r') as f:
+			current = f.read()
+		t = _run(args.tclsh, current, args.steps, log_current)
+		print('current : {:10.3f} ms/step ({} steps)'.format(t, args.steps))
+		if args.baseline_rev:
+			baseline = subprocess.run(
+				['git', '-C', _ROOT, 'show', '{}:{}'.format(args.baseline_rev, _TEMPLATE)],
+				stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+			t = _run(args.tclsh, baseline, args.steps, log_baseline)
+			print('baseline: {:10.3f} ms/step ({} steps)'.format(t, args.steps))
+			if args.check:
+				same = filecmp.cmp(log_current, log_baseline, shallow=False)
+				print('mass/load commands: {}'.format('identical' if same else 'DIFFERENT'))
+
+if __name__ == '__main__':
+	main()
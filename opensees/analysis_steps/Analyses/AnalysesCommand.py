@@ -479,6 +479,15 @@ def writeTcl(pinfo):
 			'__integrator_type__', str(integrator_type)).replace(
 			'__more_int_data__', more_int_data))
 		else:
+			# the adaptive procedure is written only once, and shared by all stages
+			if not pinfo.custom_data.get('STKO_AdaptiveTransientAnalyze', False):
+				template_filename = '{}/template_trans_adapt_proc.tcl'.format(os.path.dirname(__file__))
+				template_file = open(template_filename, 'r')
+				template = template_file.read()
+				template_file.close()
+				pinfo.out_file.write(template)
+				pinfo.out_file.write('\n')
+				pinfo.custom_data['STKO_AdaptiveTransientAnalyze'] = True
 			template_filename = '{}/template_trans_rev.tcl'.format(os.path.dirname(__file__))
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
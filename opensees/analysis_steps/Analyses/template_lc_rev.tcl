@@ -14,7 +14,7 @@ set initial_num_incr __initial_num_incr__
 set max_factor __max_factor__
 set min_factor __min_factor__
 set max_factor_increment __max_factor_incr__
-set min_factor_increment __min_factor__
+set min_factor_increment __min_factor_incr__
 set max_iter __max_iter__
 set desired_iter __des_iter__
 
@@ -0,0 +1,130 @@
+# ======================================================================================
+# ADAPTIVE TRANSIENT ANALYSIS PROCEDURE
+# ======================================================================================
+# Defined once and shared by all adaptive transient stages.
+# The integrator is not re-created at each increment: it must be defined before
+# calling this procedure, and only the time increment passed to analyze changes.
+# total_duration        : the duration of the stage
+# initial_num_incr      : the initial number of increments
+# max_factor            : the maximum time-step factor
+# min_factor            : the minimum time-step factor
+# max_factor_increment  : the maximum increase of the factor in a single increment
+# min_factor_increment  : the maximum decrease of the factor in a single increment
+# max_iter              : the maximum number of iterations
+# desired_iter          : the desired number of iterations
+proc STKO_AdaptiveTransientAnalyze {total_duration initial_num_incr max_factor min_factor max_factor_increment min_factor_increment max_iter desired_iter} {
+
+	global STKO_VAR_process_id
+	global STKO_VAR_increment
+	global STKO_VAR_time
+	global STKO_VAR_time_increment
+	global STKO_VAR_initial_time_increment
+	global STKO_VAR_analyze_done
+	global STKO_VAR_afterAnalyze_done
+	global STKO_VAR_num_iter
+	global STKO_VAR_error_norm
+	global STKO_VAR_percentage
+
+	set STKO_VAR_increment 1
+	set factor 1.0
+	set old_factor $factor
+	set STKO_VAR_time 0.0
+	set initial_time_increment [expr {double($total_duration) / $initial_num_incr}]
+	set time_tolerance [expr {abs($initial_time_increment) * 1.0e-8}]
+	set abs_total_duration [expr {abs($total_duration)}]
+
+	set STKO_VAR_initial_time_increment $initial_time_increment
+
+	while 1 {
+
+		# check end of analysis
+		if {abs($STKO_VAR_time) >= $abs_total_duration} {
+			if {$STKO_VAR_process_id == 0} {
+				puts "Target time has been reached. Current time = $STKO_VAR_time"
+				puts "SUCCESS."
+			}
+			break
+		}
+
+		# compute new adapted time increment
+		set STKO_VAR_time_increment [expr {$initial_time_increment * $factor}]
+		if {abs($STKO_VAR_time + $STKO_VAR_time_increment) > $abs_total_duration - $time_tolerance} {
+			set STKO_VAR_time_increment [expr {$total_duration - $STKO_VAR_time}]
+		}
+
+		# before analyze
+		STKO_CALL_OnBeforeAnalyze
+
+		# perform this step
+		set STKO_VAR_analyze_done [analyze 1 $STKO_VAR_time_increment]
+
+		# update common variables
+		if {$STKO_VAR_analyze_done == 0} {
+			set STKO_VAR_num_iter [testIter]
+			set STKO_VAR_time [expr {$STKO_VAR_time + $STKO_VAR_time_increment}]
+			set STKO_VAR_percentage [expr {$STKO_VAR_time / $total_duration}]
+			if {$STKO_VAR_num_iter > 0} {
+				set STKO_VAR_error_norm [lindex [testNorms] [expr {$STKO_VAR_num_iter - 1}]]
+			} else {
+				set STKO_VAR_error_norm 0.0
+			}
+		}
+
+		# after analyze
+		set STKO_VAR_afterAnalyze_done 0
+		STKO_CALL_OnAfterAnalyze
+
+		# check convergence
+		if {$STKO_VAR_analyze_done == 0} {
+
+			# print statistics
+			if {$STKO_VAR_process_id == 0} {
+				puts [format "Increment: %6d | Iterations: %4d | Norm: %8.3e | Progress: %7.3f %%" $STKO_VAR_increment $STKO_VAR_num_iter $STKO_VAR_error_norm [expr {$STKO_VAR_percentage * 100.0}]]
+			}
+
+			# update adaptive factor
+			set factor_increment [expr {min($max_factor_increment, double($desired_iter) / $STKO_VAR_num_iter)}]
+
+			# check STKO_VAR_afterAnalyze_done. Simulate a reduction similar to non-convergence
+			if {$STKO_VAR_afterAnalyze_done != 0} {
+				set factor_increment [expr {max($min_factor_increment, double($desired_iter) / $max_iter)}]
+				if {$STKO_VAR_process_id == 0} {
+					puts "Reducing increment factor due to custom error controls. Factor = $factor"
+				}
+			}
+
+			set factor [expr {$factor * $factor_increment}]
+			if {$factor > $max_factor} {
+				set factor $max_factor
+			}
+			if {$STKO_VAR_process_id == 0} {
+				if {$factor > $old_factor} {
+					puts "Increasing increment factor due to faster convergence. Factor = $factor"
+				}
+			}
+			set old_factor $factor
+
+			# increment time step
+			incr STKO_VAR_increment
+
+		} else {
+
+			# update adaptive factor
+			set STKO_VAR_num_iter $max_iter
+			set factor_increment [expr {max($min_factor_increment, double($desired_iter) / $max_iter)}]
+			set factor [expr {$factor * $factor_increment}]
+			if {$STKO_VAR_process_id == 0} {
+				puts "Reducing increment factor due to non convergence. Factor = $factor"
+			}
+			if {$factor < $min_factor} {
+				if {$STKO_VAR_process_id == 0} {
+					puts "ERROR: current factor is less then the minimum allowed ($factor < $min_factor)"
+					puts "Giving up"
+				}
+				error "ERROR: the analysis did not converge"
+			}
+		}
+
+	}
+
+}
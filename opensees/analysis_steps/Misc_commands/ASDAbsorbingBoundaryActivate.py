@@ -39,10 +39,12 @@ def writeTcl(pinfo):
 	# find manual elements
 	doc = App.caeDocument()
 	mesh = doc.mesh
+	# (all elements are on process 0 in a sequential model)
+	pindex = pinfo.getPartitionIndex() if pinfo.process_count > 1 else None
 	def _copymanual(prop, domain):
 		if prop and prop.XObject.name in _globals.ptypes:
 			for ele in domain.elements:
-				pid = mesh.partitionData.elementPartition(ele.id)
+				pid = pindex.elementPartition(ele.id) if pindex is not None else 0
 				dest = pid_ele_map.get(pid, None)
 				if dest is None:
 					dest = []
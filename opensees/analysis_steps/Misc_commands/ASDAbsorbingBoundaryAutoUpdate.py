@@ -2,7 +2,6 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
-from scipy.spatial import KDTree
 import numpy as np
 import time
 
@@ -248,16 +247,20 @@ def writeTcl(pinfo):
 	# process
 	src_data, src_indices = _getSourceTreeData(doc, is2D)
 	abs_data, abs_indices = _getAbsorbingTreeData(doc)
+	from scipy.spatial import KDTree
 	tree = KDTree(src_data)
 	_, src_location = tree.query(abs_data, workers=-1)
 	# abs_id abs_pid src_id src_pid
-	mesh = doc.mesh
-	pdata = mesh.partitionData
+	# (all elements are on process 0 in a sequential model)
+	if pinfo.process_count > 1:
+		element_partition = pinfo.getPartitionIndex().elementPartition
+	else:
+		element_partition = lambda ele_id: 0
 	out_data = [ [
 		abs_indices[i], 
-		pdata.elementPartition(abs_indices[i]),
+		element_partition(abs_indices[i]),
 		src_indices[j],
-		pdata.elementPartition(src_indices[j])] for i,j in enumerate(src_location)]
+		element_partition(src_indices[j])] for i,j in enumerate(src_location)]
 	
 	# build command
 	ss = StringIO()
@@ -175,7 +175,7 @@ def writeTcl(pinfo):
 		all_eles = [[] for i in range(pinfo.process_count)]
 		for geom_key, domain in geoms.items():
 			for element in domain.elements:
-				pid = doc.mesh.partitionData.elementPartition(element.id)
+				pid = pinfo.getPartitionIndex().elementPartition(element.id)
 				all_eles[pid].append(element.id)
 		for partition_id in range(pinfo.process_count):
 			pinfo.out_file.write('{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, partition_id))
@@ -218,6 +218,34 @@ def makeXObjectMetaData():
 	at_YLabelAppend.type = MpcAttributeType.String
 	at_YLabelAppend.name = 'YLabelAppend'
 	at_YLabelAppend.group = 'Misc'
+	
+	# Output Files
+	at_flush_steps = MpcAttributeMetaData()
+	at_flush_steps.type = MpcAttributeType.Integer
+	at_flush_steps.name = 'Flush Steps'
+	at_flush_steps.group = 'Output Files'
+	at_flush_steps.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('Flush Steps')+'<br/>') + 
+		html_par('Monitor output files are kept open during the whole analysis. '
+				'Buffered data is written to disk every "Flush Steps" steps or every "Flush Seconds" seconds, whichever comes first.<br/>'
+				'Only the values of the first monitor are used, since they apply to all monitors.<br/>') +
+		html_end()
+		)
+	at_flush_steps.setDefault(100)
+	at_flush_seconds = MpcAttributeMetaData()
+	at_flush_seconds.type = MpcAttributeType.Real
+	at_flush_seconds.name = 'Flush Seconds'
+	at_flush_seconds.group = 'Output Files'
+	at_flush_seconds.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('Flush Seconds')+'<br/>') + 
+		html_par('Monitor output files are kept open during the whole analysis. '
+				'Buffered data is written to disk every "Flush Steps" steps or every "Flush Seconds" seconds, whichever comes first.<br/>'
+				'Only the values of the first monitor are used, since they apply to all monitors.<br/>') +
+		html_end()
+		)
+	at_flush_seconds.setDefault(1.0)
 
 	#attribute Plot X
 	xom = MpcXObjectMetaData()
@@ -254,6 +282,9 @@ def makeXObjectMetaData():
 	
 	xom.addAttribute(at_XLabelAppend)
 	xom.addAttribute(at_YLabelAppend)
+	
+	xom.addAttribute(at_flush_steps)
+	xom.addAttribute(at_flush_seconds)
 
 	xom.setVisibilityDependency(xom.getAttribute('Monitor Plot'), xom.getAttribute('Type/X'))
 	xom.setVisibilityDependency(xom.getAttribute('Monitor Plot'), xom.getAttribute('Result/X'))
@@ -305,6 +336,19 @@ def _get_plot_name(xobj):
 	else:
 		return 'STKO_plot_monitor{}'.format(xobj.parent.componentId)
 
+def _get_node_responses(xobj):
+	'''
+	returns the list of (tcl command, component) pairs read by a monitor
+	'''
+	responses = []
+	if not xobj.getAttribute('Monitor Plot').boolean:
+		return responses
+	for COMP in ['X', 'Y']:
+		if xobj.getAttribute('Type/{}'.format(COMP)).string == 'Results {} Axis Plot'.format(COMP):
+			cmd, components = _monitor_globals.MAP_RES_COMP[xobj.getAttribute('Result/{}'.format(COMP)).string]
+			responses.append((cmd, components[xobj.getAttribute('Component/{}'.format(COMP)).string]))
+	return responses
+
 def writeTcl(pinfo):
 	
 	# first checks
@@ -332,15 +376,144 @@ def writeTcl(pinfo):
 				f.write('{}\t {}\n'.format(xAxis.valueAt(i), yAxis.valueAt(i)))
 	
 	def nodePartitions(node_id):
-		partitions = []
-		for process_id in range(pinfo.process_count):
-			if doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
-				partitions.append(process_id)
-		return partitions
+		return pinfo.getPartitionIndex().nodePartitions(node_id)
+	
+	def nodeResponse(COMP):
+		# node responses read by more than one monitor axis are cached at each step
+		response = (tcl_res[COMP], tcl_component[COMP])
+		if response in pinfo.custom_data.get('MonitorSharedResponses', ()):
+			return '[STKO_MonitorNodeResponse {} $node_id {}]'.format(*response)
+		return '[{} $node_id {}]'.format(*response)
+	
+	def nodeOwnership(tags, res, operation):
+		# returns, for each process, the nodes reduced locally and the nodes
+		# whose partition values must be summed on process 0 before reducing them
+		local_nodes = [[] for i in range(pinfo.process_count)]
+		shared_nodes = [[] for i in range(pinfo.process_count)]
+		for node_id in tags:
+			partitions = nodePartitions(node_id)
+			if len(partitions) == 0:
+				continue
+			if res in _monitor_globals.MAP_RES_PARALLEL_AVG:
+				# same value on all partitions: take it from the first one only
+				local_nodes[partitions[0]].append(node_id)
+			elif len(partitions) == 1 or operation == 'Sum' or operation == 'Average':
+				# partition values can be summed in any order
+				for process_id in partitions:
+					local_nodes[process_id].append(node_id)
+			else:
+				for process_id in partitions:
+					shared_nodes[process_id].append(node_id)
+		return local_nodes, shared_nodes
 	
-	def nodePartitionsPairString(node_id):
-		partitions = nodePartitions(node_id)
-		return '{} {{{}}}'.format(node_id, ' '.join( [str(pid) for pid in partitions] ))
+	def processNodesString(nodes):
+		return ' '.join(['{} {{{}}}'.format(process_id, ' '.join([str(node_id) for node_id in pnodes])) for process_id, pnodes in enumerate(nodes)])
+	
+	def accumulate(indent, var, value, operation):
+		if operation == 'Sum' or operation == 'Average':
+			return '{0}set {1} [expr ${1} + {2}]\n'.format(indent, var, value)
+		return (
+			'{0}if {{${1}_set == 0}} {{\n'
+			'{0}\tset {1} {2}\n'
+			'{0}\tset {1}_set 1\n'
+			'{0}}} else {{\n'
+			'{0}\tset {1} [expr {3} (${1} , {2})]\n'
+			'{0}}}\n'
+		).format(indent, var, value, 'max' if operation == 'Maximum' else 'min')
+	
+	def initialize(indent, var, operation):
+		s = '{}set {} 0.0\n'.format(indent, var)
+		if operation == 'Maximum' or operation == 'Minimum':
+			s += '{}set {}_set 0\n'.format(indent, var)
+		return s
+	
+	def finalize(indent, COMP):
+		# Scale and Add results
+		s = ''
+		if operation[COMP] == 'Average':
+			s += '{0}set monitor_value_{1} [expr $monitor_value_{1}/{2}]\n'.format(indent, COMP, num_nodes[COMP])
+		s += '{}set monitor_value_{} [expr {} * $monitor_value_{} + {}]\n'.format(
+			indent, COMP, geta('ScaleFactor/{}'.format(COMP)).real, COMP, geta('Add/{}'.format(COMP)).real)
+		return s
+	
+	def localReduction(COMP):
+		op = operation[COMP]
+		var = 'monitor_partial_{}'.format(COMP)
+		s = '\t# partial {} of {} on the nodes of this process\n'.format(op, tcl_res[COMP])
+		s += '\tglobal nodes_local_{}_{}\n'.format(COMP, id_monitor)
+		s += initialize('\t', var, op)
+		s += '\tforeach node_id [dict get $nodes_local_{}_{} $STKO_VAR_process_id] {{\n'.format(COMP, id_monitor)
+		s += '\t\tset node_value {}\n'.format(nodeResponse(COMP))
+		s += accumulate('\t\t', var, '$node_value', op)
+		s += '\t}\n'
+		if op == 'Maximum' or op == 'Minimum':
+			s += '\tif {{${0}_set == 0}} {{\n\t\tset {0} {{}}\n\t}}\n'.format(var)
+		if has_shared[COMP]:
+			s += '\t# values of nodes shared with other processes\n'
+			s += '\tglobal nodes_shared_{}_{}\n'.format(COMP, id_monitor)
+			s += '\tset monitor_shared_{} {{}}\n'.format(COMP)
+			s += '\tforeach node_id [dict get $nodes_shared_{}_{} $STKO_VAR_process_id] {{\n'.format(COMP, id_monitor)
+			s += '\t\tlappend monitor_shared_{} $node_id {}\n'.format(COMP, nodeResponse(COMP))
+			s += '\t}\n'
+		return s
+	
+	def parallelReduction():
+		# one message from each process to process 0
+		message = []
+		for COMP in ['X', 'Y']:
+			if type_name[COMP] == 'Results {} Axis Plot'.format(COMP):
+				message.append(COMP)
+				if has_shared[COMP]:
+					message.append('shared_{}'.format(COMP))
+		if len(message) == 0:
+			return ''
+		s = (
+			'\t# gather partial results on process 0\n'
+			'\tset monitor_message [list {}]\n'
+			'\tif {{$STKO_VAR_process_id != 0}} {{\n'
+			'\t\tsend -pid 0 $monitor_message\n'
+			'\t}} else {{\n'
+			'\t\tset monitor_messages [list $monitor_message]\n'
+			'\t\tfor {{set node_pid 1}} {{$node_pid < {}}} {{incr node_pid}} {{\n'
+			'\t\t\trecv -pid $node_pid monitor_message\n'
+			'\t\t\tlappend monitor_messages $monitor_message\n'
+			'\t\t}}\n'
+		).format(' '.join(['$monitor_{}'.format(i if i.startswith('shared') else 'partial_{}'.format(i)) for i in message]), pinfo.process_count)
+		for COMP in ['X', 'Y']:
+			if not COMP in message:
+				continue
+			op = operation[COMP]
+			var = 'monitor_value_{}'.format(COMP)
+			s += '\t\t# reduce {} ({})\n'.format(COMP, op)
+			s += initialize('\t\t', var, op)
+			if has_shared[COMP]:
+				s += '\t\tset monitor_shared_{} [dict create]\n'.format(COMP)
+			s += '\t\tforeach monitor_message $monitor_messages {\n'
+			s += '\t\t\tset p_node_value [lindex $monitor_message {}]\n'.format(message.index(COMP))
+			if op == 'Maximum' or op == 'Minimum':
+				s += '\t\t\tif {$p_node_value ne {}} {\n'
+				s += accumulate('\t\t\t\t', var, '$p_node_value', op)
+				s += '\t\t\t}\n'
+			else:
+				s += accumulate('\t\t\t', var, '$p_node_value', op)
+			if has_shared[COMP]:
+				s += (
+					'\t\t\tforeach {{node_id p_node_value}} [lindex $monitor_message {1}] {{\n'
+					'\t\t\t\tif {{[dict exists $monitor_shared_{0} $node_id]}} {{\n'
+					'\t\t\t\t\tdict set monitor_shared_{0} $node_id [expr [dict get $monitor_shared_{0} $node_id] + $p_node_value]\n'
+					'\t\t\t\t}} else {{\n'
+					'\t\t\t\t\tdict set monitor_shared_{0} $node_id $p_node_value\n'
+					'\t\t\t\t}}\n'
+					'\t\t\t}}\n'
+				).format(COMP, message.index('shared_{}'.format(COMP)))
+			s += '\t\t}\n'
+			if has_shared[COMP]:
+				s += '\t\tdict for {{node_id node_value}} $monitor_shared_{} {{\n'.format(COMP)
+				s += accumulate('\t\t\t', var, '$node_value', op)
+				s += '\t\t}\n'
+			s += finalize('\t\t', COMP)
+		s += '\t}\n'
+		return s
 	
 	# quick return
 	if not geta("Monitor Plot").boolean:
@@ -394,21 +567,35 @@ def writeTcl(pinfo):
 	# write a comment
 	f.write('\n# Monitor Actor [{}]\n'.format(id_monitor))
 	
-	# write nodes and partitions here outside the monitor actor function
+	# write nodes and partitions here outside the monitor actor function.
+	# in parallel, each process reduces locally the nodes in nodes_local, and
+	# collects (node, value) pairs for the nodes in nodes_shared, whose value
+	# must be summed among partitions before a Maximum or Minimum reduction.
+	# this way each process sends a single message to process 0 at each step.
 	# for each component...
+	operation = {}
+	num_nodes = {}
+	has_shared = {}
 	for COMP in ['X', 'Y']:
 		itype = type_name[COMP]
 		if itype == 'Results {} Axis Plot'.format(COMP):
+			operation[COMP] = geta('Operation/{}'.format(COMP)).string
 			# get nodes from all selection set entitites
 			sset_at = geta('Selection Set/{}'.format(COMP))
 			sset = doc.selectionSets[sset_at.index]
 			tags = __get_set_nodes(doc, sset)
+			num_nodes[COMP] = len(tags)
 			# write nodes and partition map if necessary
-			f.write('set nodes_{}_{} {{{}}}\n'.format(COMP, id_monitor, ' '.join([ str(node_id) for node_id in tags ])))
 			if is_par:
-				f.write('set nodes_partitions_{}_{} [dict create {} ]\n'.format(
-					COMP, id_monitor, ' '.join( [nodePartitionsPairString(node_id) for node_id in tags ])
-				))
+				local_nodes, shared_nodes = nodeOwnership(tags, tcl_res[COMP], operation[COMP])
+				f.write('set nodes_local_{}_{} [dict create {}]\n'.format(
+					COMP, id_monitor, processNodesString(local_nodes)))
+				has_shared[COMP] = any(shared_nodes)
+				if has_shared[COMP]:
+					f.write('set nodes_shared_{}_{} [dict create {}]\n'.format(
+						COMP, id_monitor, processNodesString(shared_nodes)))
+			else:
+				f.write('set nodes_{}_{} {{{}}}\n'.format(COMP, id_monitor, ' '.join([ str(node_id) for node_id in tags ])))
 	
 	# open the monitor actor function
 	f.write('set MonitorActor{}_once_flag 0\n'.format(id_monitor))
@@ -418,20 +605,21 @@ def writeTcl(pinfo):
 			f.write('set last_step_id_previous_stage_{0}_{1} 0\n'.format(COMP,id_monitor))
 			f.write('set previous_step_id_{0}_{1} 1\n'.format(COMP,id_monitor))
 			f.write('set previous_monitor_value_{0}_{1} 1\n'.format(COMP,id_monitor))
+	f.write('set MonitorActor{}_plot {{}}\n'.format(id_monitor))
 	f.write('proc MonitorActor{} {{}} {{\n'.format(id_monitor))
 	f.write('\tglobal MonitorActor{}_once_flag\n'.format(id_monitor))
+	f.write('\tglobal MonitorActor{}_plot\n'.format(id_monitor))
 	f.write('\tglobal STKO_VAR_process_id\n')
 	f.write('\tglobal STKO_VAR_increment\n')
 	
-	# write commands for opening files and optionally computing reactions
+	# write commands for opening files (only once, the file is kept open
+	# and flushed by the timing monitor actor) and optionally computing reactions
 	def plot_begin(indent):
 		return (
 			'{0}\tif {{$MonitorActor{1}_once_flag == 0}} {{\n'
 			'{0}\t\tset MonitorActor{1}_once_flag 1\n'
-			'{0}\t\tset STKO_plot_00 [open "./{4}.plt" w+]\n'
-			'{0}\t\tputs $STKO_plot_00 "{2}\t{3}"\n'
-			'{0}\t}} else {{\n'
-			'{0}\t\tset STKO_plot_00 [open "./{4}.plt" a+]\n'
+			'{0}\t\tset MonitorActor{1}_plot [STKO_MonitorOpen "./{4}.plt"]\n'
+			'{0}\t\tputs $MonitorActor{1}_plot "{2}\t{3}"\n'
 			'{0}\t}}\n'
 		).format(indent, id_monitor, xLabel + ' ' + xLabelAppend.replace("[","\["), yLabel + ' ' + yLabelAppend.replace("[","\["), _get_plot_name(xobj))
 	if is_par:
@@ -441,14 +629,14 @@ def writeTcl(pinfo):
 	else:
 		f.write(plot_begin(''))
 	if tcl_resX == 'nodeReaction' or tcl_resY == 'nodeReaction':
-		f.write('\treactions\n')
+		f.write('\tSTKO_MonitorReactions\n')
 	
 	# write cmd for creating X Y data in TCL
 	# for each component...
 	for COMP in ['X', 'Y']:
 		itype = type_name[COMP]
 		if itype == 'Pseudo Time':
-			f.write('\tset monitor_value_{} [getTime "%e"]\n'.format(COMP))
+			f.write('\tset monitor_value_{} [STKO_MonitorTime]\n'.format(COMP))
 		elif itype == 'Time Step ID':
 			# just for plotting we plot in order all steps not returning to 0 at each new stage
 			f.write('\tglobal last_step_id_previous_stage_{0}_{1}\n'.format(COMP,id_monitor))
@@ -462,117 +650,36 @@ def writeTcl(pinfo):
 			f.write('\tset previous_step_id_{0}_{1} $STKO_VAR_increment\n'.format(COMP,id_monitor))
 			f.write('\tset previous_monitor_value_{0}_{1} $monitor_value_{0}\n'.format(COMP,id_monitor))
 		elif itype == 'Results {} Axis Plot'.format(COMP):
-			# initialize output variable (only in process 0)
-			operation = geta('Operation/{}'.format(COMP)).string
-			# Scaling factor 
-			scale = geta('ScaleFactor/{}'.format(COMP)).real
-			# Add constant factor
-			add = geta('Add/{}'.format(COMP)).real
-			# Initialize variable
 			if is_par:
-				f.write('\tif {$STKO_VAR_process_id == 0} {\n')
-				f.write('\t\tset monitor_value_{} 0.0\n'.format(COMP))
-				if operation == 'Maximum' or operation == 'Minimum':
-					f.write('\t\tset monitor_value_{}_set 0\n'.format(COMP))
-				f.write('\t}\n')
-			else:
-				f.write('\tset monitor_value_{} 0.0\n'.format(COMP))
-				if operation == 'Maximum' or operation == 'Minimum':
-					f.write('\tset monitor_value_{}_set 0\n'.format(COMP))
+				# partial result of this process, reduced on process 0 later
+				f.write(localReduction(COMP))
+				continue
+			# initialize output variable
+			f.write('\tset monitor_value_{} 0.0\n'.format(COMP))
+			if operation[COMP] == 'Maximum' or operation[COMP] == 'Minimum':
+				f.write('\tset monitor_value_{}_set 0\n'.format(COMP))
 			# begin node loop...
 			f.write('\tglobal nodes_{0}_{1}\n'.format(COMP, id_monitor))
-			if is_par:
-				f.write('\tglobal nodes_partitions_{0}_{1}\n'.format(COMP, id_monitor))
 			f.write('\tforeach node_id $nodes_{}_{} {{\n'.format(COMP, id_monitor))
-			# get node value, sequential or parallel on each processor,
-			# and in parallel version send them to process 0
-			if is_par:
-				f.write('\t\t# get node value.\n\t\t# initialize accumulated value on P0\n')
-				f.write('\t\tif {$STKO_VAR_process_id == 0} {\n')
-				f.write('\t\t\tset node_value 0.0\n')
-				f.write('\t\t}\n')
-				f.write('\t\tset inode_partitions [dict get $nodes_partitions_{}_{} $node_id]\n'.format(COMP, id_monitor))
-				f.write('\t\tforeach node_pid $inode_partitions {\n')
-				# partition loop begin
-				f.write((
-					'\t\t\t# obtain p_process_value\n'
-					'\t\t\tif {{$node_pid == $STKO_VAR_process_id}} {{\n'
-					'\t\t\t\tset p_node_value [{0} $node_id {1}]\n'
-					'\t\t\t}}\n'
-					'\t\t\t# accumulate on node_value\n'
-					'\t\t\tif {{$node_pid == $STKO_VAR_process_id}} {{\n'
-					'\t\t\t\tif {{$STKO_VAR_process_id != 0}} {{\n'
-					'\t\t\t\t\tsend -pid 0 $p_node_value\n'
-					'\t\t\t\t}} else {{\n'
-					'\t\t\t\t\tset node_value [expr $node_value + $p_node_value]\n'
-					'\t\t\t\t}}\n'
-					'\t\t\t}} else {{\n'
-					'\t\t\t\tif {{$STKO_VAR_process_id == 0}} {{\n'
-					'\t\t\t\t\trecv -pid $node_pid p_node_value\n'
-					'\t\t\t\t\tset node_value [expr $node_value + $p_node_value]\n'
-					'\t\t\t\t}}\n'
-					'\t\t\t}}\n'
-				).format(tcl_res[COMP], tcl_component[COMP]))
-				# partition loop end
-				f.write('\t\t}\n')
-				# based on the result type we may need to do an average from the partition loop
-				if tcl_res[COMP] in _monitor_globals.MAP_RES_PARALLEL_AVG:
-					f.write((
-						'\t\t# average value from partitions ({0})\n'
-						'\t\tif {{$STKO_VAR_process_id == 0}} {{\n'
-						'\t\t\tset node_value [expr $node_value/[llength $inode_partitions].0]\n'
-						'\t\t}}\n'
-					).format(tcl_res[COMP]))
-			else:
-				f.write('\t\t# get node value\n')
-				f.write('\t\tset node_value [{} $node_id {}]\n'.format(tcl_res[COMP], tcl_component[COMP]))
-			# write by operation type only on process 0
-			if is_par:
-				f.write('\t\tif {$STKO_VAR_process_id == 0} {\n')
-			def _pwrite(what):
-				if is_par:
-					f.write('\t{}'.format(what))
-				else:
-					f.write(what)
-			if operation == 'Sum':
-				_pwrite('\t\tset monitor_value_{0} [expr $monitor_value_{0} + $node_value]\n'.format(COMP))
-			elif operation == 'Average':
-				_pwrite('\t\tset monitor_value_{0} [expr $monitor_value_{0} + $node_value]\n'.format(COMP))
-			elif operation == 'Maximum':
-				_pwrite('\t\tif {{$monitor_value_{0}_set == 0}} {{\n'.format(COMP))
-				_pwrite('\t\t\tset monitor_value_{0} $node_value\n'.format(COMP))
-				_pwrite('\t\t\tset monitor_value_{0}_set 1\n'.format(COMP))
-				_pwrite('\t\t} else {\n')
-				_pwrite('\t\t\tset monitor_value_{0} [expr max ($monitor_value_{0} , $node_value)]\n'.format(COMP))
-				_pwrite('\t\t}\n')
-			elif operation == 'Minimum':
-				_pwrite('\t\tif {{$monitor_value_{0}_set == 0}} {{\n'.format(COMP))
-				_pwrite('\t\t\tset monitor_value_{0} $node_value\n'.format(COMP))
-				_pwrite('\t\t\tset monitor_value_{0}_set 1\n'.format(COMP))
-				_pwrite('\t\t} else {\n')
-				_pwrite('\t\t\tset monitor_value_{0} [expr min ($monitor_value_{0} , $node_value)]\n'.format(COMP))
-				_pwrite('\t\t}\n')
-			if is_par:
-				f.write('\t\t}\n')
+			# get node value
+			f.write('\t\t# get node value\n')
+			f.write('\t\tset node_value {}\n'.format(nodeResponse(COMP)))
+			# write by operation type
+			f.write(accumulate('\t\t', 'monitor_value_{}'.format(COMP), '$node_value', operation[COMP]))
 			f.write('\t}\n') # end node loop
-			# Scale and Add results only on process 0
-			if is_par:
-				f.write('\tif {$STKO_VAR_process_id == 0} {\n')
-			if operation == 'Average':
-				_pwrite('\tset monitor_value_{0} [expr $monitor_value_{0}/[llength $nodes_{0}_{1}]]\n'.format(COMP,id_monitor))
-			_pwrite('\tset monitor_value_{} [expr {} * $monitor_value_{} + {}]\n'.format(COMP,scale,COMP,add))
-			if is_par:
-				f.write('\t}\n')
+			f.write(finalize('\t', COMP))
+	
+	# reduce partial results on process 0, with a single message from each process
+	if is_par:
+		f.write(parallelReduction())
 	
 	# write values
 	if is_par:
 		f.write('\tif {$STKO_VAR_process_id == 0} {\n')
-		f.write('\t\tputs $STKO_plot_00 "$monitor_value_X\t$monitor_value_Y"\n')
-		f.write('\t\tclose $STKO_plot_00\n')
+		f.write('\t\tputs $MonitorActor{}_plot "$monitor_value_X\t$monitor_value_Y"\n'.format(id_monitor))
 		f.write('\t}\n')
 	else:
-		f.write('\tputs $STKO_plot_00 "$monitor_value_X\t$monitor_value_Y"\n')
-		f.write('\tclose $STKO_plot_00\n')
+		f.write('\tputs $MonitorActor{}_plot "$monitor_value_X\t$monitor_value_Y"\n'.format(id_monitor))
 	
 	# open the monitor actor function
 	f.write('}\n')
@@ -581,7 +688,9 @@ def writeTcl(pinfo):
 def initializeMonitor(pinfo):
 	
 	# check that all monitors with custom names
+	# and find node responses read by more than one monitor axis
 	used_names = {}
+	used_responses = {}
 	doc = App.caeDocument()
 	for id, step in doc.analysisSteps.items():
 		xobj = step.XObject
@@ -592,6 +701,10 @@ def initializeMonitor(pinfo):
 				raise Exception('Monitor [{}] has a name ("{}") which is already used by Monitor [{}].\nPlease provide unique names'.format(id, name, other))
 			else:
 				used_names[name] = id
+			for response in _get_node_responses(xobj):
+				used_responses[response] = used_responses.get(response, 0) + 1
+	pinfo.custom_data['MonitorSharedResponses'] = set(
+		[response for response, count in used_responses.items() if count > 1])
 	
 	# copy the STKOMonitor python app from the external_solver directory
 	# to the current output directory
@@ -617,9 +730,97 @@ def initializeMonitor(pinfo):
 			fmon.write('./STKOMonitor/STKOMonitor.sh')
 		os.chmod(launcher_name, 0o777)
 	
+	# the flush interval of the monitor output files is taken from the first monitor
+	xobj = pinfo.analysis_step.XObject
+	flush_steps = 100
+	flush_seconds = 1.0
+	if xobj.getAttribute('Flush Steps') is not None:
+		flush_steps = max(xobj.getAttribute('Flush Steps').integer, 1)
+	if xobj.getAttribute('Flush Seconds') is not None:
+		flush_seconds = max(xobj.getAttribute('Flush Seconds').real, 0.0)
+	
+	# write the utilities for the monitor output files.
+	# they are kept open during the whole analysis, flushed by the timing
+	# monitor actor, and closed before the final wipe
+	f.write('\n# Monitor output files\n')
+	f.write('set STKO_VAR_MonitorChannels {}\n')
+	f.write('set STKO_VAR_MonitorFlushSteps {}\n'.format(flush_steps))
+	f.write('set STKO_VAR_MonitorFlushMilliseconds {}\n'.format(int(flush_seconds*1000.0)))
+	f.write('set STKO_VAR_MonitorFlushCounter 0\n')
+	f.write('set STKO_VAR_MonitorFlushTime [clock milliseconds]\n')
+	f.write('proc STKO_MonitorOpen {file_name} {\n')
+	f.write('\tglobal STKO_VAR_MonitorChannels\n')
+	f.write('\tset channel [open $file_name w+]\n')
+	f.write('\tfconfigure $channel -buffering full -buffersize 1048576\n')
+	f.write('\tlappend STKO_VAR_MonitorChannels $channel\n')
+	f.write('\treturn $channel\n')
+	f.write('}\n')
+	f.write('proc STKO_MonitorFlush {} {\n')
+	f.write('\tglobal STKO_VAR_MonitorChannels\n')
+	f.write('\tglobal monitor_actor_time_0\n')
+	f.write('\tforeach channel $STKO_VAR_MonitorChannels {\n')
+	f.write('\t\tflush $channel\n')
+	f.write('\t}\n')
+	f.write('\tset STKO_time [open "./STKO_time_monitor.tim" w+]\n')
+	f.write('\tputs $STKO_time $monitor_actor_time_0\n')
+	f.write('\tputs $STKO_time [clock seconds]\n')
+	f.write('\tclose $STKO_time\n')
+	f.write('}\n')
+	f.write('proc STKO_MonitorClose {} {\n')
+	f.write('\tglobal STKO_VAR_MonitorChannels\n')
+	f.write('\tglobal STKO_VAR_process_id\n')
+	f.write('\tif {$STKO_VAR_process_id == 0} {\n')
+	f.write('\t\tSTKO_MonitorFlush\n')
+	f.write('\t\tforeach channel $STKO_VAR_MonitorChannels {\n')
+	f.write('\t\t\tclose $channel\n')
+	f.write('\t\t}\n')
+	f.write('\t\tset STKO_VAR_MonitorChannels {}\n')
+	f.write('\t}\n')
+	f.write('}\n')
+	
+	# write the step cache shared by all monitor actors.
+	# it is reset by the first monitor function at each step, so that reactions
+	# and the current time are computed once, and node responses read by more
+	# than one monitor are fetched once
+	f.write('\n# Monitor step cache\n')
+	f.write('set STKO_VAR_MonitorReactionsDone 0\n')
+	f.write('set STKO_VAR_MonitorTime {}\n')
+	f.write('proc MonitorActorBeginStep {} {\n')
+	f.write('\tglobal STKO_VAR_MonitorReactionsDone\n')
+	f.write('\tglobal STKO_VAR_MonitorTime\n')
+	f.write('\tglobal STKO_VAR_MonitorResponses\n')
+	f.write('\tset STKO_VAR_MonitorReactionsDone 0\n')
+	f.write('\tset STKO_VAR_MonitorTime {}\n')
+	f.write('\tarray unset STKO_VAR_MonitorResponses\n')
+	f.write('}\n')
+	f.write('lappend STKO_VAR_MonitorFunctions "MonitorActorBeginStep"\n')
+	f.write('proc STKO_MonitorReactions {} {\n')
+	f.write('\tglobal STKO_VAR_MonitorReactionsDone\n')
+	f.write('\tif {$STKO_VAR_MonitorReactionsDone == 0} {\n')
+	f.write('\t\treactions\n')
+	f.write('\t\tset STKO_VAR_MonitorReactionsDone 1\n')
+	f.write('\t}\n')
+	f.write('}\n')
+	f.write('proc STKO_MonitorTime {} {\n')
+	f.write('\tglobal STKO_VAR_MonitorTime\n')
+	f.write('\tif {$STKO_VAR_MonitorTime eq {}} {\n')
+	f.write('\t\tset STKO_VAR_MonitorTime [getTime "%e"]\n')
+	f.write('\t}\n')
+	f.write('\treturn $STKO_VAR_MonitorTime\n')
+	f.write('}\n')
+	f.write('proc STKO_MonitorNodeResponse {response node_id dof} {\n')
+	f.write('\tglobal STKO_VAR_MonitorResponses\n')
+	f.write('\tset key "$response $node_id $dof"\n')
+	f.write('\tif {![info exists STKO_VAR_MonitorResponses($key)]} {\n')
+	f.write('\t\tset STKO_VAR_MonitorResponses($key) [$response $node_id $dof]\n')
+	f.write('\t}\n')
+	f.write('\treturn $STKO_VAR_MonitorResponses($key)\n')
+	f.write('}\n')
+	
 	# write the stats monitor actor
 	f.write('\n# Statistics monitor actor\n')
 	f.write('set MonitorActorStatistics_once_flag 0\n')
+	f.write('set MonitorActorStatistics_file {}\n')
 	f.write('proc MonitorActorStatistics {} {\n')
 	f.write('\tglobal STKO_VAR_process_id\n')
 	f.write('\tglobal STKO_VAR_increment\n')
@@ -629,33 +830,37 @@ def initializeMonitor(pinfo):
 	f.write('\tglobal STKO_VAR_error_norm\n')
 	f.write('\tglobal STKO_VAR_percentage\n')
 	f.write('\tglobal MonitorActorStatistics_once_flag\n')
+	f.write('\tglobal MonitorActorStatistics_file\n')
 	f.write('\t# Statistics\n')
 	f.write('\tif {$STKO_VAR_process_id == 0} {\n')
 	f.write('\t\tif {$MonitorActorStatistics_once_flag == 0} {\n')
 	f.write('\t\t\tset MonitorActorStatistics_once_flag 1\n')
-	f.write('\t\t\tset STKO_monitor_statistics [open "./STKO_monitor_statistics.stats"  w+]\n')
-	f.write('\t\t} else {\n')
-	f.write('\t\t\tset STKO_monitor_statistics [open "./STKO_monitor_statistics.stats"  a+]\n')
+	f.write('\t\t\tset MonitorActorStatistics_file [STKO_MonitorOpen "./STKO_monitor_statistics.stats"]\n')
 	f.write('\t\t}\n')
-	f.write('\t\tputs $STKO_monitor_statistics "$STKO_VAR_increment $STKO_VAR_time_increment $STKO_VAR_time $STKO_VAR_num_iter $STKO_VAR_error_norm $STKO_VAR_percentage"\n')
-	f.write('\t\tclose $STKO_monitor_statistics\n')
+	f.write('\t\tputs $MonitorActorStatistics_file "$STKO_VAR_increment $STKO_VAR_time_increment $STKO_VAR_time $STKO_VAR_num_iter $STKO_VAR_error_norm $STKO_VAR_percentage"\n')
 	f.write('\t}\n')
 	f.write('}\n')
 	f.write('lappend STKO_VAR_MonitorFunctions "MonitorActorStatistics"\n')
 	
-	# write the timer monitor actor
+	# write the timer monitor actor.
+	# it also flushes the monitor output files when the flush interval is reached
 	f.write('\n# Timing monitor actor\n')
 	f.write('set monitor_actor_time_0 [clock seconds]\n')
 	f.write('proc MonitorActorTiming {} {\n')
-	f.write('\tglobal monitor_actor_time_0\n')
 	f.write('\tglobal STKO_VAR_process_id\n')
+	f.write('\tglobal STKO_VAR_MonitorFlushSteps\n')
+	f.write('\tglobal STKO_VAR_MonitorFlushMilliseconds\n')
+	f.write('\tglobal STKO_VAR_MonitorFlushCounter\n')
+	f.write('\tglobal STKO_VAR_MonitorFlushTime\n')
 	f.write('\tif {$STKO_VAR_process_id == 0} {\n')
-	f.write('\t\tset STKO_time [open "./STKO_time_monitor.tim" w+]\n')
-	f.write('\t\tset current_time [clock seconds]\n')
-	f.write('\t\tputs $STKO_time $monitor_actor_time_0\n')
-	f.write('\t\tputs $STKO_time $current_time\n')
-	f.write('\t\tclose $STKO_time\n')
+	f.write('\t\tincr STKO_VAR_MonitorFlushCounter\n')
+	f.write('\t\tset current_time [clock milliseconds]\n')
+	f.write('\t\tif {$STKO_VAR_MonitorFlushCounter >= $STKO_VAR_MonitorFlushSteps || $current_time - $STKO_VAR_MonitorFlushTime >= $STKO_VAR_MonitorFlushMilliseconds} {\n')
+	f.write('\t\t\tset STKO_VAR_MonitorFlushCounter 0\n')
+	f.write('\t\t\tset STKO_VAR_MonitorFlushTime $current_time\n')
+	f.write('\t\t\tSTKO_MonitorFlush\n')
+	f.write('\t\t}\n')
 	f.write('\t}\n')
 	f.write('}\n')
 	f.write('lappend STKO_VAR_MonitorFunctions "MonitorActorTiming"\n')
-	f.write('')
+	f.write('')
\ No newline at end of file
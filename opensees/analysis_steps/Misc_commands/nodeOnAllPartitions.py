@@ -81,13 +81,18 @@ def writeTcl(pinfo):
 					for node in elem.nodes:
 						map_node[node.id] = (node.x, node.y, node.z)
 	
+	# nothing to do in a sequential model, all nodes are on the only process
+	if pinfo.process_count < 2:
+		return
+	pindex = pinfo.getPartitionIndex()
+	
 	process_block_count = 0
 	FMT = pinfo.get_double_formatter()
-	for process_id in range(len(doc.mesh.partitionData.partitions)):
+	for process_id in range(pindex.process_count):
 		pinfo.setProcessId(process_id)
 		first_done = False
 		for node_id in map_node:
-			if doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
+			if pindex.isNodeOnPartition(node_id, process_id):
 				continue
 			else:
 				if not first_done:
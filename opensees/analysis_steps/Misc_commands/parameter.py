@@ -172,7 +172,7 @@ def writeTcl(pinfo):
 				aux_elements = pinfo.auto_generated_element_data_map.get(elem.id, None)
 				source_pid = 0
 				if pinfo.process_count > 1:
-					source_pid = doc.mesh.partitionData.elementPartition(elem.id)
+					source_pid = pinfo.getPartitionIndex().elementPartition(elem.id)
 				if aux_elements is not None:
 					for aux_ele_id in aux_elements.elements:
 						# add this element to parametrized elements
@@ -212,7 +212,7 @@ def writeTcl(pinfo):
 						if auto_gen_elements_pid_map[elem_id] != process_id:
 							continue
 					else:
-						if doc.mesh.partitionData.elementPartition(elem_id) != process_id:
+						if pinfo.getPartitionIndex().elementPartition(elem_id) != process_id:
 							continue
 					if (check):
 						str_addToParameter.append('\n{}{}# addToParameter\n'.format(pinfo.indent, Indent))
@@ -292,7 +292,7 @@ def writeTcl(pinfo):
 				
 				for node_id in parameter_map_node:
 					if (node_id in pinfo.node_to_model_map):
-						if not doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
+						if not pinfo.getPartitionIndex().isNodeOnPartition(node_id, process_id):
 							continue
 						if (check):
 							str_addToParameter.append('\n{}{}# addToParameter\n'.format(pinfo.indent, Indent))
@@ -1,5 +1,5 @@
 # enable default distribution tester for this module
-from opensees.analysis_steps.Misc_commands.utils.tester.RayleighDampingTester import *
+from opensees.analysis_steps.Misc_commands.utils.tester.EnableRayleighDampingTester import *
 
 import PyMpc.Units as u
 from PyMpc import *
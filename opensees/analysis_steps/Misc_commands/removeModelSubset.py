@@ -138,8 +138,7 @@ def writeTcl(pinfo):
 	
 	# get the document
 	doc = App.caeDocument()
-	pdata = doc.mesh.partitionData
-	is_partitioned = (len(pdata.partitions) > 1)
+	is_partitioned = (pinfo.process_count > 1)
 	
 	# write a comment
 	pinfo.out_file.write('\n{}# removeModelSubset [{}] {}\n'.format(
@@ -170,9 +169,15 @@ def writeTcl(pinfo):
 	
 	# write for sequential or partitioned models
 	if is_partitioned:
-		for process_id in range(len(pdata.partitions)):
-			rem_nodes_p = [i for i in rem_nodes if pdata.isNodeOnPartition(i, process_id)]
-			rem_eles_p = [i for i in rem_eles if pdata.elementPartition(i) == process_id]
+		# split nodes and elements by partition, in a single pass
+		pindex = pinfo.getPartitionIndex()
+		per_part_nodes = pindex.splitNodes(rem_nodes)
+		per_part_eles = [[] for i in range(pindex.process_count)]
+		for i in rem_eles:
+			per_part_eles[pindex.elementPartition(i)].append(i)
+		for process_id in range(pindex.process_count):
+			rem_nodes_p = per_part_nodes[process_id]
+			rem_eles_p = per_part_eles[process_id]
 			if len(rem_nodes_p) + len(rem_eles_p) > 0:
 				pinfo.setProcessId(process_id)
 				pinfo.out_file.write('{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, process_id))
@@ -113,7 +113,7 @@ def writeTcl(pinfo):
 				aux_elements = pinfo.auto_generated_element_data_map.get(elem.id, None)
 				source_pid = 0
 				if pinfo.process_count > 1:
-					source_pid = doc.mesh.partitionData.elementPartition(elem.id)
+					source_pid = pinfo.getPartitionIndex().elementPartition(elem.id)
 				if aux_elements is not None:
 					num_eles = len(aux_elements.elements)
 					num_conn = len(aux_elements.elements_connectivity)
@@ -150,7 +150,7 @@ def writeTcl(pinfo):
 	if pinfo.process_count > 1:
 		for ele_id in parameter_map_elem:
 			if not ele_id in auto_gen_elements_pid_map:
-				pid = doc.mesh.partitionData.elementPartition(ele_id)
+				pid = pinfo.getPartitionIndex().elementPartition(ele_id)
 				pid_values = pid_element_map.get(pid, None)
 				if pid_values is None:
 					pid_values = []
@@ -371,65 +371,3 @@ class RayleighDampingTesterWidget(QWidget):
 		except:
 			exdata = traceback.format_exc().splitlines()
 			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
-
-class RayleighDampingGuiGlobals:
-	# stores a reference to the gui generated for this object
-	gui = None
-
-def __removeGui():
-	if RayleighDampingGuiGlobals.gui is not None:
-		RayleighDampingGuiGlobals.gui.setParent(None)
-		RayleighDampingGuiGlobals.gui.deleteLater()
-		RayleighDampingGuiGlobals.gui = None
-
-def onEditorClosing(editor, xobj):
-	__removeGui()
-
-def onEditFinished(editor, xobj):
-	if RayleighDampingGuiGlobals.gui is not None:
-		RayleighDampingGuiGlobals.gui.onEditFinished()
-
-def onEditBegin_Tester(editor, xobj):
-	__removeGui()
-	RayleighDampingGuiGlobals.gui = RayleighDampingTesterWidget(editor,xobj)
-	for i in xobj.attributes:
-		if xobj.attributes[i].group == 'Rayleigh Input Parameters':
-			update = True
-			f1 = xobj.getAttribute('f1/Rayleigh').real
-			w1 = 2.0 *math.pi * f1
-			f2 = xobj.getAttribute('f2/Rayleigh').real
-			w2 = 2.0 *math.pi * f2
-			csi1 =  xobj.getAttribute('damp_1/Rayleigh').real
-			csi2 =  xobj.getAttribute('damp_2/Rayleigh').real
-			if abs(w1- w2) < 1.0e-3 :
-				a0 =0.0
-				a1=0.0
-			else :
-				a0= 2.0* w1 * w2 *(csi1*w2- csi2 *w1)/(w2*w2-w1*w1)
-				a1= 2.0 *(csi2*w2- csi1 *w1)/(w2*w2-w1*w1)
-			xobj.getAttribute('alphaM/Rayleigh').real= a0
-			xobj.getAttribute('Betak/Rayleigh').real = a1
-	RayleighDampingGuiGlobals.gui.onTestClicked()
-
-def onAttributeChanged_Tester(editor, xobj, name):#attendere Max per far fare il cambio della vista senza uscire dall'editor
-	update = False
-	attribute = xobj.getAttribute(name)
-	if attribute.group == 'Rayleigh Input Parameters':
-		update = True
-		f1 = xobj.getAttribute('f1/Rayleigh').real
-		w1 = 2.0 *math.pi * f1
-		f2 = xobj.getAttribute('f2/Rayleigh').real
-		w2 = 2.0 *math.pi * f2
-		csi1 =  xobj.getAttribute('damp_1/Rayleigh').real
-		csi2 =  xobj.getAttribute('damp_2/Rayleigh').real
-		if abs(w1- w2) < 1.0e-3 :
-			a0 =0.0
-			a1=0.0
-		else :
-			a0= 2.0* w1 * w2 *(csi1*w2- csi2 *w1)/(w2*w2-w1*w1)
-			a1= 2.0 *(csi2*w2- csi1 *w1)/(w2*w2-w1*w1)
-		xobj.getAttribute('alphaM/Rayleigh').real= a0
-		xobj.getAttribute('Betak/Rayleigh').real = a1
-	
-	if update :
-		RayleighDampingGuiGlobals.gui.onTestClicked()
@@ -206,10 +206,6 @@ def writeTcl_mpConstraints(pinfo):
 	
 	# element ASDEmbeddedNodeElement $Tag  $Cnode   $Rnode1 $Rnode2 $Rnode3 <$Rnode4>   <-K $K> <-rot> <-p> <-KP $KP>
 	
-	# Utility functions ====================================================================================
-	
-	import numpy as np
-	
 	# the XObject
 	xobj = pinfo.condition.XObject
 	
@@ -235,6 +231,62 @@ def writeTcl_mpConstraints(pinfo):
 	KP = '-KP {}'.format(KP_value) if (_geta(xobj, 'Constrain Pressure').boolean and _geta(xobj, '-KP').boolean) else ''
 	tol = _geta(xobj, 'tolerance').real
 	
+	# collect all link elements, with their constrained node and the trial
+	# embedding sub-simplices (3-node triangles or 4-node tetrahedra) of their source element
+	links = []
+	candidates = []
+	points = []
+	for inter in all_inter:
+		# get info about master geometry and do some checks
+		if inter.type != MpcInteractionType.NodeToElement:
+			raise Exception(_err(pinfo.condition.id, 
+				'Interaction "{}" [{}] should be a Node-to-Element interaction, not {}.'.format(
+					inter.name, inter.id, inter.type)
+					))
+		# process all link elements
+		moi = doc.mesh.getMeshedInteraction(inter.id)
+		for elem in moi.elements:
+			# number of retained nodes and constrained nodes
+			NN = len(elem.nodes)
+			NM = elem.numberOfMasterNodes()
+			NS = NN - NM
+			if NS != 1:
+				raise Exception(_err(pinfo.condition.id, 'Link element should have only 1 constrained node'))
+			# the constrained node
+			Cnode = elem.nodes[-1]
+			# get source element
+			source_elem = elem.sourceElement
+			if source_elem is None:
+				raise Exception(_err(pinfo.condition.id, 'Link element should have a valid source element'))
+			# check source element and extract the trial embedding sub-simplices
+			family = source_elem.geometryFamilyType()
+			if family == MpcElementGeometryFamilyType.Triangle:
+				# for any triangle, the first 3 nodes are the corner ones
+				trials = [[source_elem.nodes[i] for i in range(3)]]
+			elif family == MpcElementGeometryFamilyType.Tetrahedron:
+				# for any tetrahedron, the first 4 nodes are the corner ones
+				trials = [[source_elem.nodes[i] for i in range(4)]]
+			elif family == MpcElementGeometryFamilyType.Quadrilateral:
+				# for any quadrilateral, the first 4 nodes are the corner ones.
+				# we need to find the closest sub-simplex
+				trials = [[source_elem.nodes[i] for i in sub] for sub in ebu.QSubs]
+			elif family == MpcElementGeometryFamilyType.Hexahedron:
+				# for any hexahedron, the first 8 nodes are the corner ones.
+				# we need to find the closest sub-simplex
+				trials = [[source_elem.nodes[i] for i in sub] for sub in ebu.HSubs]
+			else:
+				# unsupported element type
+				raise Exception(_err(pinfo.condition.id, 
+					'The source element (master geometry) of the Link element {} '
+					'has a wrong family type ({})'.format(elem.id, family)
+					))
+			links.append((elem, Cnode))
+			candidates.append(trials)
+			points.append((Cnode.x, Cnode.y, Cnode.z))
+	
+	# locate all constrained nodes at once
+	embedding = ebu.closest_subsimplex_batch(candidates, points) if len(links) > 0 else []
+	
 	# some stats
 	stats = [0, 0]
 	
@@ -242,104 +294,42 @@ def writeTcl_mpConstraints(pinfo):
 	def internal(process_id, process_block_count):
 		# first-done flag for partitioned process
 		first_done = False
-		# process each interaction
-		for inter in all_inter:
-			# get info about master geometry and do some checks
-			if inter.type != MpcInteractionType.NodeToElement:
-				raise Exception(_err(pinfo.condition.id, 
-					'Interaction "{}" [{}] should be a Node-to-Element interaction, not {}.'.format(
-						inter.name, inter.id, inter.type)
-						))
-			# process all link elements
-			moi = doc.mesh.getMeshedInteraction(inter.id)
-			for elem in moi.elements:
-				# skip elements not on this partition
-				if is_partitioned:
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
-						continue
-				# number of retained nodes and constrained nodes
-				NN = len(elem.nodes)
-				NM = elem.numberOfMasterNodes()
-				NS = NN - NM
-				if NS != 1:
-					raise Exception(_err(pinfo.condition.id, 'Link element should have only 1 constrained node'))
-				# the constrained node
-				Cnode = elem.nodes[-1]
-				Cpos = np.asarray([[Cnode.x],[Cnode.y], [Cnode.z]])
-				# get source element
-				source_elem = elem.sourceElement
-				if source_elem is None:
-					raise Exception(_err(pinfo.condition.id, 'Link element should have a valid source element'))
-				# check source element and extract embedding sub-simplex (3-node triangle or 4-node tetrahedron)
-				retained_nodes = []
-				distance = 1.0e10
-				family = source_elem.geometryFamilyType()
-				if family == MpcElementGeometryFamilyType.Triangle:
-					# for any triangle, the first 3 nodes are the corner ones
-					retained_nodes = [source_elem.nodes[i] for i in range(3)]
-					_, distance = ebu.lct3(retained_nodes, Cpos)
-				elif family == MpcElementGeometryFamilyType.Tetrahedron:
-					# for any tetrahedron, the first 4 nodes are the corner ones
-					retained_nodes = [source_elem.nodes[i] for i in range(4)]
-					_, distance = ebu.lct4(retained_nodes, Cpos)
-				elif family == MpcElementGeometryFamilyType.Quadrilateral:
-					# for any quadrilateral, the first 4 nodes are the corner ones.
-					# we need to find the closest sub-simplex
-					aux = []
-					for sub in ebu.QSubs:
-						trial_nodes = [source_elem.nodes[i] for i in sub]
-						_, trial_distance = ebu.lct3(trial_nodes, Cpos)
-						aux.append((trial_nodes, trial_distance))
-					aux = sorted(aux, key = lambda variable: variable[1])
-					retained_nodes = aux[0][0]
-					distance = aux[0][1]
-				elif family == MpcElementGeometryFamilyType.Hexahedron:
-					# for any hexahedron, the first 8 nodes are the corner ones.
-					# we need to find the closest sub-simplex
-					aux = []
-					for sub in ebu.HSubs:
-						trial_nodes = [source_elem.nodes[i] for i in sub]
-						_, trial_distance = ebu.lct4(trial_nodes, Cpos)
-						aux.append((trial_nodes, trial_distance))
-					aux = sorted(aux, key = lambda variable: variable[1])
-					retained_nodes = aux[0][0]
-					distance = aux[0][1]
+		# process all link elements
+		for (elem, Cnode), (retained_nodes, distance) in zip(links, embedding):
+			# skip elements not on this partition
+			if is_partitioned:
+				if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
+					continue
+			# check distance
+			if distance > tol:
+				if ignore_outside:
+					stats[1] += 1
+					continue
 				else:
-					# unsupported element type
 					raise Exception(_err(pinfo.condition.id, 
-						'The source element (master geometry) of the Link element {} '
-						'has a wrong family type ({})'.format(elem.id, family)
+						'The constrained node of the Link element {} '
+						'is outside the embedding domain (error = {} %; Max allowed error = {} %)'.format(elem.id, distance*100.0, tol*100.0)
 						))
-				# check distance
-				if distance > tol:
-					if ignore_outside:
-						stats[1] += 1
-						continue
+			# open process if-statement block
+			block_indent = ''
+			if is_partitioned:
+				block_indent = pinfo.tabIndent
+				if not first_done:
+					if process_block_count == 0:
+						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
 					else:
-						raise Exception(_err(pinfo.condition.id, 
-							'The constrained node of the Link element {} '
-							'is outside the embedding domain (error = {} %; Max allowed error = {} %)'.format(elem.id, distance*100.0, tol*100.0)
-							))
-				# open process if-statement block
-				block_indent = ''
-				if is_partitioned:
-					block_indent = pinfo.tabIndent
-					if not first_done:
-						if process_block_count == 0:
-							pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						else:
-							pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						first_done = True
-				# write this element
-				pinfo.out_file.write(
-					'{}{}element ASDEmbeddedNodeElement {}  {}   {}   -K {} {} {} {}\n'.format(
-						pinfo.indent, block_indent, elem.id, Cnode.id, 
-						' '.join(str(Rnode.id) for Rnode in retained_nodes),
-						K, rot, pressure, KP
-						)
+						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					first_done = True
+			# write this element
+			pinfo.out_file.write(
+				'{}{}element ASDEmbeddedNodeElement {}  {}   {}   -K {} {} {} {}\n'.format(
+					pinfo.indent, block_indent, elem.id, Cnode.id, 
+					' '.join(str(Rnode.id) for Rnode in retained_nodes),
+					K, rot, pressure, KP
 					)
-				stats[0] += 1
-		# end-for-each-interaction
+				)
+			stats[0] += 1
+		# end-for-each-link-element
 		# update process block count
 		if is_partitioned:
 			if first_done:
@@ -78,4 +78,96 @@ class ASDEmbeddedNodeElementUtils:
 			iN = N[i][0]
 			if iN < 0.0:
 				distance = max(distance, -iN)
-		return ((x,y,z), distance)
\ No newline at end of file
+		return ((x,y,z), distance)
+	
+	# local coordinates from global coordinates of many triangles at once.
+	# X is a (n,3,3) array with the position matrices of the triangles,
+	# G is a (n,3,1) array with the global coordinates of the points.
+	# it gives the same results of lct3, with one call for all triangles
+	def lct3_batch(X, G):
+		dN = np.asarray([
+			[-1.0, -1.0, 0.0],
+			[1.0, 0.0, 0.0],
+			[0.0, 1.0, 0.0]])
+		J = np.matmul(X,dN)
+		vz = np.cross(J[:,:,0], J[:,:,1])
+		vn = np.sqrt(np.matmul(vz[:,None,:], vz[:,:,None])[:,0,0])
+		vz /= np.maximum(vn, 1.0e-16)[:,None]
+		J[:,:,2] = vz
+		iJ = np.linalg.inv(J)
+		P = np.matmul(X,np.asarray([[1.0],[0.0],[0.0]]))
+		D = G-P
+		L = np.matmul(iJ,D)
+		x,y = L[:,0,0], L[:,1,0]
+		N = np.stack((1.0-x-y, x, y), axis=1)
+		distance = np.max(np.where(N < 0.0, -N, 0.0), axis=1)
+		return (np.stack((x,y), axis=1), distance)
+	
+	# local coordinates from global coordinates of many tetrahedra at once.
+	# X is a (n,3,4) array with the position matrices of the tetrahedra,
+	# G is a (n,3,1) array with the global coordinates of the points.
+	# it gives the same results of lct4, with one call for all tetrahedra
+	def lct4_batch(X, G):
+		dN = np.asarray([
+			[-1.0, -1.0, -1.0],
+			[1.0, 0.0, 0.0],
+			[0.0, 1.0, 0.0],
+			[0.0, 0.0, 1.0]])
+		J = np.matmul(X,dN)
+		iJ = np.linalg.inv(J)
+		P = np.matmul(X,np.asarray([[1.0],[0.0],[0.0],[0.0]]))
+		D = G-P
+		L = np.matmul(iJ,D)
+		x,y,z = L[:,0,0], L[:,1,0], L[:,2,0]
+		N = np.stack((1.0-x-y-z, x, y, z), axis=1)
+		distance = np.max(np.where(N < 0.0, -N, 0.0), axis=1)
+		return (np.stack((x,y,z), axis=1), distance)
+	
+	# finds the closest sub-simplex of many host elements at once.
+	# candidates is a list with one item for each point. each item is a list
+	# of trial sub-simplices (lists of 3 or 4 nodes, all of the same size).
+	# points is a list with the (x,y,z) coordinates of the points.
+	# returns a list with the (nodes, distance) of the closest sub-simplex
+	# for each point. on ties, the first trial sub-simplex wins
+	def closest_subsimplex_batch(candidates, points):
+		# node coordinates, each node is read only once
+		node_index = {}
+		node_coords = []
+		# trial sub-simplices, grouped by size
+		groups = {3 : ([], []), 4 : ([], [])}
+		location = []
+		for trials, point in zip(candidates, points):
+			size = len(trials[0])
+			ids, pids = groups[size]
+			location.append((size, len(ids)))
+			pid = len(node_coords)
+			node_coords.append(point)
+			for trial in trials:
+				trial_ids = []
+				for node in trial:
+					index = node_index.get(node.id, None)
+					if index is None:
+						index = len(node_coords)
+						node_index[node.id] = index
+						node_coords.append((node.x, node.y, node.z))
+					trial_ids.append(index)
+				ids.append(trial_ids)
+				pids.append(pid)
+		node_coords = np.asarray(node_coords, dtype=float).reshape((-1,3))
+		# distances of all trial sub-simplices
+		distances = {}
+		for size, func in ((3, ASDEmbeddedNodeElementUtils.lct3_batch), (4, ASDEmbeddedNodeElementUtils.lct4_batch)):
+			ids, pids = groups[size]
+			if len(ids) == 0:
+				continue
+			X = np.ascontiguousarray(node_coords[np.asarray(ids)].transpose(0,2,1))
+			G = np.ascontiguousarray(node_coords[np.asarray(pids)].reshape((-1,3,1)))
+			_, distance = func(X, G)
+			distances[size] = distance.tolist()
+		# pick the closest one for each point
+		results = []
+		for trials, (size, start) in zip(candidates, location):
+			distance = distances[size]
+			best = min(range(len(trials)), key = lambda i: distance[start+i])
+			results.append((trials[best], distance[start+best]))
+		return results
@@ -268,7 +268,7 @@ def writeTcl_mpConstraints(pinfo):
 			for elem in moi.elements:
 				# skip elements not on this partition
 				if is_partitioned:
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
+					if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
 						continue
 				# number of retained nodes and constrained nodes
 				NN = len(elem.nodes)
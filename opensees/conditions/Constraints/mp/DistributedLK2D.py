@@ -109,7 +109,7 @@ def __processEdgeDistributedLK (pinfo, doc, all_geom, alpha_T, C_T, alpha, C, is
 				vect_y = orientation_matrix.col(1)
 				# check partitioning
 				if is_partitioned :
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
+					if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
 						continue
 					if not first_done:
 						if process_block_count == 0:
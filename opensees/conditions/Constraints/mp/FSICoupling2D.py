@@ -2,6 +2,7 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
+from opensees.conditions.utils import writeProcessBlock
 
 def makeXObjectMetaData():
 	
@@ -74,13 +75,12 @@ def getRequestedNodalSpatialDim(xobj):
 			requested_node_dim_map[mid] = (2, 3)
 	return requested_node_dim_map
 
-def ensureNodesOnPartitions(xobj, pmap):
+def ensureNodesOnPartitions(xobj, pmap, pindex):
 	# make sure a master node is on every partition a slave node is
 	doc = App.caeDocument()
 	if doc is None: return
 	if doc.mesh is None: return
-	process_count = len(doc.mesh.partitionData.partitions)
-	if process_count <= 1: return
+	if pindex.process_count <= 1: return
 	all_inter = xobj.parent.assignment.interactions
 	for inter in all_inter:
 		moi = doc.mesh.getMeshedInteraction(inter.id)
@@ -93,13 +93,16 @@ def ensureNodesOnPartitions(xobj, pmap):
 			if master_parts is None:
 				master_parts = []
 				pmap[master_id] = master_parts
-			for process_id in range(process_count):
-				if doc.mesh.partitionData.isNodeOnPartition(slave_id, process_id):
-					if not process_id in master_parts:
-						master_parts.append(process_id)
+			for process_id in pindex.nodePartitions(slave_id):
+				if not process_id in master_parts:
+					master_parts.append(process_id)
 
-def __process_coupling (doc, pinfo, is_partitioned, all_inter, process_id, process_block_count, type):
-	first_done = False
+def __process_coupling (doc, pinfo, is_partitioned, all_inter, type):
+	# returns the commands of each process (only 1 if not partitioned),
+	# processing all link elements only once
+	per_process_commands = [[] for i in range(pinfo.process_count if is_partitioned else 1)]
+	if is_partitioned:
+		pindex = pinfo.getPartitionIndex()
 	for inter in all_inter:
 		moi = doc.mesh.getMeshedInteraction(inter.id)
 		for elem in moi.elements:
@@ -115,15 +118,11 @@ def __process_coupling (doc, pinfo, is_partitioned, all_inter, process_id, proce
 				# The above does not work good with transformation method. the MP constraint should be in every partition
 				# the slave node belongs to. Note that we are sure that also the master node will be in that partition since
 				# they belong to a link element in stko mesh.
-				if not doc.mesh.partitionData.isNodeOnPartition(slave_id, process_id):
+				process_ids = pindex.nodePartitions(slave_id)
+				if len(process_ids) == 0:
 					continue
-				
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
+			else:
+				process_ids = (0,)
 			
 			if (master_id in pinfo.node_to_model_map) and (slave_id in pinfo.node_to_model_map):
 				
@@ -131,24 +130,23 @@ def __process_coupling (doc, pinfo, is_partitioned, all_inter, process_id, proce
 				(ndm_slave, ndf_slave) = pinfo.node_to_model_map[slave_id]
 				if (ndm_master != ndm_slave):
 					raise Exception('Error in FSICoupling: master and slave nodes must have the same NDM. master NDM = {}, slave NDM = {}'.format(ndm_master, ndm_slave))
+				# (an empty command still opens the process block, as it did before)
+				command = ''
 				if type == 'Interface to Fluid':
 					if ndf_slave != 1:
 						raise Exception('Error in FSICoupling: slave node must have 1 DOF')
-					pinfo.out_file.write('{}equalDOF_Mixed {} {}   1   3 1\n'.format(pinfo.indent, master_id, slave_id))
+					command = '{}equalDOF_Mixed {} {}   1   3 1\n'.format(pinfo.indent, master_id, slave_id)
 				elif type == 'Interface to Solid':
 					if ndf_slave < 2:
 						raise Exception('Error in FSICoupling: slave node must have at least 2 DOFs')
-					pinfo.out_file.write('{}equalDOF {} {}  1 2\n'.format(pinfo.indent, master_id, slave_id))
+					command = '{}equalDOF {} {}  1 2\n'.format(pinfo.indent, master_id, slave_id)
+				for process_id in process_ids:
+					per_process_commands[process_id].append(command)
 				
 			else :
 				raise Exception('Error: node not in domain {} {}'.format((master_id in pinfo.node_to_model_map), (slave_id in pinfo.node_to_model_map)))
 			
-	if is_partitioned:
-		if first_done:
-			process_block_count += 1
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
+	return per_process_commands
 
 def writeTcl_mpConstraints(pinfo):
 	
@@ -180,10 +178,12 @@ def writeTcl_mpConstraints(pinfo):
 	is_partitioned = False
 	if pinfo.process_count > 1:
 		is_partitioned = True
+	per_process_commands = __process_coupling(doc, pinfo, is_partitioned, all_inter, type)
 	if is_partitioned:
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			pinfo.setProcessId(process_id)
-			process_block_count = __process_coupling(doc, pinfo, is_partitioned, all_inter, process_id, process_block_count, type)
+			process_block_count = writeProcessBlock(pinfo, process_id, process_block_count, per_process_commands[process_id])
 	else :
-		__process_coupling(doc, pinfo, is_partitioned, all_inter, 0, 0, type)
\ No newline at end of file
+		for command in per_process_commands[0]:
+			pinfo.out_file.write(command)
\ No newline at end of file
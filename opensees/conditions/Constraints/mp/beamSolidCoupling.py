@@ -118,7 +118,7 @@ def __beamSolidCoupling (doc, all_inter, pinfo, type, is_2d, is_partitioned, pro
 					raise Exception('Error: NDM: {} not supported for beamSolidCoupling'.format(ndm_map))
 			# set the first_done flag
 			if is_partitioned:
-				if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
+				if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
 					continue
 				if not first_done:
 					if process_block_count == 0:
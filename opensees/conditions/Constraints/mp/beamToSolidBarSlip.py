@@ -169,7 +169,7 @@ def __beamToSolidBarSlip (doc, all_inter, pinfo, type, is_partitioned, process_i
 				if (ndm_map != 3 or ndf_map != 6):
 					raise Exception('Error: The beamToSolidBarSlip command works only for problems in 3 ndm and 6 ndf for master node')
 			if is_partitioned:
-				if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
+				if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
 					continue
 				if not first_done:
 					if process_block_count == 0:
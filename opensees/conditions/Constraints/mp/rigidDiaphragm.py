@@ -1,6 +1,7 @@
 import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
+from opensees.conditions.utils import writeProcessBlock
 
 def makeXObjectMetaData():
 	
@@ -111,13 +112,12 @@ def getRequestedNodalSpatialDim(xobj):
 	
 	return requested_node_dim_map
 
-def ensureNodesOnPartitions(xobj, pmap):
+def ensureNodesOnPartitions(xobj, pmap, pindex):
 	# make sure a master node is on every partition a slave node is
 	doc = App.caeDocument()
 	if doc is None: return
 	if doc.mesh is None: return
-	process_count = len(doc.mesh.partitionData.partitions)
-	if process_count <= 1: return
+	if pindex.process_count <= 1: return
 	all_inter = xobj.parent.assignment.interactions
 	for inter in all_inter:
 		moi = doc.mesh.getMeshedInteraction(inter.id)
@@ -129,15 +129,19 @@ def ensureNodesOnPartitions(xobj, pmap):
 			if master_parts is None:
 				master_parts = []
 				pmap[master_id] = master_parts
-			for process_id in range(process_count):
-				for slave_counter in range(1, len(elem.nodes)):
-					slave_id = elem.nodes[slave_counter].id
-					if doc.mesh.partitionData.isNodeOnPartition(slave_id, process_id):
-						if not process_id in master_parts:
-							master_parts.append(process_id)
+			for slave_counter in range(1, len(elem.nodes)):
+				slave_id = elem.nodes[slave_counter].id
+				for process_id in pindex.nodePartitions(slave_id):
+					if not process_id in master_parts:
+						master_parts.append(process_id)
 
-def __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, process_id, process_block_count, indent):
-	first_done = False
+def __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, indent):
+	# returns the commands of each process (only 1 if not partitioned),
+	# processing all link elements only once
+	num_processes = pinfo.process_count if is_partitioned else 1
+	per_process_commands = [[] for i in range(num_processes)]
+	if is_partitioned:
+		pindex = pinfo.getPartitionIndex()
 	for inter in all_inter:
 		moi = doc.mesh.getMeshedInteraction(inter.id)
 		for elem in moi.elements:
@@ -146,9 +150,6 @@ def __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, pr
 			if (len(elem.nodes) < 2 or elem.numberOfMasterNodes() != 1):
 				raise Exception('wrong master-slave connectivity, expected: 1 master, N(>0) slaves, given: {} masters, {} slaves'.format(elem.numberOfMasterNodes(), elem.numberOfSlaveNodes()))
 			
-			# init string of slave nodes
-			node_slave = ''
-			
 			# get master node
 			mid = elem.nodes[0].id
 			if (mid in pinfo.node_to_model_map):
@@ -157,9 +158,9 @@ def __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, pr
 				if (ndm_map != 3 or ndf_map != 6):
 					raise Exception('Error: The rigidDiaphragm command works only for problems in 3 ndm and 6 ndf')
 			
-			# compute string of slave nodes
-			num_slaves = 0
-			n = 1 # variable to handle line length
+			# split the slave nodes by process
+			# (i is the position in the element, used to handle the line length)
+			per_process_slaves = [[] for i in range(num_processes)]
 			for i in range(1, len(elem.nodes)):
 				inode_id = elem.nodes[i].id
 				if (inode_id in pinfo.node_to_model_map):
@@ -169,40 +170,29 @@ def __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, pr
 						raise Exception('Error: The rigidDiaphragm command works only for problems in 3 ndm and 6 ndf')
 				
 				if is_partitioned:
-					if not doc.mesh.partitionData.isNodeOnPartition(inode_id, process_id):
-						continue
-				
-				num_slaves += 1
-				if (i == (15*n)):
-					node_slave += ' \\\n    {}'.format(inode_id)
-					n += 1
+					for process_id in pindex.nodePartitions(inode_id):
+						per_process_slaves[process_id].append((i, inode_id))
 				else:
-					node_slave += ' {}'.format(inode_id)
+					per_process_slaves[0].append((i, inode_id))
 			
-			# skip if not slave on this process
-			if num_slaves == 0:
-				continue
-			
-			# in parallel mode: check whether we have to open the if/elseif block (do it only before first element)
-			# the choise of if or elseif comes from process_block_count
-			if is_partitioned:
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+			# compute string of slave nodes for each process
+			for process_id in range(num_processes):
+				slaves = per_process_slaves[process_id]
+				# skip if not slave on this process
+				if len(slaves) == 0:
+					continue
+				node_slave = ''
+				n = 1 # variable to handle line length
+				for i, inode_id in slaves:
+					if (i == (15*n)):
+						node_slave += ' \\\n    {}'.format(inode_id)
+						n += 1
 					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
-			
-			# now write the string into the file
-			pinfo.updateModelBuilder(3, 6)
-			str_tcl = '{}{}rigidDiaphragm {} {}{}\n'.format(pinfo.indent, indent, perpDirn, mid, node_slave)
-			pinfo.out_file.write(str_tcl)
+						node_slave += ' {}'.format(inode_id)
+				str_tcl = '{}{}rigidDiaphragm {} {}{}\n'.format(pinfo.indent, indent, perpDirn, mid, node_slave)
+				per_process_commands[process_id].append(str_tcl)
 		
-	if is_partitioned:
-		if first_done: # if at least 1 element has been processed in this process_id...
-			process_block_count += 1 # increment block count to see if we have to use if or elseif
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-	return process_block_count
+	return per_process_commands
 
 def writeTcl_mpConstraints(pinfo):
 	
@@ -233,11 +223,18 @@ def writeTcl_mpConstraints(pinfo):
 	is_partitioned = False
 	if pinfo.process_count > 1:
 		is_partitioned = True
+	# the model builder is updated before writing each command
+	def on_command():
+		pinfo.updateModelBuilder(3, 6)
 	if is_partitioned:
+		per_process_commands = __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, pinfo.tabIndent)
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			pinfo.setProcessId(process_id)
-			process_block_count = __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, process_id, process_block_count, pinfo.tabIndent)
+			process_block_count = writeProcessBlock(pinfo, process_id, process_block_count, per_process_commands[process_id], on_command)
 	
 	else:
-		__process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, 0, 0, pinfo.indent)
\ No newline at end of file
+		per_process_commands = __process_rigidDiaphram (doc, pinfo, perpDirn, is_partitioned, all_inter, pinfo.indent)
+		for command in per_process_commands[0]:
+			on_command()
+			pinfo.out_file.write(command)
\ No newline at end of file
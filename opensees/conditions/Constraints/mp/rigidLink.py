@@ -1,6 +1,7 @@
 import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
+from opensees.conditions.utils import writeProcessBlock
 
 def makeXObjectMetaData():
 	
@@ -176,13 +177,12 @@ def getRequestedNodalSpatialDim(xobj):
 	
 	return requested_node_dim_map
 
-def ensureNodesOnPartitions(xobj, pmap):
+def ensureNodesOnPartitions(xobj, pmap, pindex):
 	# make sure a master node is on every partition a slave node is
 	doc = App.caeDocument()
 	if doc is None: return
 	if doc.mesh is None: return
-	process_count = len(doc.mesh.partitionData.partitions)
-	if process_count <= 1: return
+	if pindex.process_count <= 1: return
 	all_inter = xobj.parent.assignment.interactions
 	for inter in all_inter:
 		if (inter.type == MpcInteractionType.NodeToElement):
@@ -196,15 +196,18 @@ def ensureNodesOnPartitions(xobj, pmap):
 			if master_parts is None:
 				master_parts = []
 				pmap[master_id] = master_parts
-			for process_id in range(process_count):
-				for slave_counter in range(1, len(elem.nodes)):
-					slave_id = elem.nodes[slave_counter].id
-					if doc.mesh.partitionData.isNodeOnPartition(slave_id, process_id):
-						if not process_id in master_parts:
-							master_parts.append(process_id)
+			for slave_counter in range(1, len(elem.nodes)):
+				slave_id = elem.nodes[slave_counter].id
+				for process_id in pindex.nodePartitions(slave_id):
+					if not process_id in master_parts:
+						master_parts.append(process_id)
 
-def __process_rigidLink (doc, pinfo, is_partitioned, all_inter, process_id, process_block_count, type, indent):
-	first_done = False
+def __process_rigidLink (doc, pinfo, is_partitioned, all_inter, type, indent):
+	# returns the commands of each process (only 1 if not partitioned),
+	# processing all link elements only once
+	per_process_commands = [[] for i in range(pinfo.process_count if is_partitioned else 1)]
+	if is_partitioned:
+		pindex = pinfo.getPartitionIndex()
 	for inter in all_inter:
 		if (inter.type == MpcInteractionType.NodeToElement):
 			raise Exception('Error: type of interactions must be "NodeToNode" or "GeneralLink" and not "{}"'.format(inter.type))
@@ -241,25 +244,16 @@ def __process_rigidLink (doc, pinfo, is_partitioned, all_inter, process_id, proc
 					# The above does not work good with transformation method. the MP constraint should be in every partition
 					# the slave node belongs to. Note that we are sure that also the master node will be in that partition since
 					# they belong to a link element in stko mesh.
-					if not doc.mesh.partitionData.isNodeOnPartition(slave_id, process_id):
-						continue
+					process_ids = pindex.nodePartitions(slave_id)
+				else:
+					process_ids = (0,)
 				
 				# write
-				if is_partitioned:
-					if not first_done:
-						if process_block_count == 0:
-							pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						else:
-							pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						first_done = True
-				pinfo.out_file.write('{}{}rigidLink {} {} {}\n'.format(pinfo.indent, indent, type, master_id, slave_id))
+				command = '{}{}rigidLink {} {} {}\n'.format(pinfo.indent, indent, type, master_id, slave_id)
+				for process_id in process_ids:
+					per_process_commands[process_id].append(command)
 				
-	if is_partitioned:
-		if first_done:
-			process_block_count += 1
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
+	return per_process_commands
 
 def writeTcl_mpConstraints(pinfo):
 	
@@ -321,9 +315,12 @@ def writeTcl_mpConstraints(pinfo):
 	if pinfo.process_count > 1:
 		is_partitioned = True
 	if is_partitioned:
+		per_process_commands = __process_rigidLink (doc, pinfo, is_partitioned, all_inter, type, pinfo.tabIndent)
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
-			process_block_count = __process_rigidLink (doc, pinfo, is_partitioned, all_inter, process_id, process_block_count, type, pinfo.tabIndent)
+			process_block_count = writeProcessBlock(pinfo, process_id, process_block_count, per_process_commands[process_id])
 	
 	else:
-		__process_rigidLink (doc, pinfo, is_partitioned, all_inter, 0, 0, type, pinfo.indent)
\ No newline at end of file
+		per_process_commands = __process_rigidLink (doc, pinfo, is_partitioned, all_inter, type, pinfo.indent)
+		for command in per_process_commands[0]:
+			pinfo.out_file.write(command)
\ No newline at end of file
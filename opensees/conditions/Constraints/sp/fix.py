@@ -611,30 +611,29 @@ def writeTcl_spConstraints(pinfo):
 		raise Exception('null cae document')
 	
 	if pinfo.process_count > 1:
+		for node_id in nodes:
+			if not (node_id in pinfo.node_to_model_map):
+				raise Exception('Error: node without assigned element')		#nodo senza elemento assegnato
+		# split the nodes by partition, in a single pass
+		per_part_nodes = pinfo.getPartitionIndex().splitNodes(nodes)
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			first_done = False
 			
 			str_tcl = []
-			for node_id in nodes:
-				if (node_id in pinfo.node_to_model_map):
-				
-					if not doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
-						continue
-					if not first_done:
-						if process_block_count == 0:
-							pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						else:
-							pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						first_done = True
+			for node_id in per_part_nodes[process_id]:
+				if not first_done:
+					if process_block_count == 0:
+						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+					else:
+						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					first_done = True
 				
-					spatial_info = pinfo.node_to_model_map[node_id]
-					node_ndm = spatial_info[0]
-					node_ndf = spatial_info[1]
-					if (ndm != node_ndm) :
-						raise Exception('Error: condition and node have different NDM')
-				else :
-					raise Exception('Error: node without assigned element')		#nodo senza elemento assegnato
+				spatial_info = pinfo.node_to_model_map[node_id]
+				node_ndm = spatial_info[0]
+				node_ndf = spatial_info[1]
+				if (ndm != node_ndm) :
+					raise Exception('Error: condition and node have different NDM')
 				pinfo.out_file.write(__build_fix_string(node_ndf, ndf, pinfo.indent, pinfo.tabIndent, node_id, sopt))
 			
 			if first_done:
@@ -466,17 +466,16 @@ def writeTcl_groundMotion(pinfo, xobj, tag):
 	# process all geometries and map nodes to their process id
 	pcount = pinfo.process_count
 	if pcount > 1:
-		partition_data = doc.mesh.partitionData
+		pindex = pinfo.getPartitionIndex()
 		nodes = [[] for i in range(pcount)]
 	else:
-		partition_data = None
+		pindex = None
 		nodes = []
 	# utility to append the node_id to its proper list
 	def append_node(node_id):
 		if pcount > 1:
-			for pid in range(pcount):
-				if partition_data.isNodeOnPartition(node_id, pid):
-					nodes[pid].append(node_id)
+			for pid in pindex.nodePartitions(node_id):
+				nodes[pid].append(node_id)
 		else:
 			nodes.append(node_id)
 	# process nodes in the selection
@@ -2,7 +2,7 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 from PyMpc.Math import *
-from opensees.conditions.utils import SpatialFunctionEval
+from opensees.conditions.utils import SpatialFunctionEval, lumpConditionOnNodes, writeLumpedLoads
 
 def makeXObjectMetaData():
 	'''
@@ -220,113 +220,18 @@ def makeConditionRepresentationData(xobj):
 	d.on_interactions = False
 	return d
 
-def __process_load (doc, pinfo, all_geom, Mode, F, is_partitioned, process_id, process_block_count, sfx, sfy, sfz, is_Global):
-	first_done = False
-	for geom, subset in all_geom.items():
-		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
-		for i in subset.faces:
-			domain = mesh_of_geom.faces[i]
-			for elem in domain.elements:
-				
-				if is_partitioned :
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
-						continue
-				
-				n = len(elem.nodes)
-				ngp = len(elem.integrationRule.integrationPoints)
-				
-				if not is_Global:
-					FT = elem.orientation.quaternion.rotate(F)
-				else:
-					FT = F
-					
-				# obtain nodal values of the distributed condition
-				nodal_values = [[0.0, 0.0, 0.0] for i in range(n)]
-				if Mode == 'function':
-					for i in range(n):
-						nodei = elem.nodes[i]
-						seval = SpatialFunctionEval(nodei.position)
-						nodal_values[i][0] = seval.make(sfx)
-						nodal_values[i][1] = seval.make(sfy)
-						nodal_values[i][2] = seval.make(sfz)
-						if not is_Global:
-							F_function = elem.orientation.quaternion.rotate(vec3(nodal_values[i][0], nodal_values[i][1], nodal_values[i][2]))
-							nodal_values[i][0] = F_function[0]
-							nodal_values[i][1] = F_function[1]
-							nodal_values[i][2] = F_function[2]
-						
-				else:
-					for i in range(n):
-						nodal_values[i][0] = FT.x
-						nodal_values[i][1] = FT.y
-						nodal_values[i][2] = FT.z
-				
-				# do nodal lumping
-				nodal_lumped_values = [[0.0, 0.0, 0.0, 0.0] for i in range(n)]
-				for gp in range(ngp):
-					gauss_point = elem.integrationRule.integrationPoints[gp]
-					N = elem.shapeFunctionsAt(gauss_point)
-					det_J = elem.jacobianAt(gauss_point).det()
-					W = gauss_point.w
-					
-					# interpolate nodal value at this gp
-					fx = 0.0
-					fy = 0.0
-					fz = 0.0
-					for i in range(n):
-						Ni = N[i]
-						fx += Ni * nodal_values[i][0]
-						fy += Ni * nodal_values[i][1]
-						fz += Ni * nodal_values[i][2]
-					
-					for i in range(n):
-						fact = N[i] * det_J * W
-						lump = nodal_lumped_values[i]
-						lump[0] = elem.nodes[i].id
-						lump[1] += fx * fact
-						lump[2] += fy * fact
-						lump[3] += fz * fact
-						
-				for i in range(n):
-					lump = nodal_lumped_values[i]
-					lump[0] = elem.nodes[i].id
-					str_tcl = []
-					sopt = ('\n'.join(['{} {}'.format(lump[1], lump[2])]))
-					if (lump[0] in pinfo.node_to_model_map):
-						if is_partitioned :
-							if not first_done:
-								if process_block_count == 0:
-									pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-								else:
-									pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-								first_done = True
-								
-						spatial_info = pinfo.node_to_model_map[lump[0]]
-						node_ndm = spatial_info[0]
-						node_ndf = spatial_info[1]
-						if (node_ndm == 2):
-							if (node_ndf == 3):
-								sopt += ('\n'.join([' 0.0']))
-						else:
-							sopt += ('\n'.join([' {}'.format( lump[3])]))
-							if (node_ndf == 4):
-								sopt += ('\n'.join([' 0.0']))
-							elif (node_ndf == 6):
-								sopt += ('\n'.join([' 0.0 0.0 0.0']))
-					else :
-						raise Exception('Error: node without assigned element')
-					str_tcl.append('{}{}load {} {}'.format(pinfo.indent, pinfo.tabIndent, lump[0] , sopt))
-					
-					# now write the string into the file
-					pinfo.out_file.write('\n'.join(str_tcl))
-					pinfo.out_file.write('\n')
-					
-	if is_partitioned :
-		if first_done:
-			process_block_count += 1
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
+def __format_load(node_id, node_ndm, node_ndf, lump):
+	sopt = '{} {}'.format(lump[0], lump[1])
+	if (node_ndm == 2):
+		if (node_ndf == 3):
+			sopt += ' 0.0'
+	else:
+		sopt += ' {}'.format(lump[2])
+		if (node_ndf == 4):
+			sopt += ' 0.0'
+		elif (node_ndf == 6):
+			sopt += ' 0.0 0.0 0.0'
+	return sopt
 
 def writeTcl_Force(pinfo, xobj):
 	
@@ -369,22 +274,10 @@ def writeTcl_Force(pinfo, xobj):
 		raise Exception('Error: cannot find "Fz" attribute')
 	Fz = Fz_at.string
 	
-	sfx = 0
-	sfy = 0
-	sfz = 0
-	
-	if (Mode == 'function'):
-		sfx = Fx
-		sfy = Fy
-		sfz = Fz
+	functions = (Fx, Fy, Fz) if Mode == 'function' else None
 	
-	doc = App.caeDocument()
 	is_partitioned = False
 	if pinfo.process_count > 1:
 		is_partitioned = True
-	if is_partitioned:
-		process_block_count = 0
-		for process_id in range(pinfo.process_count):
-			process_block_count = __process_load (doc, pinfo, all_geom, Mode, F, is_partitioned, process_id, process_block_count, sfx, sfy, sfz, is_Global)
-	else :
-		__process_load (doc, pinfo, all_geom, Mode, F, is_partitioned, 0, 0, sfx, sfy, sfz, is_Global)
\ No newline at end of file
+	lumped = lumpConditionOnNodes(pinfo, all_geom, 'faces', F, functions, is_Global, is_partitioned)
+	writeLumpedLoads(pinfo, lumped, __format_load, pinfo.indent + pinfo.tabIndent)
\ No newline at end of file
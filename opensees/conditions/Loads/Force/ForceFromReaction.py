@@ -249,13 +249,14 @@ def writeTcl_Force(pinfo, xobj):
 	pinfo.out_file.write('reactions\n')
 	
 	if pinfo.process_count > 1:
+		pindex = pinfo.getPartitionIndex()
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			first_done = False
 			for i in node_id:
 				# if doc.mesh.partitionData.nodePartition(i) != process_id:
 					# continue
-				if not doc.mesh.partitionData.isNodeOnPartition(i, process_id):
+				if not pindex.isNodeOnPartition(i, process_id):
 					continue
 				if not first_done:
 					if process_block_count == 0:
@@ -270,6 +270,7 @@ def writeTcl_Force(pinfo, xobj):
 	doc = App.caeDocument()
 	
 	if pinfo.process_count > 1:
+		pindex = pinfo.getPartitionIndex()
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			first_done = False
@@ -279,7 +280,7 @@ def writeTcl_Force(pinfo, xobj):
 				for i in subset.vertices:
 					domain = domain_collection[i]
 			
-					if doc.mesh.partitionData.nodePartition(domain.id) != process_id:
+					if pindex.nodePartition(domain.id) != process_id:
 						continue
 					if not first_done:
 						if process_block_count == 0:
@@ -275,6 +275,7 @@ def writeTcl_Force(pinfo, xobj):
 	doc = App.caeDocument()
 	
 	if pinfo.process_count > 1:
+		pindex = pinfo.getPartitionIndex()
 		process_block_count = 0
 		for process_id in range(pinfo.process_count):
 			first_done = False
@@ -283,7 +284,7 @@ def writeTcl_Force(pinfo, xobj):
 				for i in subset.vertices:
 					domain = mesh_of_geom.vertices[i]
 					node_id = domain.id
-					if doc.mesh.partitionData.nodePartition(node_id) != process_id:
+					if pindex.nodePartition(node_id) != process_id:
 						continue
 					if not first_done:
 						if process_block_count == 0:
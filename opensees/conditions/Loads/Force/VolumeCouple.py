@@ -2,7 +2,7 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 from PyMpc.Math import *
-from opensees.conditions.utils import SpatialFunctionEval
+from opensees.conditions.utils import SpatialFunctionEval, lumpConditionOnNodes, writeLumpedLoads
 
 def makeXObjectMetaData():
 	'''
@@ -220,114 +220,15 @@ def makeConditionRepresentationData(xobj):
 	d.on_interactions = False
 	return d
 
-def __process_couple (doc, pinfo, ClassName, all_geom, Mode, M, is_partitioned, process_id, process_block_count, sfx, sfy, sfz, is_Global):
-	first_done = False
-	for geom, subset in all_geom.items():
-		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
-		for i in subset.solids:
-			domain = mesh_of_geom.solids[i]
-			for elem in domain.elements:
-			
-				if is_partitioned :
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
-						continue
-			
-				n = len(elem.nodes)
-				ngp = len(elem.integrationRule.integrationPoints)
-				
-				if not is_Global:
-					MT = elem.orientation.quaternion.rotate(M)
-				else:
-					MT = M
-					
-				# obtain nodal values of the distributed condition
-				nodal_values = [[0.0, 0.0, 0.0] for i in range(n)]
-				if Mode == 'function':
-					for i in range(n):
-						nodei = elem.nodes[i]
-						seval = SpatialFunctionEval(nodei.position)
-						nodal_values[i][0] = seval.make(sfx)
-						nodal_values[i][1] = seval.make(sfy)
-						nodal_values[i][2] = seval.make(sfz)
-						if not is_Global:
-							M_function = elem.orientation.quaternion.rotate(vec3(nodal_values[i][0], nodal_values[i][1], nodal_values[i][2]))
-							nodal_values[i][0] = M_function[0]
-							nodal_values[i][1] = M_function[1]
-							nodal_values[i][2] = M_function[2]
-				else:
-					for i in range(n):
-						nodal_values[i][0] = MT.x
-						nodal_values[i][1] = MT.y
-						nodal_values[i][2] = MT.z
-				
-				# do nodal lumping
-				nodal_lumped_values = [[0.0, 0.0, 0.0, 0.0] for i in range(n)]
-				for gp in range(ngp):
-					gauss_point = elem.integrationRule.integrationPoints[gp]
-					N = elem.shapeFunctionsAt(gauss_point)
-					det_J = elem.jacobianAt(gauss_point).det()
-					W = gauss_point.w
-					
-					# interpolate nodal value at this gp
-					fx = 0.0
-					fy = 0.0
-					fz = 0.0
-					for i in range(n):
-						Ni = N[i]
-						fx += Ni * nodal_values[i][0]
-						fy += Ni * nodal_values[i][1]
-						fz += Ni * nodal_values[i][2]
-					
-					for i in range(n):
-						fact = N[i] * det_J * W
-						lump = nodal_lumped_values[i]
-						lump[0] = elem.nodes[i].id
-						lump[1] += fx * fact
-						lump[2] += fy * fact
-						lump[3] += fz * fact
-						
-				for i in range(n):
-					lump = nodal_lumped_values[i]
-					lump[0] = elem.nodes[i].id
-					
-					str_tcl = []
-					
-					if (lump[0] in pinfo.node_to_model_map):
-					
-						if is_partitioned :
-							if not first_done:
-								if process_block_count == 0:
-									pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-								else:
-									pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-								first_done = True
-					
-						spatial_info = pinfo.node_to_model_map[lump[0]]
-						node_ndm = spatial_info[0]
-						node_ndf = spatial_info[1]
-						if (node_ndm == 2):
-							if (node_ndf == 3):
-								sopt = ('\n'.join(['0.0 0.0 {}'.format(lump[3])]))
-						else:
-							if (node_ndf == 3) or (node_ndf == 4):
-								# ndm: 2; ndf: 2
-								raise Exception('Error: ndm/ndf pair is incompatible with "{}". node: {}; ndm: {}; ndf: {}'.format(ClassName, lump[0], node_ndm, node_ndf))
-							elif (node_ndf == 6):
-								sopt = ('\n'.join(['0.0 0.0 0.0 {} {} {}'.format(lump[1], lump[2], lump[3])]))
-					else :
-						raise Exception('Error: node without assigned element')
-					str_tcl.append('{}{}load {} {}'.format(pinfo.indent, pinfo.tabIndent, lump[0], sopt))
-					
-					# now write the string into the file
-					pinfo.out_file.write('\n'.join(str_tcl))
-					pinfo.out_file.write('\n')
-					
-	if is_partitioned :
-		if first_done:
-			process_block_count += 1
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
+def __format_couple(ClassName, node_id, node_ndm, node_ndf, lump):
+	if (node_ndm == 2):
+		if (node_ndf == 3):
+			return '0.0 0.0 {}'.format(lump[2])
+	else:
+		if (node_ndf == 6):
+			return '0.0 0.0 0.0 {} {} {}'.format(lump[0], lump[1], lump[2])
+	# ndm: 2; ndf: 2 or ndm: 3; ndf: 3 or 4
+	raise Exception('Error: ndm/ndf pair is incompatible with "{}". node: {}; ndm: {}; ndf: {}'.format(ClassName, node_id, node_ndm, node_ndf))
 
 def writeTcl_Force(pinfo, xobj):
 	
@@ -379,14 +280,12 @@ def writeTcl_Force(pinfo, xobj):
 		sfy = My
 		sfz = Mz
 	
-	doc = App.caeDocument()
+	functions = None
+	if (Mode == 'function'):
+		functions = (sfx, sfy, sfz)
 	
 	is_partitioned = False
 	if pinfo.process_count > 1:
 		is_partitioned = True
-	if is_partitioned:
-		process_block_count = 0
-		for process_id in range(pinfo.process_count):
-			process_block_count = __process_couple (doc, pinfo, ClassName, all_geom, Mode, M, is_partitioned, process_id, process_block_count, sfx, sfy, sfz, is_Global)
-	else :
-		__process_couple (doc, pinfo, ClassName, all_geom, Mode, M, is_partitioned, 0, 0, sfx, sfy, sfz, is_Global)
\ No newline at end of file
+	lumped = lumpConditionOnNodes(pinfo, all_geom, 'solids', M, functions, is_Global, is_partitioned)
+	writeLumpedLoads(pinfo, lumped, lambda *args: __format_couple(ClassName, *args), pinfo.indent + pinfo.tabIndent)
\ No newline at end of file
@@ -584,7 +584,7 @@ def _evaluateTclLoad(pinfo, doc, geom, mesh_of_geom, edge, i, FT, is_partitioned
 		info = domain.elementGeomInfos[e]
 		
 		if is_partitioned :
-			if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
+			if pinfo.getPartitionIndex().elementPartition(elem.id) != process_id:
 				continue
 				
 		minU = 1e10
@@ -249,7 +249,12 @@ def writeTcl_MovingLoad(pinfo, condition, var_pat_ts):
 	path_nodes, path_positions = _buildPath(condition, first_node, last_node, map_node_eles)
 	
 	# if we are in a partitioned model we also need a vector of process ids
-	path_partitions = [doc.mesh.partitionData.nodePartition(node.id) for node in path_nodes]
+	# (all nodes are on process 0 in a sequential model)
+	if pinfo.process_count > 1:
+		pindex = pinfo.getPartitionIndex()
+		path_partitions = [pindex.nodePartition(node.id) for node in path_nodes]
+	else:
+		path_partitions = [0]*len(path_nodes)
 	
 	# build ndf per nodes
 	path_ndf = [pinfo.node_to_model_map[inode.id][1] for inode in path_nodes]
@@ -3,6 +3,12 @@ if {![info exists STKO_ML_global_mass_dict]} {
 	# (only one condition can create it)
 	set STKO_ML_global_mass_dict [dict create]
 }
+if {![info exists STKO_ML_global_current_mass_dict]} {
+	# the current masses of the path nodes, as modified by all conditions
+	# in the current time step. they are kept here so that nodeMass is
+	# called only at the beginning, and not at each time step
+	set STKO_ML_global_current_mass_dict [dict create]
+}
 # store initial masses before the analysis
 for {set path_node_id 0} {$path_node_id < [llength $__path_nodes__]} {incr path_node_id} {
 	set inode [lindex $__path_nodes__ $path_node_id]
@@ -14,6 +20,7 @@ for {set path_node_id 0} {$path_node_id < [llength $__path_nodes__]} {incr path_
 			set node_masses [lrepeat $ndf 0.0]
 			for {set j 1} {$j <= $ndf} {incr j} {lset node_masses [expr $j-1] [expr [nodeMass $inode $j]]}
 			dict set STKO_ML_global_mass_dict $inode $node_masses
+			dict set STKO_ML_global_current_mass_dict $inode $node_masses
 		}
 	}
 }
@@ -30,7 +37,7 @@ proc __function_before__ {} {
 	global __axle_masses__
 	global __axle_forces__
 	global __modified_nodes__
-	global STKO_ML_global_mass_dict
+	global STKO_ML_global_current_mass_dict
 	global STKO_VAR_increment
 	global STKO_VAR_time
 	global STKO_VAR_time_increment
@@ -41,41 +48,41 @@ proc __function_before__ {} {
 	set P0 __period__
 	set num_axles [llength $__axle_positions__]
 	set path_num_pts [llength $__path_positions__]
-	set path_length [lindex $__path_positions__ [expr $path_num_pts-1]]
-	set path_tol [expr $path_length*1.0e-4]
+	set path_length [lindex $__path_positions__ end]
+	set path_tol [expr {$path_length*1.0e-4}]
 	set this_pid [getPID]
 	
 	# save nearest nodes data node_info[i] = {node_i {load_i} {mass_i}}
 	set node_info [list]
 	
 	# compute the time of the next analysis call (here we are before the analyze command)
-	set T [expr $STKO_VAR_time + $STKO_VAR_time_increment]
+	set T [expr {$STKO_VAR_time + $STKO_VAR_time_increment}]
 	# compute the axle bounds
 	set axle_start [lindex $__axle_positions__ 0]
-	set axle_end [lindex $__axle_positions__ [expr $num_axles-1]]
+	set axle_end [lindex $__axle_positions__ end]
 	
 	# compute the coordinates of the center of the vehicle,
 	# taking into account the period
 	set Xc_list [list ]
 	if {$P0 <= 0.0} {
-		set Xc [expr ($T-$T0) * $V0 + $axle_start]
-		set Xc_min [expr $Xc + $axle_start]
-		set Xc_max [expr $Xc + $axle_end]
+		set Xc [expr {($T-$T0) * $V0 + $axle_start}]
+		set Xc_min [expr {$Xc + $axle_start}]
+		set Xc_max [expr {$Xc + $axle_end}]
 		if {$Xc_max >= 0.0 && $Xc_min <= $path_length} {lappend Xc_list $Xc}
 	} else {
 		# leading center
-		set Xc [expr ($T-$T0) * $V0 + $axle_start]
+		set Xc [expr {($T-$T0) * $V0 + $axle_start}]
 		# max pos leading vehicle
-		set Xc_max [expr $Xc + $axle_end]
+		set Xc_max [expr {$Xc + $axle_end}]
 		# min possible rear axle position
-		set Xc_min [expr $axle_start - $axle_end]
+		set Xc_min [expr {$axle_start - $axle_end}]
 		# period to spacing
-		set XP0 [expr $P0*$V0]
-		set vehicle_count_max [expr max(1, int(($Xc_max - $Xc_min)/$XP0))*2]
+		set XP0 [expr {$P0*$V0}]
+		set vehicle_count_max [expr {max(1, int(($Xc_max - $Xc_min)/$XP0))*2}]
 		for {set period_counter 0} {$period_counter < $vehicle_count_max} {incr period_counter} {
-			set Xc [expr ($T-$T0-$period_counter.0*$P0) * $V0 + $axle_start]
-			set Xc_min [expr $Xc + $axle_start]
-			set Xc_max [expr $Xc + $axle_end]
+			set Xc [expr {($T-$T0-double($period_counter)*$P0) * $V0 + $axle_start}]
+			set Xc_min [expr {$Xc + $axle_start}]
+			set Xc_max [expr {$Xc + $axle_end}]
 			if {$Xc_max >= 0.0 && $Xc_min <= $path_length} { lappend Xc_list $Xc }
 		}
 	}
@@ -89,30 +96,31 @@ proc __function_before__ {} {
 			set iM [lindex $__axle_masses__ $axle_id]
 			set iF [lindex $__axle_forces__ $axle_id]
 			# compute current position and skip if outside
-			set X [expr $Xc + $iX]
+			set X [expr {$Xc + $iX}]
 			if {$X < 0.0 || $X > $path_length} { continue }
-			# find the 2 nodes of the active segment
-			set snodes {-1 -1}
-			set spos {0 0}
-			set spid {0 0}
-			set sndf {0 0}
-			set sfound 0
-			for {set point_id 0} {$point_id < [expr $path_num_pts - 1]} {incr point_id} {
-				set point_x [lindex $__path_positions__ [expr $point_id + 1]]
-				if {$X <= [expr $point_x + $path_tol]} {
-					set snodes [list [lindex $__path_nodes__ $point_id] [lindex $__path_nodes__ [expr $point_id + 1]]]
-					set spos [list [lindex $__path_positions__ $point_id] $point_x]
-					set spid [list [lindex $__path_partitions__ $point_id] [lindex $__path_partitions__ [expr $point_id + 1]]]
-					set sndf [list [lindex $__path_nodes_ndf__ $point_id] [lindex $__path_nodes_ndf__ [expr $point_id + 1]]]
-					set sfound 1
-					break
+			# find the active segment: the first one whose end point satisfies X <= end + tol.
+			# path positions are cumulative (sorted), so it is found by bisection
+			set lo 0
+			set hi [expr {$path_num_pts - 1}]
+			while {$lo < $hi} {
+				set mid [expr {($lo + $hi) / 2}]
+				if {$X <= [lindex $__path_positions__ [expr {$mid + 1}]] + $path_tol} {
+					set hi $mid
+				} else {
+					set lo [expr {$mid + 1}]
 				}
 			}
-			if {$sfound == 0} { error "__function_before__: Cannot find active segment" }
+			if {$lo >= $path_num_pts - 1} { error "__function_before__: Cannot find active segment" }
+			set point_id $lo
+			set next_id [expr {$point_id + 1}]
+			set snodes [list [lindex $__path_nodes__ $point_id] [lindex $__path_nodes__ $next_id]]
+			set spos [list [lindex $__path_positions__ $point_id] [lindex $__path_positions__ $next_id]]
+			set spid [list [lindex $__path_partitions__ $point_id] [lindex $__path_partitions__ $next_id]]
+			set sndf [list [lindex $__path_nodes_ndf__ $point_id] [lindex $__path_nodes_ndf__ $next_id]]
 			# compute factors
-			set DX [expr [lindex $spos 1] - [lindex $spos 0]]
-			set fact_2 [expr ($X - [lindex $spos 0])/$DX]
-			set fact_1 [expr 1.0 - $fact_2]
+			set DX [expr {[lindex $spos 1] - [lindex $spos 0]}]
+			set fact_2 [expr {($X - [lindex $spos 0])/$DX}]
+			set fact_1 [expr {1.0 - $fact_2}]
 			set sfact [list $fact_1 $fact_2]
 			# process each node of the segment if on this partition
 			for {set sj 0} {$sj < 2} {incr sj} {
@@ -122,16 +130,15 @@ proc __function_before__ {} {
 					set sj_fact [lindex $sfact $sj]
 					set sj_ndf [lindex $sndf $sj]
 					# load data Fz
-					set sj_Fz [expr $iF * $sj_fact]
+					set sj_Fz [expr {$iF * $sj_fact}]
 					set sj_forces [lrepeat $sj_ndf 0.0]
 					lset sj_forces 2 $sj_Fz
-					# mass data 
-					set sj_masses [lrepeat $sj_ndf 0.0]
-					for {set idof 0} {$idof < $sj_ndf} {incr idof} { lset sj_masses $idof [expr [nodeMass $sj_node [expr $idof+1]]] }
+					# mass data (the current masses, before this time step)
+					set sj_masses [dict get $STKO_ML_global_current_mass_dict $sj_node]
 					# warning assuming 3D!
 					# add axle mass on translational DOFs
-					set sj_M [expr $iM * $sj_fact]
-					for {set idof 0} {$idof < 3} {incr idof} { lset sj_masses $idof [expr [lindex $sj_masses $idof] + $sj_M] }
+					set sj_M [expr {$iM * $sj_fact}]
+					for {set idof 0} {$idof < 3} {incr idof} { lset sj_masses $idof [expr {[lindex $sj_masses $idof] + $sj_M}] }
 					# append info
 					lappend node_info [list $sj_node $sj_forces $sj_masses]
 				}
@@ -147,6 +154,7 @@ proc __function_before__ {} {
 	foreach info $node_info {
 		set node_id [lindex $info 0]
 		mass $node_id {*}[lindex $info 2]
+		dict set STKO_ML_global_current_mass_dict $node_id [lindex $info 2]
 		lappend __modified_nodes__ $node_id
 	}
 	
@@ -160,9 +168,11 @@ proc __function_before__ {} {
 proc __function_after__ {} {
 	global __modified_nodes__
 	global STKO_ML_global_mass_dict
+	global STKO_ML_global_current_mass_dict
 	# reset original masses only on nodes modified before this time step
 	foreach node_id $__modified_nodes__ {
 		set previous_masses [dict get $STKO_ML_global_mass_dict $node_id]
 		mass $node_id {*}$previous_masses
+		dict set STKO_ML_global_current_mass_dict $node_id $previous_masses
 	}
 }
\ No newline at end of file
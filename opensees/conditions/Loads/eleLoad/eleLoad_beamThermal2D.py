@@ -329,7 +329,7 @@ def writeTcl_eleLoad(pinfo, xobj):
 					domain = domain_collection[i]
 					for element in domain.elements:
 					
-						if doc.mesh.partitionData.elementPartition(element.id)!= process_id:
+						if pinfo.getPartitionIndex().elementPartition(element.id)!= process_id:
 							continue
 						if not first_done :
 							if process_block_count == 0:
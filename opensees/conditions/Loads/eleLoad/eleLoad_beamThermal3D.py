@@ -332,7 +332,7 @@ def writeTcl_eleLoad(pinfo, xobj):
 				for i in item.edges:
 					domain = domain_collection[i]
 					for element in domain.elements:
-						if doc.mesh.partitionData.elementPartition(element.id)!= process_id:
+						if pinfo.getPartitionIndex().elementPartition(element.id)!= process_id:
 							continue
 						if not first_done :
 							if process_block_count == 0:
@@ -190,7 +190,7 @@ class _eleLoadEleCallback:
 	def callback(self, pinfo, elem, MA):
 		# quick return
 		if self.is_partitioned:
-			if App.caeDocument().mesh.partitionData.elementPartition(elem.id) != self.process_id:
+			if pinfo.getPartitionIndex().elementPartition(elem.id) != self.process_id:
 				return
 		# force in global coordinates
 		FT = self.g * MA
@@ -230,7 +230,7 @@ class _loadEleCallback:
 	def callback(self, pinfo, elem, MA):
 		# quick return
 		if self.is_partitioned:
-			if App.caeDocument().mesh.partitionData.elementPartition(elem.id) != self.process_id:
+			if pinfo.getPartitionIndex().elementPartition(elem.id) != self.process_id:
 				return
 		# size
 		n = len(elem.nodes)
@@ -1,8 +1,449 @@
 
+import ast
+import math
+import sys
+import numpy as np
+
+class _spatial_function_transformer(ast.NodeTransformer):
+	'''
+	validates the syntax tree of a spatial function, allowing only arithmetic
+	operations, numbers, the coordinates and the functions and constants in
+	SpatialFunction.symbols.
+	comparisons, boolean operators and conditional expressions are rewritten
+	using their element-wise numpy counterparts
+	'''
+	allowed_nodes = (
+		ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+		ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+		ast.UAdd, ast.USub,
+		)
+	if sys.version_info < (3, 8):
+		# python < 3.8 parses numbers as ast.Num
+		# (accessing ast.Num is deprecated in newer versions)
+		allowed_nodes += (ast.Num,)
+	def __init__(self, symbols):
+		self.symbols = symbols
+	def generic_visit(self, node):
+		if not isinstance(node, self.allowed_nodes):
+			raise ValueError('"{}" is not allowed'.format(type(node).__name__))
+		return super().generic_visit(node)
+	def visit_Constant(self, node):
+		if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+			raise ValueError('only numeric constants are allowed')
+		return node
+	def visit_Num(self, node):
+		# python < 3.8 only
+		if not isinstance(node.n, (int, float)):
+			raise ValueError('only numeric constants are allowed')
+		return node
+	def visit_Name(self, node):
+		if node.id not in self.symbols:
+			raise ValueError('unknown name "{}"'.format(node.id))
+		return node
+	def visit_Call(self, node):
+		if not isinstance(node.func, ast.Name) or not callable(self.symbols.get(node.func.id, None)) or node.keywords:
+			raise ValueError('only calls to the available functions are allowed')
+		return self.generic_visit(node)
+	def _call(self, name, args, node):
+		return ast.copy_location(ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[]), node)
+	def visit_UnaryOp(self, node):
+		if isinstance(node.op, ast.Not):
+			return self._call('__not', [self.visit(node.operand)], node)
+		return self.generic_visit(node)
+	def visit_BoolOp(self, node):
+		name = '__and' if isinstance(node.op, ast.And) else '__or'
+		values = [self.visit(v) for v in node.values]
+		result = values[0]
+		for v in values[1:]:
+			result = self._call(name, [result, v], node)
+		return result
+	def visit_Compare(self, node):
+		ops = {ast.Lt: '__lt', ast.LtE: '__le', ast.Gt: '__gt', ast.GtE: '__ge', ast.Eq: '__eq', ast.NotEq: '__ne'}
+		left = self.visit(node.left)
+		result = None
+		for op, right in zip(node.ops, node.comparators):
+			name = ops.get(type(op), None)
+			if name is None:
+				raise ValueError('"{}" is not allowed'.format(type(op).__name__))
+			right = self.visit(right)
+			item = self._call(name, [left, right], node)
+			result = item if result is None else self._call('__and', [result, item], node)
+			left = right
+		return result
+	def visit_IfExp(self, node):
+		return self._call('where', [self.visit(node.test), self.visit(node.body), self.visit(node.orelse)], node)
+
+def _reduce(function):
+	def reduced(*args):
+		result = args[0]
+		for a in args[1:]:
+			result = function(result, a)
+		return result
+	return reduced
+
+class SpatialFunction:
+	'''
+	A user-defined spatial function f(x, y, z).
+	The expression is parsed and validated once, and compiled to a function
+	that can be evaluated on arrays of coordinates.
+	Only arithmetic operations, comparisons, conditional expressions and the
+	element-wise mathematical functions in symbols are allowed.
+	Expressions that do not satisfy these rules are still evaluated
+	point by point with asteval, as in previous versions.
+	Use getSpatialFunction to get a cached instance.
+	'''
+	symbols = {
+		'pi' : np.pi, 'e' : np.e, 'inf' : np.inf,
+		'abs' : np.abs, 'fabs' : np.fabs, 'sign' : np.sign, 'copysign' : np.copysign,
+		'sqrt' : np.sqrt, 'square' : np.square, 'exp' : np.exp, 'exp2' : np.exp2, 'expm1' : np.expm1,
+		'log' : np.log, 'ln' : np.log, 'log10' : np.log10, 'log2' : np.log2, 'log1p' : np.log1p,
+		'sin' : np.sin, 'cos' : np.cos, 'tan' : np.tan,
+		'asin' : np.arcsin, 'acos' : np.arccos, 'atan' : np.arctan, 'atan2' : np.arctan2,
+		'arcsin' : np.arcsin, 'arccos' : np.arccos, 'arctan' : np.arctan, 'arctan2' : np.arctan2,
+		'sinh' : np.sinh, 'cosh' : np.cosh, 'tanh' : np.tanh,
+		'asinh' : np.arcsinh, 'acosh' : np.arccosh, 'atanh' : np.arctanh,
+		'arcsinh' : np.arcsinh, 'arccosh' : np.arccosh, 'arctanh' : np.arctanh,
+		'hypot' : np.hypot, 'floor' : np.floor, 'ceil' : np.ceil, 'trunc' : np.trunc, 'rint' : np.rint,
+		'radians' : np.radians, 'degrees' : np.degrees, 'deg2rad' : np.deg2rad, 'rad2deg' : np.rad2deg,
+		'pow' : np.power, 'power' : np.power, 'mod' : np.mod, 'fmod' : np.fmod,
+		'min' : _reduce(np.minimum), 'max' : _reduce(np.maximum),
+		'minimum' : np.minimum, 'maximum' : np.maximum, 'fmin' : np.fmin, 'fmax' : np.fmax,
+		'clip' : np.clip, 'where' : np.where,
+		}
+	_operators = {
+		'__not' : np.logical_not, '__and' : np.logical_and, '__or' : np.logical_or,
+		'__lt' : np.less, '__le' : np.less_equal, '__gt' : np.greater, '__ge' : np.greater_equal,
+		'__eq' : np.equal, '__ne' : np.not_equal,
+		}
+	
+	def __init__(self, expression):
+		self.expression = expression
+		self.code = None
+		self.interpreter = None
+		names = dict(self.symbols)
+		names['x'] = names['y'] = names['z'] = 0.0
+		try:
+			tree = ast.parse(expression.strip(), mode='eval')
+			tree = _spatial_function_transformer(names).visit(tree)
+			ast.fix_missing_locations(tree)
+			self.code = compile(tree, '<spatial function>', 'eval')
+			self.names = dict(self.symbols)
+			self.names.update(self._operators)
+		except (SyntaxError, ValueError):
+			# not a plain expression of x, y, z: fallback to asteval
+			from asteval import Interpreter
+			self.interpreter = Interpreter()
+	
+	def __call__(self, x, y, z):
+		'''
+		evaluates the function at the given coordinates (scalars or arrays of the same shape).
+		returns a float array with the shape of x
+		'''
+		x = np.asarray(x, dtype=float)
+		y = np.asarray(y, dtype=float)
+		z = np.asarray(z, dtype=float)
+		if self.code is not None:
+			names = self.names
+			names['x'] = x
+			names['y'] = y
+			names['z'] = z
+			with np.errstate(all='ignore'):
+				result = eval(self.code, {'__builtins__' : {}}, names)
+			result = np.array(np.broadcast_to(result, x.shape), dtype=float)
+		else:
+			result = np.empty(x.shape)
+			symtable = self.interpreter.symtable
+			for i in np.ndindex(x.shape):
+				symtable['x'] = float(x[i])
+				symtable['y'] = float(y[i])
+				symtable['z'] = float(z[i])
+				value = self.interpreter(self.expression)
+				if value is None:
+					raise Exception('Error: cannot evaluate the spatial function "{}"'.format(self.expression))
+				result[i] = value
+		if not np.all(np.isfinite(result)):
+			raise Exception('Error: the spatial function "{}" is not finite at some points'.format(self.expression))
+		return result
+
+	def at(self, x, y, z):
+		'''
+		evaluates the function at a single point, returns a float
+		'''
+		if self.code is None:
+			return float(self(x, y, z))
+		names = self.names
+		names['x'] = float(x)
+		names['y'] = float(y)
+		names['z'] = float(z)
+		try:
+			with np.errstate(all='ignore'):
+				value = float(eval(self.code, {'__builtins__' : {}}, names))
+		except (ArithmeticError, TypeError, ValueError):
+			value = float('nan')
+		if not math.isfinite(value):
+			raise Exception('Error: the spatial function "{}" is not finite at some points'.format(self.expression))
+		return value
+
+# cache of compiled spatial functions {expression: SpatialFunction}
+_spatial_functions = {}
+
+def getSpatialFunction(expression):
+	'''
+	returns the compiled SpatialFunction for the given expression,
+	compiling it only the first time
+	'''
+	function = _spatial_functions.get(expression, None)
+	if function is None:
+		function = SpatialFunction(expression)
+		_spatial_functions[expression] = function
+	return function
+
 class SpatialFunctionEval:
+	'''
+	Evaluates spatial functions at a single point.
+	seval = SpatialFunctionEval(pos)
+	value = seval.make(expression)
+	'''
 	def __init__(self, pos):
-		from asteval import Interpreter
-		self.make = Interpreter()
-		self.make.symtable['x'] = pos.x
-		self.make.symtable['y'] = pos.y
-		self.make.symtable['z'] = pos.z
\ No newline at end of file
+		self.x = pos.x
+		self.y = pos.y
+		self.z = pos.z
+	def make(self, expression):
+		return getSpatialFunction(expression).at(self.x, self.y, self.z)
+
+class _lumping_family_t:
+	'''
+	lumping data of all elements of the same family
+	(same geometry family, number of nodes and number of integration points)
+	'''
+	def __init__(self, elem):
+		from array import array
+		self.n = len(elem.nodes)
+		self.gauss_points = list(elem.integrationRule.integrationPoints)
+		self.ngp = len(self.gauss_points)
+		# shape functions at the integration points in natural coordinates,
+		# the same for all elements of this family (ngp, n)
+		self.N = np.array([
+			[N[i] for i in range(self.n)]
+			for N in (elem.shapeFunctionsAt(gp) for gp in self.gauss_points)], dtype=float)
+		self.W = [gp.w for gp in self.gauss_points]
+		# element connectivity (E*n), integration factors det(J)*W (E*ngp),
+		# nodal values (E*n*num_components) and rotation matrices (E*9)
+		self.conn = array('q')
+		self.factors = array('d')
+		self.values = array('d')
+		self.rotations = array('d')
+
+class DistributedLumping:
+	'''
+	Lumps a distributed field with num_components components on the nodes of
+	a set of elements.
+	Elements are grouped by family. For each element only the node ids, the determinant
+	of the jacobian at the integration points and the nodal values are gathered,
+	then all elements of a family are lumped at once with numpy, and the
+	contributions are accumulated per node.
+	If nodal_field is given (a sequence of num_components SpatialFunction objects),
+	the nodal values are not given for each element, but obtained evaluating
+	the functions once at all nodes.
+	'''
+	def __init__(self, num_components = 3, nodal_field = None):
+		self.num_components = num_components
+		self.nodal_field = nodal_field
+		self.positions = {}
+		self.families = {}
+	
+	def add(self, elem, values = None, rotation = None):
+		'''
+		adds an element.
+		values is either a sequence of num_components values (constant on the element)
+		or a sequence of num_components values for each node of the element.
+		it is not used if this object has a nodal_field, in this case a 3x3 rotation matrix
+		(a sequence of 9 values, row-major) can be given to rotate the nodal values
+		of this element
+		'''
+		n = len(elem.nodes)
+		key = (elem.geometryFamilyType(), n, len(elem.integrationRule.integrationPoints))
+		family = self.families.get(key, None)
+		if family is None:
+			family = _lumping_family_t(elem)
+			self.families[key] = family
+		family.factors.extend(elem.jacobianAt(gp).det() * w for gp, w in zip(family.gauss_points, family.W))
+		if self.nodal_field is None:
+			family.conn.extend(node.id for node in elem.nodes)
+			if len(values) == self.num_components:
+				family.values.extend(list(values) * n)
+			else:
+				for v in values:
+					family.values.extend(v)
+		else:
+			positions = self.positions
+			for node in elem.nodes:
+				node_id = node.id
+				family.conn.append(node_id)
+				if node_id not in positions:
+					pos = node.position
+					positions[node_id] = (pos.x, pos.y, pos.z)
+			if rotation is not None:
+				family.rotations.extend(rotation)
+	
+	def compute(self):
+		'''
+		returns a tuple with the sorted unique ids of all nodes (int64 array of size num_nodes)
+		and their lumped values (float array of shape (num_nodes, num_components))
+		'''
+		nc = self.num_components
+		# evaluate the nodal field at all nodes
+		if self.nodal_field is not None:
+			field_ids = np.array(sorted(self.positions.keys()), dtype=np.int64)
+			xyz = np.array([self.positions[i] for i in field_ids.tolist()], dtype=float).reshape(-1, 3)
+			field_values = np.column_stack([f(xyz[:, 0], xyz[:, 1], xyz[:, 2]) for f in self.nodal_field])
+		all_conn = []
+		all_lumped = []
+		for family in self.families.values():
+			ne = len(family.factors) // family.ngp
+			if ne == 0:
+				continue
+			conn = np.frombuffer(family.conn, dtype=np.int64)
+			factors = np.frombuffer(family.factors, dtype=float).reshape(ne, family.ngp)
+			if self.nodal_field is None:
+				values = np.frombuffer(family.values, dtype=float).reshape(ne, family.n, nc)
+			else:
+				values = field_values[np.searchsorted(field_ids, conn)].reshape(ne, family.n, nc)
+				if len(family.rotations) > 0:
+					R = np.frombuffer(family.rotations, dtype=float).reshape(ne, 3, 3)
+					values = np.einsum('eab,ejb->eja', R, values)
+			# interpolate nodal values at integration points (E, ngp, nc)
+			gp_values = np.einsum('gj,ejc->egc', family.N, values)
+			# integrate N_i * value * det(J) * W (E, n, nc)
+			lumped = np.einsum('gi,eg,egc->eic', family.N, factors, gp_values)
+			all_conn.append(conn)
+			all_lumped.append(lumped.reshape(-1, nc))
+		if len(all_conn) == 0:
+			return (np.zeros(0, dtype=np.int64), np.zeros((0, nc)))
+		conn = np.concatenate(all_conn)
+		lumped = np.concatenate(all_lumped)
+		# scatter-add per node
+		node_ids, inverse = np.unique(conn, return_inverse=True)
+		result = np.empty((len(node_ids), nc))
+		for c in range(nc):
+			result[:, c] = np.bincount(inverse, weights=lumped[:, c], minlength=len(node_ids))
+		return (node_ids, result)
+
+def accumulateNodeMass(pinfo, node_ids, lumped, first_component = 0):
+	'''
+	adds the lumped masses (num_nodes, 3) to the mass_to_node_map of pinfo,
+	starting from the first_component (0 = translational, 3 = rotational)
+	'''
+	mass_map = pinfo.mass_to_node_map
+	for node_id, values in zip(node_ids.tolist(), lumped.tolist()):
+		mass_value = [0.0]*6
+		mass_value[first_component:first_component+3] = values
+		if node_id in mass_map:
+			current = mass_map[node_id]
+			for j in range(6):
+				current[j] += mass_value[j]
+		else:
+			mass_map[node_id] = mass_value
+
+def lumpConditionOnNodes(pinfo, all_geom, subshape, values, functions = None, is_Global = True, is_partitioned = False):
+	'''
+	lumps a distributed 3d vector condition on the nodes of the elements of the given
+	subshape type ('edges', 'faces' or 'solids') of all geometries in all_geom.
+	values: the constant vector (vec3), used if functions is None.
+	functions: a tuple with 3 spatial functions (expressions of x, y, z), evaluated at the nodes.
+	is_Global: if False, values are rotated by the element orientation.
+	returns a list of (node_ids, lumped) tuples, one for each process (only 1 if not partitioned),
+	with the contributions of the elements in each process accumulated per node
+	'''
+	import PyMpc.App
+	from PyMpc.Math import vec3
+	doc = PyMpc.App.caeDocument()
+	num_blocks = pinfo.process_count if is_partitioned else 1
+	if is_partitioned:
+		pindex = pinfo.getPartitionIndex()
+	if functions is not None:
+		nodal_field = [getSpatialFunction(f) for f in functions]
+		lumping = [DistributedLumping(3, nodal_field) for i in range(num_blocks)]
+		basis = (vec3(1.0, 0.0, 0.0), vec3(0.0, 1.0, 0.0), vec3(0.0, 0.0, 1.0))
+	else:
+		lumping = [DistributedLumping() for i in range(num_blocks)]
+		F = values
+		FT = [F.x, F.y, F.z]
+	for geom, subset in all_geom.items():
+		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
+		domains = getattr(mesh_of_geom, subshape)
+		for i in getattr(subset, subshape):
+			domain = domains[i]
+			for elem in domain.elements:
+				if is_partitioned:
+					process_id = pindex.elementPartition(elem.id)
+					if process_id < 0 or process_id >= num_blocks:
+						continue
+				else:
+					process_id = 0
+				# obtain nodal values of the distributed condition
+				if functions is not None:
+					rotation = None
+					if not is_Global:
+						# rotation matrix, the j-th column is the rotated j-th base vector
+						q = elem.orientation.quaternion
+						cols = [q.rotate(v) for v in basis]
+						rotation = [cols[b][a] for a in range(3) for b in range(3)]
+					lumping[process_id].add(elem, rotation=rotation)
+				else:
+					if not is_Global:
+						F_rot = elem.orientation.quaternion.rotate(F)
+						elem_values = [F_rot.x, F_rot.y, F_rot.z]
+					else:
+						elem_values = FT
+					lumping[process_id].add(elem, elem_values)
+	return [item.compute() for item in lumping]
+
+def writeLumpedLoads(pinfo, per_process_lumped, format_load, indent):
+	'''
+	writes one load command for each node, using the result of lumpConditionOnNodes.
+	format_load(node_id, ndm, ndf, lump) should return the load values as a string.
+	in partitioned models, the loads of each process are written in a
+	if {$STKO_VAR_process_id == N} block
+	'''
+	is_partitioned = pinfo.process_count > 1
+	process_block_count = 0
+	for process_id, (node_ids, lumped) in enumerate(per_process_lumped):
+		first_done = False
+		for node_id, lump in zip(node_ids.tolist(), lumped.tolist()):
+			spatial_info = pinfo.node_to_model_map.get(node_id, None)
+			if spatial_info is None:
+				raise Exception('Error: node without assigned element')
+			if is_partitioned:
+				if not first_done:
+					if process_block_count == 0:
+						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+					else:
+						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					first_done = True
+			sopt = format_load(node_id, spatial_info[0], spatial_info[1], lump)
+			pinfo.out_file.write('{}load {} {}\n'.format(indent, node_id, sopt))
+		if is_partitioned and first_done:
+			process_block_count += 1
+			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
+
+def writeProcessBlock(pinfo, process_id, process_block_count, commands, on_command = None):
+	'''
+	writes the commands of a process in a if {$STKO_VAR_process_id == N} block
+	(elseif if it is not the first block), for writers that collect the commands
+	of all processes in a single pass. nothing is written if commands is empty.
+	on_command (if not None) is called before writing each command.
+	returns the updated process_block_count
+	'''
+	if len(commands) == 0:
+		return process_block_count
+	if process_block_count == 0:
+		pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+	else:
+		pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+	for command in commands:
+		if on_command is not None:
+			on_command()
+		pinfo.out_file.write(command)
+	pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
+	return process_block_count + 1
@@ -4,10 +4,8 @@ from mpc_utils_html import *
 import PyMpc
 import PyMpc.Math
 import math
-import opensees.utils.tcl_input as tclin
+import opensees.utils.time_series_utils as tsu
 
-from scipy.signal import chirp, spectrogram
-from scipy.fft import fft, ifft
 import numpy as np
 #import eqsig
 
@@ -214,6 +212,20 @@ def makeXObjectMetaData():
 		)
 	at_NSamples.setDefault(3500)
 	
+	# -filePath
+	at_filePath = MpcAttributeMetaData()
+	at_filePath.type = MpcAttributeType.Boolean
+	at_filePath.name = '-filePath'
+	at_filePath.group = 'Group'
+	at_filePath.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('-filePath')+'<br/>') + 
+		html_par('optional, to write the generated times and values on external files in the output directory, instead of writing them in the input file. '
+			'Recommended for long series. Series with the same values are written only once') +
+		html_par(html_href('http://opensees.berkeley.edu/wiki/index.php/Path_TimeSeries','Path TimeSeries')+'<br/>') +
+		html_end()
+		)
+	
 	
 	# PLOT OPTION
 	# Data type
@@ -251,6 +263,7 @@ def makeXObjectMetaData():
 	xom.addAttribute(at_fmax)
 	xom.addAttribute(at_SampleRate)
 	xom.addAttribute(at_NSamples)
+	xom.addAttribute(at_filePath)
 	xom.addAttribute(at_DataType)
 	
 	# Sine Sweep-dep
@@ -361,6 +374,7 @@ def evaluateFunctionAttribute(xobj):
 			f0=f0_last
 		
 		t = np.linspace(0, timeForOctaves*NOctave, timeForOctaves*NOctave*Division)
+		from scipy.signal import chirp
 		x = chirp(t, f0=f0, f1=f1, t1=t1, method='linear')*Amplitude
 		
 		xy = PyMpc.Math.mat(len(x), 2)
@@ -509,7 +523,13 @@ def writeTcl(pinfo):
 	if(WhiteNoise_at is None):
 		raise Exception('Error: cannot find "WhiteNoise" attribute')
 	WhiteNoise = WhiteNoise_at.boolean
-
+	
+	if not (SineSweep or WhiteNoise):
+		raise Exception('Error: no custom time series type selected')
+	
+	# external files (optional, it may be missing in older versions)
+	use_file_at = xobj.getAttribute('-filePath')
+	use_file = use_file_at is not None and use_file_at.boolean
 	
 	if SineSweep:
 		# with 'SineSweep'
@@ -544,43 +564,13 @@ def writeTcl(pinfo):
 			f0_last=f0_last*2
 			f0=f0_last
 		
-		t = np.linspace(0, timeForOctaves*NOctave, timeForOctaves*NOctave*Division)
+		t = np.linspace(0, timeForOctaves*NOctave, int(timeForOctaves*NOctave*Division))
+		from scipy.signal import chirp
 		w = chirp(t, f0=f0, f1=f1, t1=t1, method='linear')*Amplitude
 		
 		listTimes = t
 		listValues = w
 		
-		#set list TCL
-		times_str = 'set timeSeries_list_of_times_{}'.format(tag)+' {'
-		values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
-		
-		nLettersT = len(times_str)
-		nLettersV = len(values_str)
-		nTabT = nLettersT // 4
-		nTabV = nLettersV // 4
-		
-		n = 1
-		for i in range(len(listTimes)):
-			if (i == (10*n)):
-				times_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabT))
-				values_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabV))
-				n += 1
-			if (i!=len(listTimes)-1):
-				times_str += '{} '.format(listTimes[i])
-				values_str += '{} '.format(listValues[i])
-			else:
-				times_str += '{}'.format(listTimes[i])
-				values_str += '{}'.format(listValues[i])
-		
-		times_str += '}\n'
-		values_str += '}\n'
-		pinfo.out_file.write(times_str)
-		pinfo.out_file.write(values_str)
-		
-		#end list TCL
-		#now write the 'non_constant' string into the file
-		str_tcl = '{0}timeSeries Path {1} -time $timeSeries_list_of_times_{1} -values $timeSeries_list_of_values_{1}{2}\n'.format(pinfo.indent, tag, sopt)
-		
 	if(WhiteNoise == True):
 	
 		ScaleF_at = xobj.getAttribute('ScaleF')
@@ -635,40 +625,24 @@ def writeTcl(pinfo):
 		x = band_limited_noise(Fmin, Fmax, Sample, SampleRate)
 		x = x * (2**15 - 1)
 		
-		x=[xi*ScaleF for xi in x]
+		x = x * ScaleF
 		
 		listTimes = t
 		listValues = x
-		
+	
+	# write the series (as a Path time series)
+	if use_file:
+		str_tcl = '{0}timeSeries Path {1} -fileTime {2} -filePath {3}{4}\n'.format(
+			pinfo.indent, tag, tsu.write_values_file(pinfo, listTimes), tsu.write_values_file(pinfo, listValues), sopt)
+	else:
 		#set list TCL
 		times_str = 'set timeSeries_list_of_times_{}'.format(tag)+' {'
 		values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
-		
-		nLettersT = len(times_str)
-		nLettersV = len(values_str)
-		nTabT = nLettersT // 4
-		nTabV = nLettersV // 4
-		
-		n = 1
-		for i in range(len(listTimes)):
-			if (i == (10*n)):
-				times_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabT))
-				values_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabV))
-				n += 1
-			if (i!=len(listTimes)-1):
-				times_str += '{} '.format(listTimes[i])
-				values_str += '{} '.format(listValues[i])
-			else:
-				times_str += '{}'.format(listTimes[i])
-				values_str += '{}'.format(listValues[i])
-		
-		times_str += '}\n'
-		values_str += '}\n'
-		pinfo.out_file.write(times_str)
-		pinfo.out_file.write(values_str)
-		
+		nTabT = len(times_str) // 4
+		nTabV = len(values_str) // 4
+		pinfo.out_file.write('{}{}}}\n'.format(times_str, tsu.tcl_list(pinfo, listTimes, nTabT)))
+		pinfo.out_file.write('{}{}}}\n'.format(values_str, tsu.tcl_list(pinfo, listValues, nTabV)))
 		#end list TCL
-		#now write the 'non_constant' string into the file
 		str_tcl = '{0}timeSeries Path {1} -time $timeSeries_list_of_times_{1} -values $timeSeries_list_of_values_{1}{2}\n'.format(pinfo.indent, tag, sopt)
 	
-	pinfo.out_file.write(str_tcl)
\ No newline at end of file
+	pinfo.out_file.write(str_tcl)
@@ -3,7 +3,7 @@ from PyMpc import *
 from mpc_utils_html import *
 import PyMpc
 import PyMpc.Math
-import opensees.utils.tcl_input as tclin
+import opensees.utils.time_series_utils as tsu
 
 def makeXObjectMetaData():
 	
@@ -160,6 +160,20 @@ def makeXObjectMetaData():
 		)
 	at_tStart.setDefault(0.0)
 	
+	# -filePath
+	at_filePath = MpcAttributeMetaData()
+	at_filePath.type = MpcAttributeType.Boolean
+	at_filePath.name = '-filePath'
+	at_filePath.group = 'Group'
+	at_filePath.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('-filePath')+'<br/>') + 
+		html_par('optional, to write the load factors (and the times) on external files in the output directory, instead of writing them in the input file. '
+			'Recommended for long records. Series with the same values are written only once') +
+		html_par(html_href('http://opensees.berkeley.edu/wiki/index.php/Path_TimeSeries','Path TimeSeries')+'<br/>') +
+		html_end()
+		)
+	
 	xom = MpcXObjectMetaData()
 	xom.name = 'Path'
 	xom.addAttribute(at_Function)
@@ -173,6 +187,7 @@ def makeXObjectMetaData():
 	xom.addAttribute(at_cFactor)
 	xom.addAttribute(at_startTime)
 	xom.addAttribute(at_tStart)
+	xom.addAttribute(at_filePath)
 	
 	
 	# list_of_times-dep
@@ -316,6 +331,10 @@ def writeTcl(pinfo):
 		sopt += ' -factor {}'.format(cFactor)
 	
 	
+	# external files (optional, it may be missing in older versions)
+	use_file_at = xobj.getAttribute('-filePath')
+	use_file = use_file_at is not None and use_file_at.boolean
+	
 	constant_at = xobj.getAttribute('constant')
 	if(constant_at is None):
 		raise Exception('Error: cannot find "constant" attribute')
@@ -332,27 +351,14 @@ def writeTcl(pinfo):
 		list_of_values_at = xobj.getAttribute('list_of_values')
 		if(list_of_values_at is None):
 			raise Exception('Error: cannot find "list_of_values" attribute')
-		listValues = list_of_values_at.quantityVector
-		
-		#set list TCL
-		values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
-		
-		nLetters=len(values_str)
-		nTab=nLetters//4
+		listValues = tsu.to_array(list_of_values_at.quantityVector)
 		
-		n = 1
-		for i in range(len(listValues)):
-			if (i == (10*n)):
-				values_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTab))
-				n += 1
-			if (i!=len(listValues)-1):
-				values_str += '{} '.format(listValues.valueAt(i))
-			else:
-				values_str += '{}'.format(listValues.valueAt(i))
-		
-		values_str += '}\n'
-		pinfo.out_file.write(values_str)
-		#end list TCL
+		if not use_file:
+			#set list TCL
+			values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
+			nTab = len(values_str)//4
+			pinfo.out_file.write('{}{}}}\n'.format(values_str, tsu.tcl_list(pinfo, listValues, nTab)))
+			#end list TCL
 		
 		#optional paramters with 'constant'
 		startTime_at = xobj.getAttribute('-startTime')
@@ -367,7 +373,10 @@ def writeTcl(pinfo):
 			sopt += ' -startTime {}'.format(tStart)
 		
 		#now write the 'constant' string into the file
-		str_tcl = '{0}timeSeries Path {1} -dt {2} -values $timeSeries_list_of_values_{1} {3}\n'.format(pinfo.indent, tag, dt, sopt)
+		if use_file:
+			str_tcl = '{0}timeSeries Path {1} -dt {2} -filePath {3}{4}\n'.format(pinfo.indent, tag, dt, tsu.write_values_file(pinfo, listValues), sopt)
+		else:
+			str_tcl = '{0}timeSeries Path {1} -dt {2} -values $timeSeries_list_of_values_{1} {3}\n'.format(pinfo.indent, tag, dt, sopt)
 	
 	else:
 		#with 'non_constant'
@@ -376,43 +385,26 @@ def writeTcl(pinfo):
 		list_of_times_at = xobj.getAttribute('list_of_times')
 		if(list_of_times_at is None):
 			raise Exception('Error: cannot find "list_of_times" attribute')
-		listTimes = list_of_times_at.quantityVector
+		listTimes = tsu.to_array(list_of_times_at.quantityVector)
 		
 		list_of_values_at = xobj.getAttribute('list_of_values')
 		if(list_of_values_at is None):
 			raise Exception('Error: cannot find "list_of_values" attribute')
-		listValues = list_of_values_at.quantityVector
-		
-		
-		#set list TCL
-		times_str = 'set timeSeries_list_of_times_{}'.format(tag)+' {'
-		values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
-		
-		nLettersT = len(times_str)
-		nLettersV = len(values_str)
-		nTabT = nLettersT // 4
-		nTabV = nLettersV // 4
+		listValues = tsu.to_array(list_of_values_at.quantityVector)
 		
-		n = 1
-		for i in range(len(listTimes)):
-			if (i == (10*n)):
-				times_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabT))
-				values_str += '\\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTabV))
-				n += 1
-			if (i!=len(listTimes)-1):
-				times_str += '{} '.format(listTimes.valueAt(i))
-				values_str += '{} '.format(listValues.valueAt(i))
-			else:
-				times_str += '{}'.format(listTimes.valueAt(i))
-				values_str += '{}'.format(listValues.valueAt(i))
-		
-		times_str += '}\n'
-		values_str += '}\n'
-		pinfo.out_file.write(times_str)
-		pinfo.out_file.write(values_str)
-		
-		#end list TCL
-		#now write the 'non_constant' string into the file
-		str_tcl = '{0}timeSeries Path {1} -time $timeSeries_list_of_times_{1} -values $timeSeries_list_of_values_{1}{2}\n'.format(pinfo.indent, tag, sopt)
-	
-	pinfo.out_file.write(str_tcl)
\ No newline at end of file
+		if use_file:
+			str_tcl = '{0}timeSeries Path {1} -fileTime {2} -filePath {3}{4}\n'.format(
+				pinfo.indent, tag, tsu.write_values_file(pinfo, listTimes), tsu.write_values_file(pinfo, listValues), sopt)
+		else:
+			#set list TCL
+			times_str = 'set timeSeries_list_of_times_{}'.format(tag)+' {'
+			values_str = 'set timeSeries_list_of_values_{}'.format(tag)+' {'
+			nTabT = len(times_str) // 4
+			nTabV = len(values_str) // 4
+			pinfo.out_file.write('{}{}}}\n'.format(times_str, tsu.tcl_list(pinfo, listTimes, nTabT)))
+			pinfo.out_file.write('{}{}}}\n'.format(values_str, tsu.tcl_list(pinfo, listValues, nTabV)))
+			#end list TCL
+			#now write the 'non_constant' string into the file
+			str_tcl = '{0}timeSeries Path {1} -time $timeSeries_list_of_times_{1} -values $timeSeries_list_of_values_{1}{2}\n'.format(pinfo.indent, tag, sopt)
+	
+	pinfo.out_file.write(str_tcl)
@@ -4,8 +4,6 @@
 #
 # from opensees.defintions.utils.tester.EnableTesterDistribution import *
 
-from opensees.definitions.utils.tester.TesterDistribution import TesterDistributionWidget
-
 class TesterDistributionGuiGlobals:
 	# stores a reference to the gui generated for this object
 	gui = None
@@ -25,4 +23,6 @@ def onEditFinished(editor, xobj):
 
 def onEditBegin(editor, xobj):
 	__removeGui()
+	# the tester (PySide2 and matplotlib) is imported only when the editor is opened
+	from opensees.definitions.utils.tester.TesterDistribution import TesterDistributionWidget
 	TesterDistributionGuiGlobals.gui = TesterDistributionWidget(editor, xobj)
@@ -350,18 +350,19 @@ def preProcessElements(pinfo):
 	# process all nodes based on sequential/partitoned mesh
 	if pinfo.process_count > 1:
 		# split domain elements by partition (use source node partition)
+		pindex = pinfo.getPartitionIndex()
 		for processor_id in range(pinfo.process_count):
 			pid_count = 0 # number of joints processed in this partition
 			# process each joint
 			for _, joint in manager.items.items():
-				if doc.mesh.partitionData.isNodeOnPartition(joint.source_node, processor_id):
+				if pindex.isNodeOnPartition(joint.source_node, processor_id):
 					# this joint can be processed on this partition
 					# open process scope (only for the first one in this processor)
 					if pid_count == 0:
 						pinfo.setProcessId(processor_id)
 						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', processor_id, '} {'))
 					# write this joint
-					write_joint(joint, do_spring = (doc.mesh.partitionData.nodePartition(joint.source_node)==processor_id), indent=pinfo.tabIndent)
+					write_joint(joint, do_spring = (pindex.nodePartition(joint.source_node)==processor_id), indent=pinfo.tabIndent)
 					pid_count += 1
 			# close process scope
 			if pid_count > 0:
@@ -202,8 +202,10 @@ def preProcessElements(pinfo):
 	#         key = boundary type
 	#         value = set of partitions for that boundary type
 	node_info = {}
+	# (all elements are on process 0 in a sequential model)
+	pindex = pinfo.getPartitionIndex() if pinfo.process_count > 1 else None
 	for elem in source_elements:
-		pid = doc.mesh.partitionData.elementPartition(elem.id)
+		pid = pindex.elementPartition(elem.id) if pindex is not None else 0
 		center = (elem.nodes[0].position + elem.nodes[1].position)/2.0
 		x = center.x
 		y = center.y
@@ -407,7 +409,7 @@ def writeTcl(pinfo):
 	doc = App.caeDocument()
 	if doc is None:
 		raise Exception(_err('Null document'))
-	this_partition = doc.mesh.partitionData.elementPartition(tag)
+	this_partition = pinfo.getPartitionIndex().elementPartition(tag) if pinfo.process_count > 1 else 0
 	
 	# create the data for auto-generated elements
 	auto_gen_data = tclin.auto_generated_element_data()
@@ -152,14 +152,15 @@ def writeTcl(pinfo):
 	pinfo.updateModelBuilder(ndm, ndf)
 	
 	# geometric transformation command
-	pinfo.out_file.write(gtran.writeGeomTransf(pinfo, (not is_2d), name = 'transfType'))
+	transf_str, transf_tag = gtran.getGeomTransf(pinfo, (not is_2d), name = 'transfType')
+	pinfo.out_file.write(transf_str)
 	
 	# now write the string into the file
 	if is_2d:
 		pinfo.out_file.write('{}element ElasticTimoshenkoBeam {}   {} {}   {} {} {} {} {}   {}   {}\n'.format(
 			pinfo.indent, tag, elem.nodes[0].id, elem.nodes[1].id,
-			E, G, A, Iz, Avy, tag, mass))
+			E, G, A, Iz, Avy, transf_tag, mass))
 	else:
 		pinfo.out_file.write('{}element ElasticTimoshenkoBeam {}   {} {}   {} {} {} {} {} {} {} {}   {}   {}\n'.format(
 			pinfo.indent, tag, elem.nodes[0].id, elem.nodes[1].id,
-			E, G, A, J, Iy, Iz, Avy, Avz, tag, mass))
\ No newline at end of file
+			E, G, A, J, Iy, Iz, Avy, Avz, transf_tag, mass))
\ No newline at end of file
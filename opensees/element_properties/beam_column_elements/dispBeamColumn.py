@@ -95,7 +95,7 @@ def getNodalSpatialDim(xobj, xobj_phys_prop):
 	
 	return [(ndm,ndf),(ndm,ndf)]
 
-def writeTcl(pinfo):
+def makeTclWriter(pinfo):
 	xobj = pinfo.elem_prop.XObject
 	
 	# getSpatialDim
@@ -109,15 +109,22 @@ def writeTcl(pinfo):
 		ndm = 3
 		ndf = 6
 	
-	pinfo.updateModelBuilder(ndm, ndf)
-	
 	cMass_at = xobj.getAttribute('-cMass')
 	if(cMass_at is None):
 		raise Exception('Error: cannot find "-cMass" attribute')
 	if cMass_at.boolean:
 		cMass = ' -cMass'
-		# writeTcl_internalBeamFunction
-		internalBeamColumnElement.writeTcl_internalBeamFunction(pinfo, cMass)
+		# makeTclWriter_internalBeamFunction
+		beam_writer = internalBeamColumnElement.makeTclWriter_internalBeamFunction(pinfo, cMass)
 	else:
-		# writeTcl_internalBeamFunction
-		internalBeamColumnElement.writeTcl_internalBeamFunction(pinfo)
\ No newline at end of file
+		# makeTclWriter_internalBeamFunction
+		beam_writer = internalBeamColumnElement.makeTclWriter_internalBeamFunction(pinfo)
+	
+	def writer(pinfo):
+		pinfo.updateModelBuilder(ndm, ndf)
+		beam_writer(pinfo)
+	
+	return writer
+
+def writeTcl(pinfo):
+	makeTclWriter(pinfo)(pinfo)
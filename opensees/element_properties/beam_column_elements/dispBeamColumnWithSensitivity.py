@@ -310,9 +310,10 @@ def writeTcl(pinfo):
 		sopt += ' -integration {}'.format(IntegrationType)
 	
 	# geometric transformation command
-	pinfo.out_file.write(gtran.writeGeomTransf(pinfo, (not Dimension2)))
+	transf_str, transf_tag = gtran.getGeomTransf(pinfo, (not Dimension2))
+	pinfo.out_file.write(transf_str)
 	
-	str_tcl = '{}element dispBeamColumnWithSensitivity {}{} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, numIntgrPts, secTag, tag, sopt)
+	str_tcl = '{}element dispBeamColumnWithSensitivity {}{} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, numIntgrPts, secTag, transf_tag, sopt)
 	
 	# now write the string into the file
 	pinfo.out_file.write(str_tcl)
\ No newline at end of file
@@ -443,8 +443,9 @@ def writeTcl(pinfo):
 	pinfo.updateModelBuilder(ndm, ndf)
 	
 	# geometric transformation command
-	pinfo.out_file.write(gtran.writeGeomTransf(pinfo, (not d.Dimension2), name = 'transfType'))
+	transf_str, transf_tag = gtran.getGeomTransf(pinfo, (not d.Dimension2), name = 'transfType')
+	pinfo.out_file.write(transf_str)
 	
 	# now write the string into the file
-	str_tcl = '{}element elasticBeamColumn {}{} {} {}{}\n'.format(pinfo.indent, tag, nstr, param, tag, sopt)
+	str_tcl = '{}element elasticBeamColumn {}{} {} {}{}\n'.format(pinfo.indent, tag, nstr, param, transf_tag, sopt)
 	pinfo.out_file.write(str_tcl)
\ No newline at end of file
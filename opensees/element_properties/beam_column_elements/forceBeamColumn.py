@@ -142,17 +142,11 @@ def getNodalSpatialDim(xobj, xobj_phys_prop):
 	
 	return [(ndm,ndf),(ndm,ndf)]
 
-def writeTcl(pinfo):
+def makeTclWriter(pinfo):
 	
 	# element forceBeamColumn $eleTag $iNode $jNode $transfTag "IntegrationType arg1 arg2 ..." <-mass $massDens> <-iter $maxIters $tol>
 	
-	elem = pinfo.elem
-	phys_prop = pinfo.phys_prop
-	elem_prop = pinfo.elem_prop
-	
-	tag = elem.id
-	secTag = phys_prop.id
-	xobj = elem_prop.XObject
+	xobj = pinfo.elem_prop.XObject
 	
 	# getSpatialDim
 	Dimension2_at = xobj.getAttribute('2D')
@@ -165,8 +159,6 @@ def writeTcl(pinfo):
 		ndm = 3
 		ndf = 6
 	
-	pinfo.updateModelBuilder(ndm, ndf)
-	
 	sopt = ''
 	
 	cMass_at = xobj.getAttribute('-cMass')
@@ -192,4 +184,13 @@ def writeTcl(pinfo):
 		
 		sopt+= ' -iter {} {}'.format(maxIters, tol)
 	
-	internalBeamColumnElement.writeTcl_internalBeamFunction(pinfo, sopt)
\ No newline at end of file
+	beam_writer = internalBeamColumnElement.makeTclWriter_internalBeamFunction(pinfo, sopt)
+	
+	def writer(pinfo):
+		pinfo.updateModelBuilder(ndm, ndf)
+		beam_writer(pinfo)
+	
+	return writer
+
+def writeTcl(pinfo):
+	makeTclWriter(pinfo)(pinfo)
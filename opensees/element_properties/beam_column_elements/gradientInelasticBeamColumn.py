@@ -182,10 +182,11 @@ def writeTcl(pinfo):
 		sopt += ' -iter {} {} {}'.format(geta('maxIter').integer, geta('minTol').quantityScalar.value, geta('maxTol').quantityScalar.value)
 
 	# geometric transformation command
-	pinfo.out_file.write(gtran.writeGeomTransf(pinfo, (not d.Dimension2), name = 'transfType'))
+	transf_str, transf_tag = gtran.getGeomTransf(pinfo, (not d.Dimension2), name = 'transfType')
+	pinfo.out_file.write(transf_str)
 
 	# element gradientInelasticBeamColumn $eleTag $iNode $jNode $numIntgrPts $endSecTag1 $intSecTag $endSecTag2 $lambda1 $lambda2 $lc $transfTag <-integration integrType> <-iter $maxIter $minTol $maxTol>
-	str_tcl = '{}element gradientInelasticBeamColumn {}{} {} {} {} {} {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, numIntgrPts, endSecTag1, intSecTag, endSecTag2, lambda1, lambda2, lc, tag, sopt)
+	str_tcl = '{}element gradientInelasticBeamColumn {}{} {} {} {} {} {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, numIntgrPts, endSecTag1, intSecTag, endSecTag2, lambda1, lambda2, lc, transf_tag, sopt)
 	
 	# now write the string into the file
 	pinfo.out_file.write(str_tcl)
@@ -4,6 +4,7 @@ from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 import opensees.element_properties.utils.geomTransf as gtran
 import itertools
+from collections import namedtuple
 
 def internalBeamFunction(xom):
 	
@@ -426,37 +427,27 @@ def __option9(phys_prop):
 	
 	return ('{} {}{}{}'.format(IntegrationType, numIntPts, secTag_, positions_))
 
-def writeTcl_internalBeamFunction(pinfo, specific_options = ''):
-	
-	elem = pinfo.elem
+# frozen parameters of an internal beam element, resolved once
+# for each (element property, physical property) pair
+_internal_beam_params_t = namedtuple('_internal_beam_params_t', ['class_name', 'description', 'is3D', 'trans_type', 'template'])
+
+def makeTclWriter_internalBeamFunction(pinfo, specific_options = ''):
+	'''
+	resolves all the attributes of the current element and physical property
+	and returns a writer function that only substitutes the element id and nodes.
+	'''
 	phys_prop = pinfo.phys_prop
 	elem_prop = pinfo.elem_prop
 	
-	tag = elem.id
 	xobj = elem_prop.XObject
 	
 	ClassName = xobj.name
-	if pinfo.currentDescription != ClassName:
-		pinfo.out_file.write('\n{}# {} {}\n'.format(pinfo.indent, xobj.Xnamespace, ClassName))
-		pinfo.currentDescription = ClassName
 	
 	Dimension2_at = xobj.getAttribute('2D')
 	if(Dimension2_at is None):
 		raise Exception('Error: cannot find "2D" attribute')
 	Dimension2 = Dimension2_at.boolean
 	
-	# nodes
-	node_vect = [node.id for node in elem.nodes]
-	# apply correction for joints
-	if not Dimension2:
-		if 'RCJointModel3D' in pinfo.custom_data:
-			joint_manager = pinfo.custom_data['RCJointModel3D']
-			joint_manager.adjustBeamConnectivity(pinfo, elem, node_vect)
-	nstr = ' '.join(str(i) for i in node_vect)
-	
-	if (elem.geometryFamilyType() != MpcElementGeometryFamilyType.Line or len(node_vect)!=2):
-		raise Exception('Error: invalid type of element or number of nodes')
-	
 	# opzioni
 	sopt1 = ''
 	Option_at = phys_prop.XObject.getAttribute('Option')
@@ -498,10 +489,48 @@ def writeTcl_internalBeamFunction(pinfo, specific_options = ''):
 		
 		sopt += ' -mass {}'.format(massDens.value)
 	
-	# geometric transformation command
-	pinfo.out_file.write(gtran.writeGeomTransf(pinfo, (not Dimension2)))
-	
-	str_tcl = '{}element {} {} {} {} {}{}{}\n'.format(pinfo.indent, ClassName, tag, nstr, tag, sopt1, sopt, specific_options)
+	# geometric transformation type
+	transType_at = xobj.getAttribute('transType')
+	if(transType_at is None):
+		raise Exception('Error: cannot find "transType" attribute')
+	
+	# the element string, with placeholders for tag, nodes and transformation tag.
+	# (escape braces of the options, they are not placeholders)
+	options = '{}{}{}'.format(sopt1, sopt, specific_options).replace('{', '{{').replace('}', '}}')
+	params = _internal_beam_params_t(
+		ClassName,
+		'# {} {}\n'.format(xobj.Xnamespace, ClassName),
+		not Dimension2,
+		transType_at.string,
+		'element {} {{0}} {{1}} {{2}} {}\n'.format(ClassName, options))
+	
+	def writer(pinfo):
+		elem = pinfo.elem
+		tag = elem.id
+		
+		if pinfo.currentDescription != params.class_name:
+			pinfo.out_file.write('\n{}{}'.format(pinfo.indent, params.description))
+			pinfo.currentDescription = params.class_name
+		
+		# nodes
+		node_vect = [node.id for node in elem.nodes]
+		# apply correction for joints
+		if params.is3D:
+			if 'RCJointModel3D' in pinfo.custom_data:
+				joint_manager = pinfo.custom_data['RCJointModel3D']
+				joint_manager.adjustBeamConnectivity(pinfo, elem, node_vect)
+		
+		if (elem.geometryFamilyType() != MpcElementGeometryFamilyType.Line or len(node_vect)!=2):
+			raise Exception('Error: invalid type of element or number of nodes')
+		
+		# geometric transformation command
+		transf_str, transf_tag = gtran.getGeomTransfType(pinfo, params.is3D, params.trans_type)
+		pinfo.out_file.write(transf_str)
+		
+		# now write the string into the file
+		pinfo.out_file.write(pinfo.indent + params.template.format(tag, ' '.join(str(i) for i in node_vect), transf_tag))
 	
-	# now write the string into the file
-	pinfo.out_file.write(str_tcl)
\ No newline at end of file
+	return writer
+
+def writeTcl_internalBeamFunction(pinfo, specific_options = ''):
+	makeTclWriter_internalBeamFunction(pinfo, specific_options)(pinfo)
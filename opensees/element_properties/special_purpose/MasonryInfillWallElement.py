@@ -5,7 +5,6 @@ import opensees.utils.tcl_input as tclin
 import opensees.physical_properties.materials.uniaxial.ConcretewBeta as cwb
 from math import *
 import numpy as np
-from scipy.optimize import fsolve
 import os
 import shutil
 import glob
@@ -393,6 +392,7 @@ def writeTcl(pinfo):
 		return R
 
 	guess = np.array([1.0, 1.0])
+	from scipy.optimize import fsolve
 	[gamma, eta] = fsolve(target_function, guess)
 	A = [gamma*(abs(z[i])**eta) for i in range(Nfiber)]
 
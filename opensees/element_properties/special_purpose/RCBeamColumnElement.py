@@ -667,9 +667,10 @@ def writeTcl(pinfo):
 			sopt += ' -cMass'
 			
 		# geometric transformation command
-		pinfo.out_file.write(gtran.writeGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation')))
+		transf_str, transf_tag = gtran.getGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation'))
+		pinfo.out_file.write(transf_str)
 		
-		str_tcl = '{}element forceBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, tag, sopt1, sopt)
+		str_tcl = '{}element forceBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, transf_tag, sopt1, sopt)
 		
 		pinfo.out_file.write(str_tcl)
 	elif (pp_model.formulation == 'lumpedZL'):
@@ -837,9 +838,10 @@ def writeTcl(pinfo):
 					sopt += ' -cMass'
 				
 				# geometric transformation command
-				pinfo.out_file.write(gtran.writeGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation')))
+				transf_str, transf_tag = gtran.getGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation'))
+				pinfo.out_file.write(transf_str)
 				
-				str_tcl = '{}element elasticBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, param, tag, sopt)
+				str_tcl = '{}element elasticBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, param, transf_tag, sopt)
 				
 				pinfo.out_file.write(str_tcl)
 			else:
@@ -899,9 +901,10 @@ def writeTcl(pinfo):
 					sopt += ' -cMass'
 				
 				# geometric transformation command DIEGO TODO
-				pinfo.out_file.write(gtran.writeGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation')))
+				transf_str, transf_tag = gtran.getGeomTransfType(pinfo, (not Dimension2), elem_model.get('transformation'))
+				pinfo.out_file.write(transf_str)
 				
-				str_tcl = '{}element forceBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, tag, sopt1, sopt)
+				str_tcl = '{}element forceBeamColumn {} {} {} {}{}\n'.format(pinfo.indent, tag, nstr, transf_tag, sopt1, sopt)
 				
 				pinfo.out_file.write(str_tcl)
 		
@@ -93,4 +93,127 @@ def writeGeomTransf(pinfo, is3D, name = 'transType'):
 	if(transType_at is None):
 		raise Exception('Error: cannot find "{}" attribute'.format(name))
 	transType = transType_at.string
-	return writeGeomTransfType(pinfo, is3D, transType)
\ No newline at end of file
+	return writeGeomTransfType(pinfo, is3D, transType)
+
+class geom_transf_registry_t:
+	'''
+	A registry of the geometric transformations written so far.
+	Beam elements with the same transformation type, vecxz and joint offsets
+	(compared up to a tolerance) share the same geomTransf command.
+	The tag of a shared transformation is the id of the first element that used it,
+	so that it cannot clash with transformations still tagged with their element id.
+	Transformations are registered per process, because in partitioned models
+	each process only reads its own part of the model.
+	'''
+	def __init__(self, tolerance = 1.0e-10):
+		self.tolerance = tolerance
+		# KEY = (process_id, transType, is3D, rounded vecxz, rounded offsets) : VALUE = tag
+		self.tags = {}
+		# KEY = physical property id : VALUE = (offset_y, offset_z)
+		self.offsets = {}
+	
+	def getSectionOffset(self, phys_prop):
+		'''
+		returns the (offset_y, offset_z) pair in local directions of the given physical property,
+		importing its module and calling getSectionOffset only once per physical property
+		'''
+		offset = self.offsets.get(phys_prop.id, None)
+		if offset is None:
+			import importlib
+			xobj = phys_prop.XObject
+			if xobj.Xnamespace:
+				module_name = 'opensees.physical_properties.{}.{}'.format(xobj.Xnamespace, xobj.name)
+			else:
+				module_name = 'opensees.physical_properties.{}'.format(xobj.name)
+			module = importlib.import_module(module_name)
+			if hasattr(module, 'getSectionOffset'):
+				offset = module.getSectionOffset(xobj)
+			else:
+				offset = (0.0, 0.0)
+			self.offsets[phys_prop.id] = offset
+		return offset
+	
+	def get(self, pinfo, is3D, transType):
+		'''
+		returns a tuple with the coordinate transformation command (an end-line-terminated string,
+		empty if the transformation has already been written) and the tag of the transformation
+		for the current element in pinfo
+		'''
+		import math
+		
+		# current element data
+		elem = pinfo.elem
+		
+		# 3x3 element orientation matrix [vX | vY | vZ]
+		T = elem.orientation.computeOrientation()
+		vZ = T.col(2)
+		
+		# section offsets, in global coordinates
+		offset_y, offset_z = self.getSectionOffset(pinfo.phys_prop)
+		vO = None
+		if math.sqrt(offset_y**2 + offset_z**2) > 1.0e-14:
+			vY = T.col(1)
+			vO = vY*offset_y + vZ*offset_z
+		
+		# hash key
+		tol = self.tolerance
+		if is3D:
+			key_vz = (round(vZ.x/tol), round(vZ.y/tol), round(vZ.z/tol))
+			key_vo = None if vO is None else (round(vO.x/tol), round(vO.y/tol), round(vO.z/tol))
+		else:
+			key_vz = None
+			key_vo = None if vO is None else (round(vO.x/tol), round(vO.y/tol))
+		key = (pinfo.process_id, transType, is3D, key_vz, key_vo)
+		
+		# already written
+		tag = self.tags.get(key, None)
+		if tag is not None:
+			return ('', tag)
+		
+		# new transformation
+		tag = elem.id
+		self.tags[key] = tag
+		ss = '# Geometric transformation command\ngeomTransf {} {}'.format(transType, tag)
+		if is3D:
+			ss += ' {} {} {}'.format(vZ.x, vZ.y, vZ.z)
+		if vO is not None:
+			if is3D:
+				# -jntOffset $dXi $dYi $dZi $dXj $dYj $dZj
+				ss += ' -jntOffset {0} {1} {2}   {0} {1} {2}'.format(vO.x, vO.y, vO.z)
+			else:
+				# -jntOffset $dXi $dYi $dXj $dYj
+				ss += ' -jntOffset {0} {1}   {0} {1}'.format(vO.x, vO.y)
+		ss += '\n'
+		return (ss, tag)
+
+def getGeomTransfRegistry(pinfo):
+	'''
+	returns the geom_transf_registry_t of the current model, stored in pinfo.custom_data
+	'''
+	registry = pinfo.custom_data.get('GeomTransfRegistry', None)
+	if registry is None:
+		registry = geom_transf_registry_t()
+		pinfo.custom_data['GeomTransfRegistry'] = registry
+	return registry
+
+def getGeomTransfType(pinfo, is3D, transType):
+	'''
+	same as writeGeomTransfType, but the transformation is shared among all elements
+	with the same transformation type, vecxz and joint offsets.
+	This function returns a tuple with the command string (empty if the transformation
+	has already been written) and the tag to be used in the element command
+	'''
+	return getGeomTransfRegistry(pinfo).get(pinfo, is3D, transType)
+
+def getGeomTransf(pinfo, is3D, name = 'transType'):
+	'''
+	same as above, but taking the type from the xobject, assuming the makeAttribute 
+	method was used.
+	'''
+	elem_prop = pinfo.elem_prop
+	xobj = elem_prop.XObject
+	transType_at = xobj.getAttribute(name)
+	if(transType_at is None):
+		raise Exception('Error: cannot find "{}" attribute'.format(name))
+	transType = transType_at.string
+	return getGeomTransfType(pinfo, is3D, transType)
@@ -1,30 +1,14 @@
 import PyMpc
 import PyMpc.Utils
-import importlib
 import os
-import pkgutil
 
-def __load_module_internal(namespace, the_register_func):
-	basedir = '{}{}opensees'.format(PyMpc.Utils.get_external_solvers_dir(), os.sep)
-	the_dir = '{}{}{}'.format(basedir, os.sep, os.sep.join(namespace))
-	the_namespace = '.'.join(namespace)
-	if len(namespace) > 0:
-		the_xnamespace = '.'.join(namespace[1:])
-	else:
-		the_xnamespace = ''
-	#msg_loaded = []
-	the_modules = [imodule_name for _, imodule_name, _ in pkgutil.iter_modules([ the_dir ])]
-	for imodule_name in the_modules:
-		#msg_loaded.append('registering {} [{}]:  {}'.format(namespace[0], the_xnamespace, imodule_name))
-		imodule = importlib.import_module('opensees.{}.{}'.format(the_namespace , imodule_name))
-		if hasattr(imodule, 'makeXObjectMetaData'):
-			imetadata = imodule.makeXObjectMetaData()
-			imetadata.Xnamespace = the_xnamespace
-			the_register_func(imetadata)
+from opensees.utils.metadata_registry import MetadataRegistry
+
+# the metadata registry used during initialize()
+_registry = None
 
-	#if len(msg_loaded) > 0:
-	#	msg_loaded.append('--------------------------------------------------------------')
-	#	print('\n'.join(msg for msg in msg_loaded))
+def __load_module_internal(namespace, the_register_func):
+	_registry.load(namespace, the_register_func)
 
 def initialize():
 	
@@ -40,6 +24,10 @@ def initialize():
 	doc.unregisterMetaDataAll()
 	opensees_dir = PyMpc.Utils.get_external_solvers_dir() + os.sep + 'opensees'
 	
+	# metadata are loaded from the cache when possible, without importing the modules
+	global _registry
+	_registry = MetadataRegistry(opensees_dir, 'opensees')
+	
 	# register all metadata of physical properties
 	__load_module_internal(['physical_properties', 'materials', 'nD'], doc.registerMetaDataPhysicalProperty)
 	__load_module_internal(['physical_properties', 'materials', 'nD', 'PlugIn'], doc.registerMetaDataPhysicalProperty)
@@ -98,3 +86,7 @@ def initialize():
 	__load_module_internal(['analysis_steps', 'Analyses'], doc.registerMetaDataAnalysisStep)
 	__load_module_internal(['analysis_steps', 'Custom'], doc.registerMetaDataAnalysisStep)
 	__load_module_internal(['analysis_steps', 'Misc_commands'], doc.registerMetaDataAnalysisStep)
+	
+	# save the metadata cache
+	_registry.save()
+	_registry = None
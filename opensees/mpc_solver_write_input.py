@@ -4,7 +4,6 @@ import shutil
 import importlib
 import sys
 import subprocess
-import pkgutil
 import PyMpc
 import PyMpc.App
 import opensees
@@ -15,9 +14,10 @@ import opensees.utils.write_definitions as write_definitions
 import opensees.utils.write_element as write_element
 import opensees.utils.write_node as write_node
 import opensees.utils.time_increment_utils as dt_utils
+import opensees.utils.time_series_utils as tsu
 from io import StringIO
 
-def write_tcl_int(out_dir):
+def write_tcl_int(out_dir, added_partition_nodes = None):
 	
 	# define block durations
 	duration_mapping = 0.3
@@ -55,6 +55,11 @@ def write_tcl_int(out_dir):
 	pinfo = tclin.process_info()
 	pinfo.out_dir = out_dir
 	
+	# use the compact storage for nodal data in very large models
+	if len(doc.mesh.nodes) >= 1000000:
+		print('Large model: using compact storage for nodal data.')
+		pinfo.useCompactStorage()
+	
 	# remove all residual data from a Monitor
 	# remove all stats, plt, pltbg
 	for ext in ['plt', 'pltbg', 'stats']:
@@ -71,12 +76,36 @@ def write_tcl_int(out_dir):
 	if os.path.exists(monitor_runner) and os.path.isfile(monitor_runner):
 		os.remove(monitor_runner)
 	
+	# remove all residual external time series files (they are named after their contents)
+	tsu.remove_values_files(pinfo.out_dir)
+	
+	# remove all residual per-process files from a previous partitioned model
+	for prefix in ['nodes', 'elements']:
+		for f in glob.glob('{}/{}.part-*.tcl'.format(pinfo.out_dir, prefix)):
+			os.remove(f)
+	
 	# let's see if we have a partitioned model
 	is_partitioned = False
 	process_count = len(doc.mesh.partitionData.partitions)
 	if process_count > 1:
 		is_partitioned = True
 		pinfo.setProcessCount(process_count)
+		# build the partition index once, it will be shared by all partitioned writers.
+		# the added_partition_nodes (if any) are the nodes temporarily added to other partitions
+		# by the _mp_handler
+		PyMpc.App.monitor().sendMessage('indexing partitions...')
+		pinfo.partition_index = tclin.partition_index_t(doc, added_partition_nodes)
+	
+	# in a partitioned model, nodes and elements can be written in one file per process.
+	# each process will source only its own files
+	is_split = is_partitioned and pinfo.split_partition_files
+	def open_part_files(prefix):
+		return [open('{}{}{}.part-{}.tcl'.format(out_dir, os.sep, prefix, process_id), 'w+', encoding='utf-8')
+			for process_id in range(process_count)]
+	def close_part_files(part_files):
+		if part_files is not None:
+			for f in part_files:
+				f.close()
 	
 	# create the main script
 	main_file_name = '{}{}main.tcl'.format(out_dir, os.sep)
@@ -246,19 +275,20 @@ def write_tcl_int(out_dir):
 	node_file_name = 'nodes.tcl'
 	PyMpc.App.monitor().sendMessage('writing nodes...')
 	node_file = open('{}{}{}'.format(out_dir, os.sep, node_file_name), 'w+', encoding='utf-8')
+	node_part_files = open_part_files('nodes') if is_split else None
 	pinfo.out_file = node_file
 	PyMpc.App.monitor().setRange(current_percentage, current_percentage + duration_nodes)
 	if not has_model_subsets:
 		num_items = len(doc.mesh.nodes)
-		increment = duration_nodes / max(num_items, 1)
+		increment = duration_nodes / max(num_items, 1) * write_node.NODE_PROGRESS_BATCH
 		PyMpc.App.monitor().setAutoIncrement(increment)
 		if num_items > 20:
 			PyMpc.App.monitor().setDisplayIncrement(duration_nodes/20)
 		else:
 			PyMpc.App.monitor().setDisplayIncrement(0.0)
 		if is_partitioned:
-			write_node.write_node_partition (doc, pinfo, node_file)
-			write_node.write_node_not_assigned_partition (doc, pinfo, node_file)
+			write_node.write_node_partition (doc, pinfo, node_file, node_part_files)
+			write_node.write_node_not_assigned_partition (doc, pinfo, node_file, node_part_files)
 		else:
 			write_node.write_node (doc, pinfo, node_file)
 			write_node.write_node_not_assigned (doc, pinfo, node_file)
@@ -267,6 +297,7 @@ def write_tcl_int(out_dir):
 	PyMpc.App.monitor().setRange(0.0, 1.0)
 	PyMpc.App.monitor().sendPercentage(current_percentage)
 	node_file.close()
+	close_part_files(node_part_files)
 	
 	# begin pre process elements ========================================================
 	# we need to pre-process elements here, after materials,sections and nodes
@@ -276,17 +307,7 @@ def write_tcl_int(out_dir):
 	pre_proc_ele_buffer = StringIO()
 	pinfo.out_file = pre_proc_ele_buffer
 	PyMpc.App.monitor().sendMessage('pre-processing elements...')
-	dir_external_solvers = PyMpc.Utils.get_external_solvers_dir()
-	elem_modules_path = '{0}{1}opensees{1}element_properties'.format(dir_external_solvers, os.sep)
-	for path, subdirs, files in os.walk(elem_modules_path):
-		for _, imodule_name, _ in pkgutil.iter_modules([ path ]):
-			rpath = os.path.relpath(path, dir_external_solvers)
-			rpath = rpath.replace('/', '.')
-			rpath = rpath.replace('\\', '.')
-			imodule = importlib.import_module('{}.{}'.format(rpath, imodule_name))
-			if hasattr(imodule, 'preProcessElements'):
-				print('pre-processing module: {}'.format(imodule_name))
-				imodule.preProcessElements(pinfo)
+	write_element.pre_process_elements(doc, pinfo)
 	# end  pre process elements =========================================================
 	
 	# elements.
@@ -295,6 +316,7 @@ def write_tcl_int(out_dir):
 	element_file_name = 'elements.tcl'
 	PyMpc.App.monitor().sendMessage('writing elements...')
 	element_file = open('{}{}{}'.format(out_dir, os.sep, element_file_name), 'w+', encoding='utf-8')
+	element_part_files = open_part_files('elements') if is_split else None
 	pinfo.out_file = element_file
 	PyMpc.App.monitor().setRange(current_percentage, current_percentage + duration_elements)
 	if not has_model_subsets:
@@ -306,12 +328,13 @@ def write_tcl_int(out_dir):
 		else:
 			PyMpc.App.monitor().setDisplayIncrement(0.0)
 		if is_partitioned:
-			write_element.write_geom_partition(doc, pinfo, element_file)
-			write_element.write_inter_partition(doc, pinfo, element_file)
+			write_element.write_geom_partition(doc, pinfo, element_file, element_part_files)
+			write_element.write_inter_partition(doc, pinfo, element_file, element_part_files)
 		else:
 			write_element.write_geom(doc, pinfo)
 			write_element.write_inter(doc, pinfo)
 	element_file.close()
+	close_part_files(element_part_files)
 	pinfo.elem = None
 	pinfo.phys_prop = None
 	pinfo.elem_prop = None
@@ -331,10 +354,12 @@ def write_tcl_int(out_dir):
 	# search for all monitors (if any) and do the first monitor initialization.
 	# if at least a monitor is defined, all analyses will have a monitor.
 	# for analyses without their own monitor, the application initializes the first monitor in the following function
+	has_monitor = False
 	for _, step in doc.analysisSteps.items() :
 		if step.XObject.name == 'monitor':
 			# pinfo.monitor = True # It is not needed because now I always call customFunction
 			write_analysis_steps.initialize_first_monitor(doc, step, pinfo)
+			has_monitor = True
 			break
 	
 	# custom time-increment utils
@@ -370,7 +395,10 @@ def write_tcl_int(out_dir):
 
 	# source node
 	main_file.write('# source node\n')
-	main_file.write('source {}\n'.format(node_file_name))
+	if is_split:
+		main_file.write('source [format "nodes.part-%d.tcl" $STKO_VAR_process_id]\n')
+	else:
+		main_file.write('source {}\n'.format(node_file_name))
 	
 	# pre-processes elements
 	ppebuff = pre_proc_ele_buffer.getvalue()
@@ -380,11 +408,30 @@ def write_tcl_int(out_dir):
 	
 	# source element
 	main_file.write('# source element\n')
-	main_file.write('source {}\n'.format(element_file_name))
+	if is_split:
+		main_file.write('source [format "elements.part-%d.tcl" $STKO_VAR_process_id]\n')
+	else:
+		main_file.write('source {}\n'.format(element_file_name))
 
 	# source analysis_steps
 	main_file.write('# source analysis_steps\n')
-	main_file.write('source {}\n'.format(analysis_steps_file_name))
+	if has_monitor:
+		# the monitor output files are closed (and flushed) also when the analysis
+		# is stopped with an error, otherwise the last flush interval would be lost.
+		# the error is raised again after closing them
+		main_file.write('if {{[catch {{source {}}} STKO_VAR_error_message]}} {{\n'.format(analysis_steps_file_name))
+		main_file.write('\tset STKO_VAR_error_info $::errorInfo\n')
+		main_file.write('\tset STKO_VAR_error_code $::errorCode\n')
+		main_file.write('\tif {[llength [info procs STKO_MonitorClose]] > 0} {\n')
+		main_file.write('\t\tSTKO_MonitorClose\n')
+		main_file.write('\t}\n')
+		main_file.write('\terror $STKO_VAR_error_message $STKO_VAR_error_info $STKO_VAR_error_code\n')
+		main_file.write('}\n')
+		# close monitor output files
+		main_file.write('\n# close monitor output files\n')
+		main_file.write('STKO_MonitorClose\n')
+	else:
+		main_file.write('source {}\n'.format(analysis_steps_file_name))
 	
 	# clear all
 	main_file.write('\nwipe\n')
@@ -405,6 +452,13 @@ class _mp_handler:
 		# value = [list] of other partitions
 		self.pmap_remove = {}
 		self.verbose = False
+		# the partition index used by the ensureNodesOnPartitions methods.
+		# it is built only if needed, and it is kept in sync with the nodes added here
+		self.partition_index = None
+	def getPartitionIndex(self, doc):
+		if self.partition_index is None:
+			self.partition_index = tclin.partition_index_t(doc)
+		return self.partition_index
 	def begin(self):
 		print('MP Handler: begin')
 		doc = PyMpc.App.caeDocument()
@@ -424,7 +478,7 @@ class _mp_handler:
 				imodule = importlib.import_module('opensees.conditions.{}'.format(xobj.completeName))
 				if hasattr(imodule, 'ensureNodesOnPartitions'):
 					print(xobj.completeName, '[ensureNodesOnPartitions]')
-					imodule.ensureNodesOnPartitions(xobj, pmap)
+					imodule.ensureNodesOnPartitions(xobj, pmap, self.getPartitionIndex(doc))
 			if self.verbose:
 				print('P.MAP:')
 				for node_id, partitions in pmap.items():
@@ -441,6 +495,7 @@ class _mp_handler:
 						if self.verbose:
 							before = doc.mesh.partitionData.isNodeOnPartition(node_id, pid)
 						doc.mesh.partitionData.addNode(doc.mesh.getNode(node_id), pid)
+						self.getPartitionIndex(doc).addNode(node_id, pid)
 						if self.verbose:
 							after = doc.mesh.partitionData.isNodeOnPartition(node_id, pid)
 							print('... adding node {} to partition {} [{}, {}]'.format(node_id, pid, before, after))
@@ -477,7 +532,7 @@ def write_tcl(out_dir):
 	mp = _mp_handler()
 	try:
 		mp.begin()
-		write_tcl_int(out_dir)
+		write_tcl_int(out_dir, mp.pmap_remove)
 	finally:
 		mp.end()
 	'''
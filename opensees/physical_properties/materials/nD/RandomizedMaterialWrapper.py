@@ -7,7 +7,6 @@ from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 import opensees.utils.RandomMaterialTable as RMT
 
-from scipy.spatial import KDTree
 import numpy as np
 import importlib
 import os
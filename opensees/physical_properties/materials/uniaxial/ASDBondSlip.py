@@ -7,7 +7,6 @@ from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 import math
-from scipy.optimize import least_squares
 
 def _err(msg):
 	return 'Error in ASDBondSlip: {}'.format(msg)
@@ -54,6 +53,7 @@ class _mc2020:
 		# According to the mc2020, the unloading modulus is 6*tmax:
 		#   try to find the abscissa that match 6.tmax tangent
 		Ed = 6*tmax
+		from scipy.optimize import least_squares
 		x1 = least_squares(lambda x : _tau_tan(x) - Ed, 1.0e-8, bounds = (1.0e-8, s1)).x[0]
 		y1 = _tau_fun(x1)
 		# if this first point is >= ymax, do not discretize... the peak point will be added anyway
@@ -0,0 +1,801 @@
+## @package ASDCoupledHinge_RectangularRCWidget
+# The ASDCoupledHinge_RectangularRCWidget module contains the editor of the ASDCoupledHinge_RectangularRC section.
+# It is imported only when the editor is opened, so that PySide2 and matplotlib
+# are not loaded when the section is registered or written
+
+from opensees.physical_properties.sections.ASDCoupledHinge_RectangularRC import *
+from opensees.physical_properties.sections.ASDCoupledHinge_RectangularRC import _constants, _get_xobj_attribute
+import numpy as np
+import traceback
+import json
+from time import time
+from math import pi
+import opensees.utils.Gui.GuiUtils as gu
+import opensees.utils.Gui.ThreadUtils as tu
+import opensees.physical_properties.sections.ASDCoupledHinge_support_data.RectangularFiberSectionDomainWidgets as domain_widgets
+from opensees.physical_properties.sections.ASDCoupledHinge_support_data.editor_widget import EquationEditorWidget
+from PySide2.QtCore import (
+	QSize,
+	Slot,
+	Signal,
+	QObject
+	)
+from PySide2.QtWidgets import (
+	QWidget,
+	QDialog,
+	QVBoxLayout,
+	QComboBox,
+	QSplitter,
+	QLabel,
+	QGridLayout,
+	QTextEdit,
+	QMessageBox,
+	QPushButton,
+	)
+import shiboken2
+
+class ASDCoupledHinge_RectangularRCWidget(QWidget):
+
+	exception = None
+	
+	# constructor
+	def __init__(self, editor, xobj, parent = None):
+		
+		# base class initialization
+		super(ASDCoupledHinge_RectangularRCWidget, self).__init__(parent)
+		# layout
+		self.setLayout(QVBoxLayout())
+		self.layout().setContentsMargins(0,0,0,0)
+		
+		# description label
+		self.descr_label = QLabel(
+			'<html><head/><body>'
+			'<p align="center"><span style=" font-size:11pt; color:#003399;">'
+			'Simplified Reinforced Concrete Rectangular Fiber Section'
+			'</span></p>'
+			'<p align="center"><span style=" color:#000000;">'
+			'This widget represents the rectangular fiber section'
+			'<br>The widget is connected on real-time to the attributes'
+			'of the object'
+			'Material response for confined and unconfined concrete will show in the chart below.'
+			'</span></p>'
+			'<p align="center"><span style=" font-weight:600; font-style:italic; color:#000000;">'
+			'Note'
+			'</span>'
+			'<span style=" font-style:italic; color:#000000;">'
+			': to run the test you need to have at least one external solver kit properly set up.'
+			'</span></p>'
+			'</body></html>'
+		)
+		self.descr_label.setWordWrap(True)
+		self.layout().addWidget(self.descr_label)
+		
+		# separator
+		self.separator_1 = gu.makeHSeparator()
+		self.layout().addWidget(self.separator_1)
+		
+		# Section and options for computation of confinement
+		self.sec_widget_container = QWidget()
+		self.sec_widget_layout = QGridLayout()
+		self.sec_widget_layout.setContentsMargins(0,0,0,0)
+		self.sec_widget_container.setLayout(self.sec_widget_layout)
+		# section widget container
+		# # note: it comes from PyMpc so we need to take the c++ ptr
+		# # and use shiboken2 to wrap it as a simple widget
+		# 1) get section and clear graphis, that must be done on the main thread
+		sec = _get_xobj_attribute(xobj, 'Fiber section').customObject;
+		sec.clear()
+		# # 2) create the scene widget, pass the section in the constructor
+		# #    so that the widget will be created and optimized for visualization
+		# #    of fiber cross sections
+		self.sec_widget = MpcSceneWidget(sec)
+		# # 3) wrap the Mpc widget by means of shiboken2
+		self.scene_widget = shiboken2.wrapInstance(self.sec_widget.getPtr(), QWidget)
+		self.scene_widget.setMinimumSize(QSize(250,250))
+		self.sec_widget_layout.addWidget(self.scene_widget, 0, 0, 10, 1)
+		
+		# # Selection of confinement model
+		# Label
+		self.confinementModel_label_type = QLabel("Select confinement model:")
+		self.sec_widget_layout.addWidget(self.confinementModel_label_type, 0, 1, 1, 1)
+		# 	selection of model combobox
+		self.confinementModel_cbox = QComboBox()
+		for confinementModelName in ConfinementModelsFactory.getTypes():
+			self.confinementModel_cbox.addItem(confinementModelName)
+		self.sec_widget_layout.addWidget(self.confinementModel_cbox, 1, 1, 1, 1)
+		# default value
+		self.confinementModel_cbox.setCurrentText('EN1992-1')
+		
+		# # Option for computation of lateral pressure
+		# Label
+		self.lateralPressure_label_type = QLabel("Select computation of lateral pressure:")
+		self.sec_widget_layout.addWidget(self.lateralPressure_label_type, 2, 1, 1, 1)
+		# Combobox
+		self.lateralPresssure_cbox = QComboBox()
+		for key in lateral_pressure_computation_description.keys():
+			self.lateralPresssure_cbox.addItem(lateral_pressure_computation_description[key])
+		self.sec_widget_layout.addWidget(self.lateralPresssure_cbox, 3, 1, 1, 1)
+		
+		# Plain text edit with reported results of computation
+		self.console_text_edit = QTextEdit()
+		# self.console_text_edit.setReadOnly(True)
+		self.sec_widget_layout.addWidget(self.console_text_edit, 4, 1, 6, 1)
+		
+		# my_text_edit.setReadOnly(True)
+		# You can then insert/append text using QTextCursors or using setHtml() which allows you to set the entire contents of the text edit. The formatting syntax is basic HTML, like <b> etc. you can read a bunch more about that here: http://qt-project.org/doc/qt-4.8/qtextedit.html#using-qtextedit-as-a-display-widget
+
+		# but a simple example would be
+
+		# my_text_edit.textCursor().insertHtml('normal text')
+		# my_text_edit.textCursor().insertHtml('<b>bold text</b>')
+
+		# add it to main widget
+		self.layout().addWidget(self.sec_widget_container)
+		# # set up grid strech factors
+		# self.strain_hist_layout.setColumnStretch(0, 0)
+		# self.strain_hist_layout.setColumnStretch(1, 0)
+		# self.strain_hist_layout.setColumnStretch(2, 0)
+		# self.strain_hist_layout.setColumnStretch(3, 2)
+		
+		# separator
+		self.separator_2 = gu.makeHSeparator()
+		self.layout().addWidget(self.separator_2)
+		
+		# Chart for unconfined and confined concrete
+		# Create the stress-strain for concrete unconfined (cover) and confined (core) chart
+		self.chart = MpcChart(1)
+		self.chart.name = "Stress-Strain response of concrete"
+		# Unconfined concrete - selected by user
+		self.chart_data_unconfined = gu.makeChartData("Unconfined", "Strain", "Stress", 1)
+		# stress-strain chart item
+		chart_item = MpcChartDataGraphicItem(self.chart_data_unconfined)
+		chart_item.color = MpcQColor(56,147,255, 255)
+		chart_item.thickness = 1.5
+		chart_item.penStyle = MpcQPenStyle.SolidLine
+		self.chart.addItem(chart_item)
+		# Confined concrete - selected by user or autocomputed
+		self.chart_data_confined = gu.makeChartData("Confined", "Strain", "Stress", 2)
+		# stress-strain chart item
+		chart_item = MpcChartDataGraphicItem(self.chart_data_confined)
+		chart_item.color = MpcQColor(255, 76, 122, 255)
+		chart_item.thickness = 1.5
+		chart_item.penStyle = MpcQPenStyle.SolidLine
+		self.chart.addItem(chart_item)
+		# stress-strain frame
+		self.chart_frame = gu.makeChartFrame()
+		self.layout().addWidget(self.chart_frame)
+		# stress-strain chart widget
+		self.mpc_chart_widget = MpcChartWidget()
+		self.mpc_chart_widget.chart = self.chart
+		# self.mpc_chart_widget.removeLegend()
+		self.chart_widget = shiboken2.wrapInstance(self.mpc_chart_widget.getPtr(), QWidget)
+		self.chart_frame.layout().addWidget(self.chart_widget)
+		
+		# Temporary test button
+		self.run_button = QPushButton('Test')
+		self.layout().addWidget(self.run_button)
+		self.run_button.clicked.connect(self.onTestClicked) #onTestClicked / onEditorClicked
+		
+		# sc = MyStaticMplCanvas()
+		# self.layout().addWidget(sc)
+		
+		# store editor and xobj
+		self.editor = editor
+		self.xobj = xobj
+		
+		# we want to add this widget to the xobject editor
+		# on the right of the main tree widget used for the editing of xobject attributes.
+		self.editor_splitter = shiboken2.wrapInstance(editor.getChildPtr(MpcXObjectEditorChildCode.MainSplitter), QSplitter)
+		self.editor_splitter.addWidget(self)
+		total_width = self.editor_splitter.size().width()
+		width_1 = total_width//3
+		self.editor_splitter.setSizes([width_1, total_width - width_1])
+		
+		# call methods because there are not connections yet
+		self.onSectionChanged()
+		self.onMaterialChanged()
+		
+		#################################################### $JSON
+		# restore initial values from datastore
+		a = self.xobj.getAttribute(MpcXObjectMetaData.dataStoreAttributeName())
+		if a is None:
+			raise Exception("Cannot find dataStore Attribute")
+		ds = a.string
+		try:
+			jds = json.loads(ds)
+			jds = jds['ConfinedRectangularSection']
+			class_name = jds['name']
+			self.confinementModel_cbox.setCurrentText(class_name)
+			# call this to set up default values (no connections here)
+			self.onConfinementModelChanged()
+			
+			lat_press = jds.get('lat_press',self.lateralPresssure_cbox.currentText())
+			self.lateralPresssure_cbox.setCurrentText(lat_press)
+			
+			# call this to compute confinement (no connections here)
+			self.onConfinementParamsChanged()
+			
+		except:
+			# if impossible to load, load default values
+			# call onConfinementModelChanged here because connections are not set yet!
+			self.onConfinementModelChanged()
+			self.onConfinementParamsChanged()
+		#################################################### $JSON
+		
+		# Set the connections
+		self.confinementModel_cbox.currentIndexChanged.connect(self.onConfinementModelChanged)
+		self.lateralPresssure_cbox.currentIndexChanged.connect(self.onConfinementParamsChanged)
+		
+		# # create a timer to update the position
+		# # of this dialog to follow the editor dialog every 10 milliseconds
+		# self.timer = QTimer(self)
+		# self.timer.timeout.connect(self.updateMyPosition)
+		# self.timer.start(10)
+	
+	# def updateMyPosition(self):
+		# # anchor this dialog to the top-right corner of
+		# # the editor dialog
+		# p = self.parent().pos()
+		# p.setX(p.x() + self.parent().size().width())
+		# self.move(p)
+		
+	# a worker class for running the domain
+	
+	class Worker(QObject):
+		# A Class for computing the domain
+		def __init__(self, xobj, materials):
+			# base class initialization
+			super(ASDCoupledHinge_RectangularRCWidget.Worker, self).__init__()
+			self.xobj = xobj
+			self.materials = materials
+			self.domainBuild = None
+		
+		#signals
+		sendPercentage = Signal(int)
+		finished = Signal()
+		sendTextLine = Signal(str)
+		clearTextEdit = Signal()
+		
+		@Slot()
+		def run(self):
+			try:
+				t1 = time()
+				self.domainBuild = computeDomain(self.xobj,self.materials, emitterPercentage = self.sendPercentage.emit, emitterText = self.sendTextLine.emit)
+				t2 = time()
+				if _constants.verbose: print('Time used in Worker run: {} s'.format(t2-t1))
+			except Exception as ex1:
+				ASDCoupledHinge_RectangularRCWidget.exception = ex1
+			finally:
+				# Done
+				self.finished.emit()
+	
+	def onEditorClicked(self):
+		try:
+			# @note Some widgets used here comes from STKO Python API, they are C++ classes exposed to Python via Boost.Python
+			# while all other widgets are part of PySide2 and thus exposed via Shiboken2. Since they are incompatible, we use
+			# the shiboken2.wrapInstance method on the raw C++ pointer.
+			parentPtr = shiboken2.wrapInstance(self.editor.getPtr(), QWidget)
+			dialog = EquationEditorWidget(parent = parentPtr, title = 'thetaPy')
+			# I am not actually using the result
+			res = dialog.exec()
+			if _constants.verbose: print('Result from dialog: {}'.format(res),'\n','QDialog.Accepted: ',QDialog.Accepted,'\n',res == QDialog.Accepted)
+		except:
+			exdata = traceback.format_exc().splitlines()
+			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+		# if _constants.verbose: print(res)
+		return
+		
+	def onTestClicked(self):
+		# if _constants.verbose: print(self.materials)
+		t1 = time()
+		# Check that the materials are defined
+		if self.materials.fc < 0.0:
+			if self.materials.fcc < 0.0:
+				if self.materials.fy > 0.0:
+					# Basic check: we need to assess that materials are well defined
+					# Create a worker that computes the domain (may be a long operation, so it's better to do on a separate thread)
+					try:
+						domainBuildWorker = ASDCoupledHinge_RectangularRCWidget.Worker(self.xobj,self.materials)
+						parentPtr = shiboken2.wrapInstance(self.editor.getPtr(), QWidget)
+						tu.runOnWorkerThread(domainBuildWorker ,dialog = tu.WorkerDialog(parent = parentPtr, fadeIn = False, width = 500))
+						# if _constants.verbose: print('Exception object: {}\n'.format(str(ASDCoupledHinge_RectangularRCWidget.exception)))
+						if ASDCoupledHinge_RectangularRCWidget.exception is not None:
+							tb = traceback.TracebackException.from_exception(ASDCoupledHinge_RectangularRCWidget.exception)
+							PyMpc.IO.write_cerr(''.join(tb.format()))
+							ASDCoupledHinge_RectangularRCWidget.exception = None
+					except:
+						exdata = traceback.format_exc().splitlines()
+						PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+					domainBuild = domainBuildWorker.domainBuild
+					if domainBuild is None:
+						raise Exception('Something gone wrong during creation of domain')
+					# if _constants.verbose: print('Obtained results: ')
+					# if _constants.verbose: print('For N = 0: My = {} - Mz = {}'.format(domainBuild.getMyForN(0),domainBuild.getMzForN(0)))
+					t2 = time()
+					# if _constants.verbose: print('Time used in TestClicked: {} s'.format(t2-t1))
+					try:
+						# @note Some widgets used here comes from STKO Python API, they are C++ classes exposed to Python via Boost.Python
+						# while all other widgets are part of PySide2 and thus exposed via Shiboken2. Since they are incompatible, we use
+						# the shiboken2.wrapInstance method on the raw C++ pointer.
+						parentPtr = shiboken2.wrapInstance(self.editor.getPtr(), QWidget)
+						dialog = domain_widgets.DomainResultWidget(domainBuild, parent = parentPtr)
+						# I am not actually using the result
+						res = dialog.exec()
+						if _constants.verbose: print('Result from dialog: {}'.format(res))
+					except:
+						exdata = traceback.format_exc().splitlines()
+						PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+					# if _constants.verbose: print(res)
+					return
+		PyMpc.IO.write_cerr('Materials are not defined correctly. Impossibile to test the section behavior. Please check materials\n')
+		# Message box
+		msg = QMessageBox()
+		msg.setText('Materials are not defined correctly. Impossibile to test the section behavior. Please check materials\n')
+		msg.exec()
+		
+	def onSectionChanged(self):
+		# This method is called when section attributes are changed
+		# (e.g. width, height, cover, bars, ecc)
+		sec = _get_xobj_attribute(self.xobj, 'Fiber section').customObject;
+		sec.clear()
+		
+		# rebuild the section
+		try:
+			self._build_section()
+		except:
+			exdata = traceback.format_exc().splitlines()
+			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+			
+	def onMaterialChanged(self):
+		# This method is called when cover material is changed
+		try:
+			# get Material properties (from simplified design materials
+			self.getMaterialProperties()
+			if self.materials.fc < 0:
+				# Unconfined material was sucesfully provided
+				self.drawCurveUnconfined()
+			else:
+				# Delete unconfined curve
+				self.chart_data_unconfined.x = PyMpc.Math.double_array()
+				self.chart_data_unconfined.y = PyMpc.Math.double_array()
+				# Update chart
+				self.mpc_chart_widget.chart = self.chart
+				self.mpc_chart_widget.autoScale()
+		except:
+			exdata = traceback.format_exc().splitlines()
+			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+			
+	def onConfinementParamsChanged(self):
+		lateral_pressure_description = self.lateralPresssure_cbox.currentText()
+		lateral_pressure = "weigh_avrg"
+		for key, value in lateral_pressure_computation_description.items():
+			if value == lateral_pressure_description:
+				lateral_pressure = key
+		# if _constants.verbose: print('****** Lateral pressure ** : ', lateral_pressure)
+		self.confinementModel_params.lat_press_computation = lateral_pressure
+		try:
+			outputString = self.confinementModel.computeConfinement(self.confinementModel_params)
+			# Save on the xboj the confined data
+			_get_xobj_attribute(self.xobj, 'fcc').quantityScalar.referenceValue = self.confinementModel.fcc
+			_get_xobj_attribute(self.xobj, 'epscc0').real = self.confinementModel.epscc0
+			_get_xobj_attribute(self.xobj, 'epsccu').real = self.confinementModel.epsccu
+			
+			if self.autoComputeConfinement:
+				self.materials.fcc = self.confinementModel.fcc
+				self.materials.eps_cc = self.confinementModel.epscc0
+				self.materials.eps_ccu = self.confinementModel.epsccu
+		except:
+			exdata = traceback.format_exc().splitlines()
+			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+		# Clear the console edit text
+		self.console_text_edit.clear()
+		self.console_text_edit.append(outputString)
+		# Update the Confined Curves
+		try:
+			if self.materials.fcc < 0:
+				self.drawCurveConfined()
+			else:
+				# Delete confined curve
+				self.chart_data_confined.x = PyMpc.Math.double_array()
+				self.chart_data_confined.y = PyMpc.Math.double_array()
+				# Update chart
+				self.mpc_chart_widget.chart = self.chart
+				self.mpc_chart_widget.autoScale()
+		except:
+			exdata = traceback.format_exc().splitlines()
+			PyMpc.IO.write_cerr('Error:\n{}\n'.format('\n'.join(exdata)))
+		
+	def onConfinementModelChanged(self):
+		# Get the name of the confinement model
+		class_name = self.confinementModel_cbox.currentText()
+		self.confinementModel = ConfinementModelsFactory.make(class_name)
+		# send them to the ui
+		# Get the default for lateral pressure computation
+		self.confinementModel_params.lat_press_computation = self.confinementModel.getDefaultLateralPressureComputation()
+		index = self.lateralPresssure_cbox.findText(lateral_pressure_computation_description[self.confinementModel_params.lat_press_computation])
+		index = max(index, 0)
+		self.lateralPresssure_cbox.setCurrentIndex(index)
+		
+	def getMaterialProperties(self):
+		import PyMpc.IO
+		
+		# get document, we need it to get materials
+		doc = App.caeDocument()
+		if doc is None:
+			raise Exception('no active cae document')
+		mat_cover = doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Concrete (Cover) Material').index)
+		mat_core =  doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Concrete (Core) Material').index)
+		mat_reinf = doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Reinforcement Material').index)
+		
+		# Assume default parameters
+		fc = 0.0
+		epsc0 = 0.0
+		epscu = 0.0
+		fcc = 0.0
+		epscc0 = 0.0
+		epsccu = 0.0
+		Ec = 0.0
+		fy = 0.0
+		epssu = 0.0
+		n = 2.0
+		nc = 2.0
+		Es = 0.0
+		if mat_core is not None:	
+			# The user provided its own material for core
+			if (mat_core.XObject.Xnamespace == 'materials.uniaxial.Design') and (mat_core.XObject.name == 'Concrete'):
+				# Be sure the values are negative
+				fcc = _get_xobj_attribute(mat_core.XObject, 'fc').quantityScalar.value
+				if fcc > 0:
+					fcc *= -1
+				epscc0 = _get_xobj_attribute(mat_core.XObject, 'eps_c').real
+				if epscc0 > 0:
+					epscc0 *= -1
+				epsccu = _get_xobj_attribute(mat_core.XObject, 'eps_cu').real
+				if epsccu > 0:
+					epsccu *= -1
+				nc = _get_xobj_attribute(mat_core.XObject, 'n').real
+			else:
+				PyMpc.IO.write_cerr('Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.Concrete material\n'.format(mat_core.XObject.name))
+				# Message box
+				msg = QMessageBox()
+				msg.setText("Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.Concrete material\n".format(mat_core.XObject.name))
+				msg.exec()
+		if (mat_cover is not None):
+			if (mat_cover.XObject.Xnamespace == 'materials.uniaxial.Design') and (mat_cover.XObject.name == 'Concrete'):
+				# Be sure the values are negative
+				fc = _get_xobj_attribute(mat_cover.XObject, 'fc').quantityScalar.value
+				if fc > 0:
+					fc *= -1
+				epsc0 = _get_xobj_attribute(mat_cover.XObject, 'eps_c').real
+				if epsc0 > 0:
+					epsc0 *= -1
+				epscu = _get_xobj_attribute(mat_cover.XObject, 'eps_cu').real
+				if epscu > 0:
+					epscu *= -1
+				Ec = _get_xobj_attribute(mat_cover.XObject, 'Ec').quantityScalar.value
+				n = _get_xobj_attribute(mat_cover.XObject, 'n').real
+			else:
+				PyMpc.IO.write_cerr('Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.Concrete material\n'.format(mat_cover.XObject.name))
+				# Message box
+				msg = QMessageBox()
+				msg.setText("Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.Concrete material\n".format(mat_cover.XObject.name))
+				msg.exec()
+		if (mat_reinf is not None):
+			if (mat_reinf.XObject.Xnamespace == 'materials.uniaxial.Design') and (mat_reinf.XObject.name == 'ReinforcingSteel'): 
+				fy = _get_xobj_attribute(mat_reinf.XObject, 'fy').quantityScalar.value
+				epssu = _get_xobj_attribute(mat_reinf.XObject, 'eps_su').real
+				Es = _get_xobj_attribute(mat_reinf.XObject, 'Es').quantityScalar.value
+			else:
+				PyMpc.IO.write_cerr('Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.ReinforcingSteel material\n'.format(mat_reinf.XObject.name))
+				# Message box
+				msg = QMessageBox()
+				msg.setText("Material {} not suported for automatic computation of section. Impossibile to compute automatically interaction domain. Provide it a materials.uniaxial.Design.ReinforcingSteel material\n".format(mat_reinf.XObject.name))
+				msg.exec()
+			
+				
+		# Save the material properties in a proper object
+		self.materials = domain.MaterialsForRectangularSection(fc, epsc0, epscu, n, fcc, epscc0, epsccu, nc, Es, fy, epssu)
+		
+		# Save the parameters needed for automatic confinement computation
+		if mat_core is None:	
+			self.autoComputeConfinement = True
+			self.confinementModel_params.yieldStressSteel = fy
+			self.confinementModel_params.ultimateStrainSteel = epssu
+
+			self.confinementModel_params.peakStressConcrete = fc
+			self.confinementModel_params.peakStrainConcrete = epsc0
+			self.confinementModel_params.ultimateStrainConcrete = epscu
+			self.confinementModel_params.elasticModulusConcrete = Ec
+			# Save Ec in the xobj
+			_get_xobj_attribute(self.xobj, 'Ec').quantityScalar.referenceValue = Ec
+		else:
+			self.autoComputeConfinement = False
+			self.confinementModel_params.yieldStressSteel = 0.0
+			self.confinementModel_params.ultimateStrainSteel = 0.0
+
+			self.confinementModel_params.peakStressConcrete = 0.0
+			self.confinementModel_params.peakStrainConcrete = 0.0
+			self.confinementModel_params.ultimateStrainConcrete = 0.0
+			self.confinementModel_params.elasticModulusConcrete = 0.0
+			# Save Ec in the xobj
+			_get_xobj_attribute(self.xobj, 'Ec').quantityScalar.referenceValue = Ec
+
+		
+	def onEditFinished(self):
+		#################################################### $JSON
+		# store initial values to datastore
+		a = self.xobj.getAttribute(MpcXObjectMetaData.dataStoreAttributeName())
+		if a is None:
+			raise Exception("Cannot find dataStore Attribute")
+		ds = a.string
+		try:
+			jds = json.loads(ds)
+		except:
+			jds = {}
+		# Creation of dictionary with intial values to store
+		class_name = self.confinementModel_cbox.currentText()
+		lat_press_computation = self.lateralPresssure_cbox.currentText()
+		jds['ConfinedRectangularSection'] = {'name': class_name, 'lat_press': lat_press_computation}
+		jds['Materials'] = Serializer.serialize(self.materials)
+		a.string = json.dumps(jds, indent=4)
+		#################################################### $JSON
+	
+	def _build_section(self):
+		import opensees.physical_properties.sections.RectangulaFiberSection_support_data.RectangularFiberSectionChecks as checks
+		
+		# pi = 3.14159265359
+
+		# get document, we need it to get materials
+		doc = App.caeDocument()
+		if doc is None:
+			raise Exception('no active cae document')
+		mat_core = doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Concrete (Core) Material').index)
+		mat_cover = doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Concrete (Cover) Material').index)
+		mat_reinf = doc.getPhysicalProperty(_get_xobj_attribute(self.xobj, 'Reinforcement Material').index)
+		if _constants.verbose: print('Reinforcement material: ',mat_reinf)
+
+		# get fiber section
+		sec = _get_xobj_attribute(self.xobj, 'Fiber section').customObject;
+
+		# parameters
+		W = max(1.0e-10, _get_xobj_attribute(self.xobj, 'Width').quantityScalar.value)
+		H = max(1.0e-10, _get_xobj_attribute(self.xobj, 'Height').quantityScalar.value)
+		C = max(1.0e-10, _get_xobj_attribute(self.xobj, 'Cover').quantityScalar.value)
+		SD = _get_xobj_attribute(self.xobj, 'Stirrup Diam').quantityScalar.value
+		Wc = W - 2.0*(C+SD/2.0)
+		Hc = H - 2.0*(C+SD/2.0)
+		
+		checks.geometry_check(W, H, C, SD)
+		Ac = Wc * Hc # Area of concrete core measured from centerline to centerline of confinement steel
+		
+		# mesh subdivision
+		subdvs = _get_xobj_attribute(self.xobj, 'Mesh Subdivisions').integer
+		if subdvs < 1:
+			subdvs = 15
+			
+		# lambda for 4node face
+		mesh_size = max(W,H)/subdvs
+		# TO DO: Option selectable by user (number of divisions / mesh_size)
+		def face4(x,y,w,h,mat):
+			face = FxOccFactory.surfaces().rectangle(x,y,w,h)
+			face_fib_group = MpcBeamFiberSectionSurfaceFiberGroup('', face)
+			face_fib_group.meshSize = mesh_size
+			face_fib_group.material = mat
+			face_fib_group.makeMesh()
+			sec.addSurfaceFiber(face_fib_group)	
+			id = 0
+			if mat is not None:
+				id = mat.id
+
+		# create the core face and the cover faces
+		face4(-Wc/2.0, -Hc/2.0, Wc, Hc, mat_core)
+		face4(-Wc/2.0, -H/2.0, Wc, C+SD/2.0, mat_cover) # bottom
+		face4(-Wc/2.0,  Hc/2.0, Wc, C+SD/2.0, mat_cover) # top
+		face4(-W/2.0,  -Hc/2.0, C+SD/2.0, Hc, mat_cover) # left
+		face4(Wc/2.0,  -Hc/2.0, C+SD/2.0, Hc, mat_cover) # right
+		face4(-W/2.0,  -H/2.0, C+SD/2.0, C+SD/2.0, mat_cover) # bottom-left
+		face4( Wc/2.0, -H/2.0, C+SD/2.0, C+SD/2.0, mat_cover) # bottom-right
+		face4(-W/2.0,   Hc/2.0, C+SD/2.0, C+SD/2.0, mat_cover) # top-left
+		face4( Wc/2.0,  Hc/2.0, C+SD/2.0, C+SD/2.0, mat_cover) # top-left
+
+		# rebars
+		def line2(x1,y1, x2,y2, mat, phi, num):
+			line = FxOccFactory.curves().line(x1,y1, x2,y2)
+			line_fib_group = MpcBeamFiberSectionPunctualFiberGroup('', line)
+			dummy_spacing = 1.0
+			line_fib_group.edgeData = MpcBeamFiberPunctualEdgeData(
+				MpcBeamFiberPunctualEdgeDataInputType.ByNumber, phi, num, dummy_spacing)
+			line_fib_group.material = mat
+			line_fib_group.generateRebarsLocations()
+			line_fib_group.generateFibers()
+			sec.addPunctualFiber(line_fib_group)
+		# add checks of number of bars TODO Diego
+		phi_corner = _get_xobj_attribute(self.xobj, 'Corner Rebars Diam').quantityScalar.value
+		num_corner = _get_xobj_attribute(self.xobj, 'Corner Rebars Number').integer
+		if num_corner <= 0:
+			msg = QMessageBox()
+			msg.setText("At least one corner bar is needed")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Corner Rebars Number').integer = 1
+		if num_corner > 3:
+			msg = QMessageBox()
+			msg.setText("Maximum 3 corner bars are supported")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Corner Rebars Number').integer = 3
+		phi_bottom = _get_xobj_attribute(self.xobj, 'Bottom Rebars Diam').quantityScalar.value
+		num_bottom = _get_xobj_attribute(self.xobj, 'Bottom Rebars Number').integer
+		if num_bottom < 0:
+			msg = QMessageBox()
+			msg.setText("Negative number of bars is not allowed")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Bottom Rebars Number').integer = 0
+		phi_top = _get_xobj_attribute(self.xobj, 'Top Rebars Diam').quantityScalar.value
+		num_top = _get_xobj_attribute(self.xobj, 'Top Rebars Number').integer
+		if num_top < 0:
+			msg = QMessageBox()
+			msg.setText("Negative number of bars is not allowed")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Top Rebars Number').integer = 0
+		phi_left = _get_xobj_attribute(self.xobj, 'Left Rebars Diam').quantityScalar.value
+		num_left = _get_xobj_attribute(self.xobj, 'Left Rebars Number').integer
+		if num_left < 0:
+			msg = QMessageBox()
+			msg.setText("Negative number of bars is not allowed")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Left Rebars Number').integer = 0
+		phi_right = _get_xobj_attribute(self.xobj, 'Right Rebars Diam').quantityScalar.value
+		num_right = _get_xobj_attribute(self.xobj, 'Right Rebars Number').integer
+		if num_right < 0:
+			msg = QMessageBox()
+			msg.setText("Negative number of bars is not allowed")
+			msg.exec()
+			_get_xobj_attribute(self.xobj, 'Right Rebars Number').integer = 0
+		phi_max = max(phi_corner,max(phi_bottom, max(phi_top, max(phi_left, phi_right))))
+		Wcc = Wc - phi_max - SD 
+		Hcc = Hc - phi_max - SD
+		
+		# Calcolo bi2 mentre disegno le fibre di acciaio
+		bi2 = 0.0
+		AsLong = 4.0*(pi*(phi_corner**2)/4.0)
+		numBars = 4
+		
+		# Draw corner bars
+		line2(-Wcc/2.0, -Hcc/2.0, Wcc/2.0, -Hcc/2.0, mat_reinf, phi_corner, 2)
+		line2(-Wcc/2.0,  Hcc/2.0, Wcc/2.0,  Hcc/2.0, mat_reinf, phi_corner, 2)
+		if num_corner > 1:
+			# Assume 2 bars
+			Wcc_mod = Wcc
+			Wcc_mod -= 2*phi_corner 
+			line2(-Wcc_mod/2.0, -Hcc/2.0, Wcc_mod/2.0, -Hcc/2.0, mat_reinf, phi_corner, 2)
+			line2(-Wcc_mod/2.0,  Hcc/2.0, Wcc_mod/2.0,  Hcc/2.0, mat_reinf, phi_corner, 2)
+			AsLong += 4.0*(pi*(phi_corner**2)/4.0)
+			if num_corner > 2:
+				# 3 bars on the corner
+				Hcc_mod = Hcc
+				Hcc_mod -= 2*phi_corner
+				line2(-Wcc/2.0, Hcc_mod/2.0, -Wcc/2.0, -Hcc_mod/2.0, mat_reinf, phi_corner, 2)
+				line2(Wcc/2.0, Hcc_mod/2.0, Wcc/2.0, -Hcc_mod/2.0, mat_reinf, phi_corner, 2)
+				AsLong += 4.0*(pi*(phi_corner**2)/4.0)
+		# draw bottom bars
+		if num_bottom > 0:
+			Wcc_mod = Wcc
+			if num_bottom > 1:
+				Wcc_mod -= 2.0*Wcc/(num_bottom+1)
+				bi2 += (((Wcc-Wcc_mod)/2.0)**2) * (num_bottom + 1)
+			else:
+				bi2 += ((Wcc/2.0)**2) * (num_bottom + 1)
+			line2(-Wcc_mod/2.0, -Hcc/2.0, Wcc_mod/2.0, -Hcc/2.0, mat_reinf, phi_bottom, num_bottom)
+			AsLong += num_bottom * pi * (phi_bottom**2) / 4
+		else:
+			bi2 += Wcc**2 
+		# Draw top bars
+		if num_top > 0:
+			Wcc_mod = Wcc
+			if num_top > 1:
+				Wcc_mod -= 2.0*Wcc/(num_top+1)
+				bi2 += (((Wcc-Wcc_mod)/2.0)**2) * (num_top + 1)
+			else:
+				bi2 += ((Wcc/2.0)**2) * (num_top + 1)
+			line2(-Wcc_mod/2.0, Hcc/2.0, Wcc_mod/2.0, Hcc/2.0, mat_reinf, phi_top, num_top)
+			AsLong += num_top * pi * (phi_top**2) / 4
+		else:
+			bi2 += Wcc**2
+		# draw left bars
+		if num_left > 0:
+			Hcc_mod = Hcc
+			if num_left > 1:
+				Hcc_mod -= 2.0*Hcc/(num_left+1)
+				bi2 += (((Hcc-Hcc_mod)/2.0)**2) * (num_left + 1)
+			else:
+				bi2 += ((Hcc/2.0)**2) * (num_left + 1)
+			line2(-Wcc/2.0, -Hcc_mod/2.0, -Wcc/2.0, Hcc_mod/2.0, mat_reinf, phi_left, num_left)
+			AsLong += num_left * pi * (phi_left**2) / 4
+		else:
+			bi2 += Hcc**2
+		# draw right bars
+		if num_right > 0:
+			Hcc_mod = Hcc
+			if num_right > 1:
+				Hcc_mod -= 2.0*Hcc/(num_right+1)
+				bi2 += (((Hcc-Hcc_mod)/2.0)**2) * (num_right + 1)
+			else:
+				bi2 += ((Hcc/2.0)**2) * (num_right + 1)
+			line2(Wcc/2.0, -Hcc_mod/2.0, Wcc/2.0, Hcc_mod/2.0, mat_reinf, phi_right, num_right)
+			AsLong += num_right * pi * (phi_right**2) / 4
+		else:
+			bi2 += Hcc**2
+
+		# if _constants.verbose: print('bi^2 = {} mm2\n'.format(bi2))
+		
+		rhoCC = AsLong/Ac # Longitudinal steel ratio
+		
+		# Stirrups
+		AsSt = pi* (SD**2) / 4.0 
+		s = _get_xobj_attribute(self.xobj, 'Stirrup Spacing').quantityScalar.value
+		AsY = AsSt * _get_xobj_attribute(self.xobj, 'Stirrup Legs Y').integer
+		AsZ = AsSt * _get_xobj_attribute(self.xobj, 'Stirrup Legs Z').integer
+		rhoY = AsY / (s * Hc)
+		rhoZ = AsZ / (s * Wc)
+		
+		# Save section parameters
+		self.confinementModel_params = ConfinementModelParameters( H, W, C, SD, s, bi2, rhoCC, rhoY, rhoZ, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, "weigh_avrg")
+		
+		# done
+		sec.regenerateVisualRepresentation()
+		sec.commitChanges()
+		
+		# build graphics (must be done on the main gui thread)
+		sec.buildGraphics()
+
+		# update bounding box and fit all
+		self.sec_widget.scene.updateBoundingBox()
+		self.sec_widget.fitAll()
+	
+	def drawCurveUnconfined(self):
+		# draw the stress-strain curve for unconfined concrete
+
+		# Properties of unconfined concrete:
+		fc = -self.materials.fc
+		epsc2 = -self.materials.eps_c
+		epscu = -self.materials.eps_cu
+		n = self.materials.n
+		
+		# Create a strain history
+		eps = np.concatenate([np.linspace(0,epsc2,20), np.linspace(epsc2*1.001,epscu,2), np.linspace(epscu*1.001,epscu*1.1,2)])
+		# Compute parabola-rectangle:
+		sig = fc * (1- (1 - eps/epsc2)**n)
+		sig[eps>epsc2] = fc
+		sig[eps>epscu] = 0
+		
+		#update chart_data
+		self.chart_data_unconfined.x = PyMpc.Math.double_array(eps.tolist())
+		self.chart_data_unconfined.y = PyMpc.Math.double_array(sig.tolist())
+		# set chart
+		self.mpc_chart_widget.chart = self.chart
+		self.mpc_chart_widget.autoScale()
+			
+	def drawCurveConfined(self):
+		# draw the stress-strain curve for confined concrete
+
+		# Properties of unconfined concrete:
+		fc = -self.materials.fcc
+		epsc2 = -self.materials.eps_cc
+		epscu = -self.materials.eps_ccu
+		n = self.materials.nc
+		if _constants.verbose: print('Drawing curve with: ',fc,epsc2,epscu,n)
+		
+		# Create a strain history
+		eps = np.concatenate([np.linspace(0,epsc2,20), np.linspace(epsc2*1.001,epscu,2), np.linspace(epscu*1.001,epscu*1.1,2)])
+		# Compute parabola-rectangle:
+		sig = fc * (1- (1 - eps/epsc2)**n)
+		sig[eps>epsc2] = fc
+		sig[eps>epscu] = 0
+		
+		#update chart_data
+		self.chart_data_confined.x = PyMpc.Math.double_array(eps.tolist())
+		self.chart_data_confined.y = PyMpc.Math.double_array(sig.tolist())
+		# set chart
+		self.mpc_chart_widget.chart = self.chart
+		self.mpc_chart_widget.autoScale()
+
+# Definition of the xobj
@@ -4,8 +4,6 @@
 #
 # from opensees.physical_properties.utils.tester.EnableTester3D import *
 
-from opensees.physical_properties.utils.tester.TesterND import NDTraits, TesterNDWidget
-
 class Tester3DGuiGlobals:
 	# stores a reference to the gui generated for this object
 	gui = None
@@ -25,4 +23,6 @@ def onEditFinished(editor, xobj):
 
 def onEditBegin(editor, xobj):
 	__removeGui()
+	# the tester (PySide2 and matplotlib) is imported only when the editor is opened
+	from opensees.physical_properties.utils.tester.TesterND import NDTraits, TesterNDWidget
 	Tester3DGuiGlobals.gui = TesterNDWidget(NDTraits.D3, editor, xobj)
@@ -4,8 +4,6 @@
 #
 # from opensees.physical_properties.utils.tester.EnableTesterTIM6D import *
 
-from opensees.physical_properties.utils.tester.TesterTIM6D import TIMTraits, TesterTIM6DWidget
-
 class TesterTIM6DGuiGlobals:
 	# stores a reference to the gui generated for this object
 	gui = None
@@ -25,4 +23,6 @@ def onEditFinished(editor, xobj):
 
 def onEditBegin(editor, xobj):
 	__removeGui()
+	# the tester (PySide2 and matplotlib) is imported only when the editor is opened
+	from opensees.physical_properties.utils.tester.TesterTIM6D import TIMTraits, TesterTIM6DWidget
 	TesterTIM6DGuiGlobals.gui = TesterTIM6DWidget(TIMTraits.D6, editor, xobj)
@@ -0,0 +1,476 @@
+'''
+This module contains a registry that caches the metadata of the OpenSees modules on disk,
+so that they can be registered when the solver is loaded without importing them.
+
+When a module is imported for the first time (cold start), its makeXObjectMetaData
+function is called with the PyMpc objects in its globals replaced by symbols,
+which record all the operations done on them (a trace).
+The trace is saved in a JSON file, keyed by the modification time and size of the module file
+and of the data files (non-python files, such as json files) in its directory,
+and it is replayed with the real PyMpc objects at the next start (warm start),
+without importing the module. The module will be imported by STKO when the component
+is edited or written.
+
+Modules that cannot be traced (i.e. they take decisions based on PyMpc objects,
+or use PyMpc objects created by other modules) are always imported.
+The same applies to modules whose metadata contain the path of the solver
+directory (i.e. built from __file__), because it may change.
+The whole cache is discarded when any other python file in the solver directory
+(i.e. shared utilities and helper modules) changes.
+The key of a module includes also the modules of the solver it imports (directly or through
+other modules), found by parsing its import statements, so that a module
+is traced again when a metadata module it builds its metadata from changes.
+Dynamic imports (importlib, __import__) are not seen.
+
+Set the environment variable STKO_METADATA_CACHE=0 to disable the cache,
+and STKO_METADATA_BENCHMARK=1 to print the slowest modules
+(benchmarks/metadata_registry_startup.py measures the whole initialization).
+'''
+
+import ast
+import importlib
+import operator
+import os
+import pkgutil
+import re
+import sys
+import time
+import json
+import hashlib
+import types
+
+# increase when the format of the cache changes
+CACHE_VERSION = 3
+
+class _Uncacheable(Exception):
+	pass
+
+class _Symbol:
+	'''
+	a placeholder for a PyMpc object during tracing.
+	operations are recorded in the tracer, while any attempt to inspect
+	the value (comparisons, conversions, iteration) makes the module uncacheable
+	'''
+	__slots__ = ('_tracer', '_id')
+	def __init__(self, tracer, id):
+		object.__setattr__(self, '_tracer', tracer)
+		object.__setattr__(self, '_id', id)
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise _Uncacheable()
+		return self._tracer.op('getattr', self, name)
+	def __setattr__(self, name, value):
+		self._tracer.record(['setattr', self._id, name, self._tracer.encode(value)])
+	def __call__(self, *args, **kwargs):
+		return self._tracer.op('call', self, list(args), kwargs)
+	def _binop(self, name, a, b):
+		return self._tracer.op('binop', name, a, b)
+	def __add__(self, other): return self._binop('add', self, other)
+	def __radd__(self, other): return self._binop('add', other, self)
+	def __sub__(self, other): return self._binop('sub', self, other)
+	def __rsub__(self, other): return self._binop('sub', other, self)
+	def __mul__(self, other): return self._binop('mul', self, other)
+	def __rmul__(self, other): return self._binop('mul', other, self)
+	def __truediv__(self, other): return self._binop('truediv', self, other)
+	def __rtruediv__(self, other): return self._binop('truediv', other, self)
+	def __pow__(self, other): return self._binop('pow', self, other)
+	def __or__(self, other): return self._binop('or_', self, other)
+	def __ror__(self, other): return self._binop('or_', other, self)
+	def __neg__(self): return self._tracer.op('binop', 'mul', -1, self)
+	def _inspect(self, *args):
+		raise _Uncacheable()
+	__bool__ = __eq__ = __ne__ = __lt__ = __le__ = __gt__ = __ge__ = __hash__ = _inspect
+	__str__ = __repr__ = __format__ = __len__ = __iter__ = __contains__ = __getitem__ = __setitem__ = _inspect
+	__int__ = __float__ = __index__ = _inspect
+
+class _Tracer:
+	def __init__(self, paths):
+		self.ops = []
+		self.count = 0
+		# normalized paths that cannot be saved in a trace
+		self.paths = paths
+	def record(self, op):
+		self.ops.append(op)
+	def new(self):
+		symbol = _Symbol(self, self.count)
+		self.count += 1
+		return symbol
+	def root(self, module_name, name):
+		symbol = self.new()
+		self.record(['root', symbol._id, module_name, name])
+		return symbol
+	def op(self, kind, *args):
+		symbol = self.new()
+		self.record([kind, symbol._id] + [self.encode(i) for i in args])
+		return symbol
+	def encode(self, value):
+		if isinstance(value, str):
+			if any(i in os.path.normcase(value) for i in self.paths):
+				raise _Uncacheable()
+			return value
+		if value is None or isinstance(value, (bool, int, float)):
+			return value
+		if isinstance(value, _Symbol):
+			if value._tracer is not self:
+				raise _Uncacheable()
+			return {'$' : value._id}
+		if isinstance(value, list):
+			return {'[' : [self.encode(i) for i in value]}
+		if isinstance(value, tuple):
+			return {'(' : [self.encode(i) for i in value]}
+		if isinstance(value, dict) and all(isinstance(i, str) for i in value.keys()):
+			return {'{' : {k : self.encode(v) for k, v in value.items()}}
+		# a real PyMpc object (or something else that cannot be saved)
+		raise _Uncacheable()
+
+def _replay(ops):
+	'''
+	replays a trace with the real PyMpc objects, and returns the metadata
+	'''
+	values = {}
+	def decode(v):
+		if isinstance(v, dict):
+			key, item = next(iter(v.items()))
+			if key == '$':
+				return values[item]
+			if key == '[':
+				return [decode(i) for i in item]
+			if key == '(':
+				return tuple(decode(i) for i in item)
+			if key == '{':
+				return {k : decode(i) for k, i in item.items()}
+		return v
+	result = None
+	for op in ops:
+		kind = op[0]
+		if kind == 'root':
+			module = importlib.import_module(op[2])
+			values[op[1]] = module if op[3] is None else getattr(module, op[3])
+		elif kind == 'getattr':
+			values[op[1]] = getattr(decode(op[2]), op[3])
+		elif kind == 'setattr':
+			setattr(values[op[1]], op[2], decode(op[3]))
+		elif kind == 'call':
+			values[op[1]] = decode(op[2])(*decode(op[3]), **decode(op[4]))
+		elif kind == 'binop':
+			values[op[1]] = getattr(operator, op[2])(decode(op[3]), decode(op[4]))
+		elif kind == 'return':
+			result = decode(op[1])
+		else:
+			raise Exception('Error: unknown operation in metadata trace: {}'.format(kind))
+	return result
+
+def _pympc_objects():
+	'''
+	maps the ids of all objects exported by the loaded PyMpc modules to (module name, name).
+	modules are mapped to (module name, None)
+	'''
+	objects = {}
+	for module_name, module in list(sys.modules.items()):
+		if module is None or not (module_name == 'PyMpc' or module_name.startswith('PyMpc.')):
+			continue
+		objects[id(module)] = (module_name, None)
+		for name, value in list(vars(module).items()):
+			if name.startswith('_') or isinstance(value, (bool, int, float, str, types.ModuleType)):
+				continue
+			objects.setdefault(id(value), (module_name, name))
+	return objects
+
+def _trace(module, pympc_objects, paths):
+	'''
+	calls module.makeXObjectMetaData with symbols in place of the PyMpc objects
+	in the module globals. returns the trace, or None if the module cannot be traced.
+	paths: normalized paths that make the module uncacheable if they appear in a string
+	'''
+	tracer = _Tracer(paths)
+	gl = vars(module)
+	saved = {}
+	for name, value in list(gl.items()):
+		source = pympc_objects.get(id(value), None)
+		if source is not None:
+			saved[name] = value
+	try:
+		for name, value in saved.items():
+			source = pympc_objects[id(value)]
+			gl[name] = tracer.root(source[0], source[1])
+		result = module.makeXObjectMetaData()
+		if not isinstance(result, _Symbol):
+			return None
+		tracer.record(['return', tracer.encode(result)])
+		return tracer.ops
+	except Exception:
+		return None
+	finally:
+		gl.update(saved)
+
+# an import statement at the beginning of a line, with its parenthesized continuation lines
+_IMPORT_RE = re.compile(r'^[ \t]*((?:from[ \t]+[\w.]+[ \t]+)?import[ \t]+(?:\([^)]*\)|[^\n]*))', re.MULTILINE)
+
+def _import_statements(source):
+	'''
+	yields the import statements in a python source (anywhere, also inside functions).
+	only the import lines are parsed, because parsing the whole file is much slower.
+	matches that are not valid statements (i.e. in strings) are skipped
+	'''
+	for match in _IMPORT_RE.finditer(source):
+		try:
+			body = ast.parse(match.group(1)).body
+		except SyntaxError:
+			continue
+		for node in body:
+			if isinstance(node, (ast.Import, ast.ImportFrom)):
+				yield node
+
+class MetadataRegistry:
+	'''
+	loads the metadata of all modules in a namespace, using the cache when possible.
+	call save() when done
+	'''
+	def __init__(self, basedir, package):
+		self.basedir = basedir
+		self.package = package
+		self.enabled = os.environ.get('STKO_METADATA_CACHE', '1') != '0'
+		self.benchmark = os.environ.get('STKO_METADATA_BENCHMARK', '0') == '1'
+		self.cache_file = os.path.join(basedir, '__pycache__', 'metadata_cache.json')
+		self.entries = {}
+		self.modified = False
+		self.pympc_objects = None
+		self.paths = list(set(os.path.normcase(i) for i in (basedir, os.path.realpath(basedir))))
+		self.data_keys = {}
+		self.imports = {}
+		# statistics
+		self.num_cached = 0
+		self.num_imported = 0
+		self.timings = []
+		self.start_time = time.perf_counter()
+		if self.enabled:
+			self._load()
+
+	def _module_name(self, file_name):
+		rel = os.path.splitext(os.path.relpath(file_name, self.basedir))[0].split(os.sep)
+		if rel[-1] == '__init__':
+			rel = rel[:-1]
+		return '.'.join([self.package] + rel)
+
+	def _signature(self, entries):
+		'''
+		the signature of the python files that are not cached metadata modules
+		(shared utilities, helper modules and packages), plus the python version.
+		metadata modules are keyed separately
+		'''
+		items = [CACHE_VERSION, sys.version]
+		for path, dirs, files in os.walk(self.basedir):
+			dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+			for f in sorted(files):
+				if not f.endswith('.py'):
+					continue
+				file_name = os.path.join(path, f)
+				entry = entries.get(self._module_name(file_name), None)
+				if entry is not None and entry['metadata']:
+					continue
+				st = os.stat(file_name)
+				items.append([os.path.relpath(file_name, self.basedir), st.st_mtime_ns, st.st_size])
+		return hashlib.md5(json.dumps(items).encode('utf-8')).hexdigest()
+
+	def _data_key(self, the_dir):
+		'''
+		the signature of the data files (non-python files) in a directory,
+		that modules may read when making their metadata
+		'''
+		data_key = self.data_keys.get(the_dir, None)
+		if data_key is None:
+			items = []
+			try:
+				for f in sorted(os.listdir(the_dir)):
+					file_name = os.path.join(the_dir, f)
+					if f.endswith('.py') or not os.path.isfile(file_name):
+						continue
+					st = os.stat(file_name)
+					items.append([f, st.st_mtime_ns, st.st_size])
+			except OSError:
+				pass
+			data_key = hashlib.md5(json.dumps(items).encode('utf-8')).hexdigest()
+			self.data_keys[the_dir] = data_key
+		return data_key
+
+	def _file_name(self, module_name):
+		'''
+		the file of a module of this package, or None
+		'''
+		rel = module_name.split('.')
+		if rel[0] != self.package:
+			return None
+		base = os.path.join(self.basedir, *rel[1:])
+		for file_name in (base + '.py', os.path.join(base, '__init__.py')):
+			if os.path.isfile(file_name):
+				return file_name
+		return None
+
+	def _imports(self, file_name):
+		'''
+		the files of the modules of this package imported by a python file
+		(anywhere in the file, also inside functions)
+		'''
+		imports = self.imports.get(file_name, None)
+		if imports is None:
+			imports = set()
+			try:
+				with open(file_name, 'r', encoding='utf-8', errors='replace') as f:
+					source = f.read()
+			except OSError:
+				source = None
+			if source is not None:
+				module_name = self._module_name(file_name)
+				is_package = os.path.basename(file_name) == '__init__.py'
+				for node in _import_statements(source):
+					names = []
+					if isinstance(node, ast.Import):
+						names = [i.name for i in node.names]
+					elif isinstance(node, ast.ImportFrom):
+						if node.level > 0:
+							parent = module_name.split('.')
+							if not is_package:
+								parent = parent[:-1]
+							parent = parent[:len(parent) - node.level + 1]
+							base = '.'.join(parent + ([node.module] if node.module else []))
+						else:
+							base = node.module
+						# imported names can be either submodules or attributes
+						names = [base] + ['{}.{}'.format(base, i.name) for i in node.names if i.name != '*']
+					for name in names:
+						dependency = self._file_name(name)
+						if dependency is not None and dependency != file_name:
+							imports.add(dependency)
+			self.imports[file_name] = imports
+		return imports
+
+	def _dependencies(self, file_name):
+		'''
+		the modules of this package imported by a module, directly or through other modules,
+		as paths relative to the package directory
+		'''
+		visited = set([file_name])
+		stack = [file_name]
+		while stack:
+			for dependency in self._imports(stack.pop()):
+				if dependency not in visited:
+					visited.add(dependency)
+					stack.append(dependency)
+		visited.discard(file_name)
+		return sorted(os.path.relpath(i, self.basedir) for i in visited)
+
+	def _dependencies_key(self, dependencies):
+		'''
+		the signature of the dependencies of a module, with their data files
+		'''
+		items = []
+		for rel in dependencies:
+			file_name = os.path.join(self.basedir, rel)
+			try:
+				st = os.stat(file_name)
+				items.append([rel, st.st_mtime_ns, st.st_size, self._data_key(os.path.dirname(file_name))])
+			except OSError:
+				items.append([rel, None, None, None])
+		return hashlib.md5(json.dumps(items).encode('utf-8')).hexdigest()
+
+	def _load(self):
+		try:
+			with open(self.cache_file, 'r') as f:
+				data = json.load(f)
+			if data['signature'] == self._signature(data['modules']):
+				self.entries = data['modules']
+		except Exception:
+			self.entries = {}
+
+	def save(self):
+		if self.enabled and self.modified:
+			try:
+				os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+				temp = '{}.tmp'.format(self.cache_file)
+				with open(temp, 'w') as f:
+					json.dump({'signature' : self._signature(self.entries), 'modules' : self.entries}, f)
+				os.replace(temp, self.cache_file)
+			except Exception:
+				# not writable: just don't use the cache
+				pass
+			self.modified = False
+		elapsed = time.perf_counter() - self.start_time
+		print('   metadata of {} modules: {} from cache, {} imported ({:.3f} s)'.format(
+			self.num_cached + self.num_imported, self.num_cached, self.num_imported, elapsed))
+		if self.benchmark and self.timings:
+			print('   slowest imports:')
+			for t, name in sorted(self.timings, reverse=True)[:20]:
+				print('      {:8.3f} s  {}'.format(t, name))
+
+	def load(self, namespace, the_register_func):
+		the_dir = os.path.join(self.basedir, *namespace)
+		the_namespace = '.'.join(namespace)
+		if len(namespace) > 0:
+			the_xnamespace = '.'.join(namespace[1:])
+		else:
+			the_xnamespace = ''
+		for module_info in pkgutil.iter_modules([ the_dir ]):
+			imodule_name = module_info.name
+			full_name = '{}.{}.{}'.format(self.package, the_namespace, imodule_name)
+			if module_info.ispkg:
+				file_name = os.path.join(the_dir, imodule_name, '__init__.py')
+			else:
+				file_name = os.path.join(the_dir, '{}.py'.format(imodule_name))
+			imetadata = self._get(full_name, file_name)
+			if imetadata is not None:
+				imetadata.Xnamespace = the_xnamespace
+				the_register_func(imetadata)
+
+	def _get(self, full_name, file_name):
+		# key of this module
+		try:
+			st = os.stat(file_name)
+			key = [st.st_mtime_ns, st.st_size, self._data_key(os.path.dirname(file_name))]
+		except OSError:
+			key = None
+		# from cache without importing the module
+		entry = self.entries.get(full_name, None)
+		valid = (self.enabled and entry is not None and key is not None and
+			entry['key'] == key + [self._dependencies_key(entry['dependencies'])])
+		if valid:
+			if not entry['metadata']:
+				return None
+			if entry['trace'] is not None:
+				try:
+					imetadata = _replay(entry['trace'])
+					self.num_cached += 1
+					return imetadata
+				except Exception:
+					# trace it again
+					valid = False
+		# import the module
+		t0 = time.perf_counter()
+		imodule = importlib.import_module(full_name)
+		self.timings.append((time.perf_counter() - t0, full_name))
+		self.num_imported += 1
+		has_metadata = hasattr(imodule, 'makeXObjectMetaData')
+		trace = None
+		imetadata = None
+		if has_metadata:
+			# a valid entry here is a module known to be untraceable
+			if self.enabled and key is not None and not valid:
+				if self.pympc_objects is None:
+					self.pympc_objects = _pympc_objects()
+				trace = _trace(imodule, self.pympc_objects, self.paths)
+				if trace is not None:
+					# use the trace now, so that cold and warm starts give the same result
+					try:
+						imetadata = _replay(trace)
+					except Exception:
+						trace = None
+			if imetadata is None:
+				imetadata = imodule.makeXObjectMetaData()
+		if self.enabled and key is not None and not valid:
+			dependencies = self._dependencies(file_name) if has_metadata else []
+			self.entries[full_name] = {
+				'key' : key + [self._dependencies_key(dependencies)],
+				'dependencies' : dependencies,
+				'metadata' : has_metadata,
+				'trace' : trace}
+			self.modified = True
+		return imetadata
@@ -1,3 +1,5 @@
+from array import array
+from bisect import bisect_left, insort
 
 class utils:
 	indent ='\t'
@@ -9,11 +11,230 @@ class element_nodal_dims:
 		self.nodes = nodes
 		self.dims = dims
 
+class element_nodal_dims_buffer:
+	'''
+	A compact storage for the nodal spatial dimensions requested by elements and conditions.
+	Instead of storing an element_nodal_dims object for each element, it stores:
+	- dims: the list of unique descriptors (ndm, [ndf_1, ndf_2, ...]), where the ndf list
+	  is ordered by preference. The index in this list is the descriptor code
+	- nodes/codes: two flat typed arrays of node ids and descriptor codes, one entry
+	  for each node of each element, in the order they have been added
+	'''
+	def __init__(self):
+		self.dims = []
+		self.dims_map = {}
+		self.nodes = array('q')
+		self.codes = array('i')
+		self.num_elements = 0
+	
+	def getCode(self, ndm, ndf):
+		'''
+		returns the code of the (ndm, ndf) descriptor, where ndf is a list.
+		'''
+		key = (ndm, tuple(ndf))
+		code = self.dims_map.get(key, None)
+		if code is None:
+			code = len(self.dims)
+			self.dims.append((ndm, list(ndf)))
+			self.dims_map[key] = code
+		return code
+	
+	def append(self, nodes, codes):
+		'''
+		appends the node ids of an element with the codes of their descriptors
+		'''
+		self.nodes.extend(nodes)
+		self.codes.extend(codes)
+		self.num_elements += 1
+	
+	def __len__(self):
+		return self.num_elements
+
 class node_with_age:
+	__slots__ = ('id', 'age')
 	def __init__(self, _id, _age):
 		self.id = _id
 		self.age = _age
 
+class compact_node_model_map:
+	'''
+	A dict-like replacement of process_info.node_to_model_map {node_id: (ndm, ndf)}
+	for large models.
+	Node ids are stored in a sorted typed array and searched with bisect, ndm and ndf
+	in two parallel int8 columns. The iteration order is the insertion order given
+	in the constructor (see order). Nodes added later (for example auto-generated nodes)
+	are stored in a small dictionary.
+	'''
+	__slots__ = ('ids', 'ndm', 'ndf', 'order', 'extra')
+	def __init__(self, ids, ndm, ndf, order):
+		# ids: sorted node ids, ndm/ndf: values for each id, order: positions
+		# of ids in insertion order. all of them are numpy arrays
+		self.ids = array('q', ids.astype('int64').tobytes())
+		self.ndm = array('b', ndm.astype('int8').tobytes())
+		self.ndf = array('b', ndf.astype('int8').tobytes())
+		self.order = array('q', order.astype('int64').tobytes())
+		self.extra = {}
+	def __find(self, node_id):
+		i = bisect_left(self.ids, node_id)
+		if i < len(self.ids) and self.ids[i] == node_id:
+			return i
+		return -1
+	def __contains__(self, node_id):
+		return (node_id in self.extra) or (self.__find(node_id) >= 0)
+	def __getitem__(self, node_id):
+		i = self.__find(node_id)
+		if i < 0:
+			return self.extra[node_id]
+		return (self.ndm[i], self.ndf[i])
+	def __setitem__(self, node_id, value):
+		i = self.__find(node_id)
+		if i < 0:
+			self.extra[node_id] = value
+		else:
+			self.ndm[i] = value[0]
+			self.ndf[i] = value[1]
+	def get(self, node_id, default = None):
+		i = self.__find(node_id)
+		if i < 0:
+			return self.extra.get(node_id, default)
+		return (self.ndm[i], self.ndf[i])
+	def __len__(self):
+		return len(self.ids) + len(self.extra)
+	def __iter__(self):
+		for i in self.order:
+			yield self.ids[i]
+		for node_id in list(self.extra):
+			yield node_id
+	def keys(self):
+		return iter(self)
+	def items(self):
+		for i in self.order:
+			yield (self.ids[i], (self.ndm[i], self.ndf[i]))
+		for item in list(self.extra.items()):
+			yield item
+	def values(self):
+		for _, value in self.items():
+			yield value
+
+class _compact_mass_row:
+	'''
+	A proxy to a row of the compact_mass_map, so that masses can be
+	accumulated in place as in a list (mass_map[node_id][j] += value).
+	Slicing returns a plain list (mass_map[node_id][:] is a copy, as for a list)
+	'''
+	__slots__ = ('data', 'offset')
+	def __init__(self, data, offset):
+		self.data = data
+		self.offset = offset
+	def __len__(self):
+		return 6
+	def __getitem__(self, j):
+		if isinstance(j, slice):
+			return [self.data[self.offset + k] for k in range(6)[j]]
+		if j < 0 or j >= 6:
+			raise IndexError('mass component out of range')
+		return self.data[self.offset + j]
+	def __setitem__(self, j, value):
+		if j < 0 or j >= 6:
+			raise IndexError('mass component out of range')
+		self.data[self.offset + j] = value
+	def __iter__(self):
+		for j in range(6):
+			yield self.data[self.offset + j]
+
+class compact_mass_map:
+	'''
+	A dict-like replacement of process_info.mass_to_node_map {node_id: [6 mass components]}
+	for large models.
+	Node ids are stored in a sorted typed array and searched with bisect, the 6
+	mass components of each node in a parallel float64 array.
+	New nodes are first stored in a pending dictionary, and merged into the arrays
+	when it grows too much or when freeze() is called.
+	'''
+	def __init__(self):
+		self.ids = array('q')
+		self.data = array('d')
+		self.pending = {}
+	def __find(self, node_id):
+		i = bisect_left(self.ids, node_id)
+		if i < len(self.ids) and self.ids[i] == node_id:
+			return i
+		return -1
+	def freeze(self):
+		'''
+		merges all pending nodes into the arrays
+		'''
+		if len(self.pending) == 0:
+			return
+		import numpy as np
+		ids = np.concatenate((np.frombuffer(self.ids, dtype = np.int64), np.fromiter(self.pending.keys(), dtype = np.int64, count = len(self.pending))))
+		data = np.concatenate((np.frombuffer(self.data, dtype = np.float64), np.array(list(self.pending.values()), dtype = np.float64).reshape(-1)))
+		order = np.argsort(ids, kind = 'mergesort')
+		self.ids = array('q', ids[order].tobytes())
+		self.data = array('d', data.reshape(-1, 6)[order].tobytes())
+		self.pending = {}
+	def __contains__(self, node_id):
+		return (node_id in self.pending) or (self.__find(node_id) >= 0)
+	def __getitem__(self, node_id):
+		i = self.__find(node_id)
+		if i < 0:
+			return self.pending[node_id]
+		return _compact_mass_row(self.data, i*6)
+	def __setitem__(self, node_id, value):
+		i = self.__find(node_id)
+		if i < 0:
+			self.pending[node_id] = [float(value[j]) for j in range(6)]
+			if len(self.pending) > max(65536, len(self.ids)//4):
+				self.freeze()
+		else:
+			for j in range(6):
+				self.data[i*6 + j] = value[j]
+	def get(self, node_id, default = None):
+		if node_id in self:
+			return self[node_id]
+		return default
+	def __len__(self):
+		return len(self.ids) + len(self.pending)
+	def __iter__(self):
+		for node_id in self.ids:
+			yield node_id
+		for node_id in list(self.pending):
+			yield node_id
+	def keys(self):
+		return iter(self)
+	def items(self):
+		for node_id in self:
+			yield (node_id, self[node_id])
+
+class compact_id_set:
+	'''
+	A set-like replacement of the sets of node/element ids (such as process_info.loaded_node_subset)
+	for large models. It is a bitmap indexed by id.
+	'''
+	__slots__ = ('bits', 'count')
+	def __init__(self):
+		self.bits = bytearray()
+		self.count = 0
+	def add(self, id):
+		i = id >> 3
+		if i >= len(self.bits):
+			self.bits.extend(bytes(max(i + 1 - len(self.bits), len(self.bits))))
+		mask = 1 << (id & 7)
+		if not (self.bits[i] & mask):
+			self.bits[i] |= mask
+			self.count += 1
+	def __contains__(self, id):
+		i = id >> 3
+		return i < len(self.bits) and bool(self.bits[i] & (1 << (id & 7)))
+	def __len__(self):
+		return self.count
+	def __iter__(self):
+		for i, byte in enumerate(self.bits):
+			if byte:
+				for j in range(8):
+					if byte & (1 << j):
+						yield (i << 3) | j
+
 class mpco_cdata_utils_t:
 	'''
 	This class is used to store information about automatic changes in the model
@@ -108,6 +329,116 @@ def mpco_cdata_sset_reader(it):
 	# the first item is kept as string... so it does not mess up the parser... startswith!
 	return [str(id), n_name, name, nn, ne, nodes, eles]
 
+class partition_index_t:
+	'''
+	This class stores, for a partitioned model, the partitions of all nodes and elements.
+	It is built only once, in a single pass over the mesh, and it should be used
+	by all partitioned writers instead of querying the partition data for every
+	(node/element, partition) pair.
+	- node_partitions: KEY = node id, VALUE = sorted list of partitions the node is on
+	- node_owner: KEY = node id, VALUE = the partition that owns the node (the one that writes its mass)
+	- element_partition: KEY = element id, VALUE = the partition of the element
+	- partition_nodes: for each partition, the sorted list of its nodes
+	'''
+	def __init__(self, doc, added_nodes = None):
+		pdata = doc.mesh.partitionData
+		self.pdata = pdata
+		self.process_count = len(pdata.partitions)
+		self.node_partitions = {}
+		self.node_owner = {}
+		self.element_partition = {}
+		# a node is on all partitions of the elements connected to it
+		def add_element(elem):
+			if elem.id in self.element_partition:
+				return
+			pid = pdata.elementPartition(elem.id)
+			self.element_partition[elem.id] = pid
+			for node in elem.nodes:
+				parts = self.node_partitions.get(node.id, None)
+				if parts is None:
+					self.node_partitions[node.id] = [pid]
+				elif not pid in parts:
+					parts.append(pid)
+		for _, elem in doc.mesh.elements.items():
+			add_element(elem)
+		for inter_id in doc.interactions:
+			mesh_of_inter = doc.mesh.getMeshedInteraction(inter_id)
+			if mesh_of_inter is not None:
+				for elem in mesh_of_inter.elements:
+					add_element(elem)
+		# and on its own partition
+		for node_id in doc.mesh.nodes:
+			pid = pdata.nodePartition(node_id)
+			self.node_owner[node_id] = pid
+			parts = self.node_partitions.get(node_id, None)
+			if parts is None:
+				self.node_partitions[node_id] = [pid]
+			elif not pid in parts:
+				parts.append(pid)
+		# plus the partitions where a node has been explicitly added
+		# KEY = node id, VALUE = list of partitions
+		if added_nodes:
+			for node_id, pids in added_nodes.items():
+				parts = self.node_partitions.setdefault(node_id, [])
+				for pid in pids:
+					if not pid in parts:
+						parts.append(pid)
+		# sort and invert
+		self.partition_nodes = [[] for i in range(self.process_count)]
+		for node_id, parts in self.node_partitions.items():
+			parts.sort()
+			for pid in parts:
+				self.partition_nodes[pid].append(node_id)
+		for nodes in self.partition_nodes:
+			nodes.sort()
+
+	def isNodeOnPartition(self, node_id, pid):
+		return pid in self.node_partitions.get(node_id, ())
+
+	def addNode(self, node_id, pid):
+		'''
+		adds a node to a partition, as done by partitionData.addNode
+		'''
+		parts = self.node_partitions.setdefault(node_id, [])
+		if not pid in parts:
+			insort(parts, pid)
+			insort(self.partition_nodes[pid], node_id)
+
+	def nodePartitions(self, node_id):
+		return self.node_partitions.get(node_id, [])
+
+	def nodePartition(self, node_id):
+		return self.node_owner[node_id]
+
+	def elementPartition(self, elem_id):
+		pid = self.element_partition.get(elem_id, None)
+		if pid is None:
+			# not a mesh element, ask the partition data
+			pid = self.pdata.elementPartition(elem_id)
+			self.element_partition[elem_id] = pid
+		return pid
+
+	def splitNodes(self, nodes):
+		'''
+		splits the input node ids in a list of lists, one for each partition,
+		preserving the input order
+		'''
+		per_part = [[] for i in range(self.process_count)]
+		for node_id in nodes:
+			for pid in self.node_partitions.get(node_id, ()):
+				per_part[pid].append(node_id)
+		return per_part
+
+	def splitElements(self, elements):
+		'''
+		splits the input elements in a list of lists, one for each partition,
+		preserving the input order
+		'''
+		per_part = [[] for i in range(self.process_count)]
+		for elem in elements:
+			per_part[self.elementPartition(elem.id)].append(elem)
+		return per_part
+
 class process_type:
 	'''
 	Defines what kind of proces this is
@@ -170,10 +501,28 @@ class process_info:
 		self.process_id = 0
 		self.process_count = 1
 		'''
+		if True, nodes and elements of a partitioned model are written in one
+		file per process (nodes.part-N.tcl, elements.part-N.tcl), so that each
+		process only parses its own part of the model.
+		if False, all partitions are written in the same file, each one
+		wrapped in a if {$STKO_VAR_process_id == N} block
+		'''
+		self.split_partition_files = True
+		'''
+		the partition index (partition_index_t) of a partitioned model.
+		use getPartitionIndex to access it
+		'''
+		self.partition_index = None
+		'''
 		mapping for models based on nodes/elements spatial dimension {node_id: (ndm, ndf)}
 		'''
 		self.node_to_model_map = {}
-		self.element_nodal_dims_list = []
+		self.element_nodal_dims = element_nodal_dims_buffer()
+		'''
+		if True, node_to_model_map, mass_to_node_map and the loaded subsets use
+		the compact array-backed storage (see useCompactStorage)
+		'''
+		self.compact_storage = False
 		'''
 		inverse of node_to_model_map
 		'''
@@ -186,6 +535,11 @@ class process_info:
 		utility ...
 		"""
 		self.currentDescription = ''
+		'''
+		cache of compiled element writers {(module_name, elem_prop_id, phys_prop_id): writer}
+		see write_element.get_element_writer
+		'''
+		self.element_writers = {}
 		"""
 		the index used for extra nodes and elements (not in STKO model) and definitions and conditions
 		"""
@@ -262,6 +616,38 @@ class process_info:
 			self.ndm = current_ndm_ndf_pair[0]
 			self.ndf = current_ndm_ndf_pair[1]
 		
+	def useCompactStorage(self):
+		'''
+		switches to the compact array-backed storage for large models.
+		it should be called at the beginning of the write method, before
+		mapping nodes and masses.
+		the node_to_model_map is converted when it is built (see write_node.node_map_ndm_ndf),
+		the other maps are replaced here.
+		'''
+		self.compact_storage = True
+		mass_map = compact_mass_map()
+		for node_id, mass in self.mass_to_node_map.items():
+			mass_map[node_id] = mass
+		self.mass_to_node_map = mass_map
+		loaded_node_subset = compact_id_set()
+		for node_id in self.loaded_node_subset:
+			loaded_node_subset.add(node_id)
+		self.loaded_node_subset = loaded_node_subset
+		loaded_element_subset = compact_id_set()
+		for elem_id in self.loaded_element_subset:
+			loaded_element_subset.add(elem_id)
+		self.loaded_element_subset = loaded_element_subset
+	
+	def getPartitionIndex(self):
+		'''
+		returns the partition index of the current document.
+		it must be created at the beginning of the write method, with the nodes
+		added temporarily on other partitions, so it is never built here
+		'''
+		if self.partition_index is None:
+			raise Exception('Error: the partition index has not been prepared for this model')
+		return self.partition_index
+	
 	def updateModelBuilder(self, _ndm, _ndf):
 		'''
 		update model builder, needed for some elements/materials
@@ -281,6 +667,13 @@ class process_info:
 	def get_double_formatter(self):
 		return lambda arg: format(arg, '.10g')
 	
+	def get_double_format(self):
+		'''
+		the printf-style equivalent of get_double_formatter,
+		to be used in precompiled templates for bulk writing
+		'''
+		return '%.10g'
+	
 	def updateMpcoCdataFiles(self):
 		import os
 		'''
@@ -1,5 +1,7 @@
 from PyMpc import *
 import os
+from itertools import groupby, count
+from opensees.analysis_steps.Misc_commands.region import ele_range_string
 from opensees.utils.parameter_utils import ParameterManager
 
 class _globals:
@@ -109,61 +111,81 @@ def process_document(pinfo):
 	pinfo.out_file.write('# Found {} Geometries\n'.format(len(geoms)))
 	pinfo.out_file.write('# Found a total of {} elements\n'.format(target_count))
 	
-	# write the list of elements based on partitioning
-	def write_loop(all_eles, indent):
-		count = 0
-		total_count = 0
-		N = len(all_eles)
-		pinfo.out_file.write('{}set STKO_VAR_TimeIncrementUpdateTargets [list '.format(indent))
-		if N > 0:
-			pinfo.out_file.write('\\\n')
-			for ele_id in all_eles:
-				count += 1
-				total_count += 1
-				if count == 1:
-					pinfo.out_file.write('{}{}'.format(indent, pinfo.tabIndent))
-				pinfo.out_file.write('{} '.format(ele_id))
-				if count == 20 and total_count < N:
-					count = 0
-					pinfo.out_file.write('\\\n')
+	# write the region arguments based on partitioning.
+	# consecutive ids are grouped in -eleRange options
+	def write_region_args(all_eles, indent):
+		all_eles = sorted(set(all_eles))
+		pinfo.out_file.write('{}set STKO_VAR_TimeIncrementUpdateTargets [list'.format(indent))
+		pinfo.out_file.write(''.join(ele_range_string(g) for _, g in groupby(all_eles, key=lambda n, c=count(): n-next(c))))
 		pinfo.out_file.write(']\n')
 	# get element list
 	if pinfo.process_count > 1:
+		pindex = pinfo.getPartitionIndex()
 		all_eles = [[] for i in range(pinfo.process_count)]
 		for geom_key, domain in geoms.items():
 			for element in domain.elements:
-				pid = doc.mesh.partitionData.elementPartition(element.id)
+				pid = pindex.elementPartition(element.id)
 				all_eles[pid].append(element.id)
 		for partition_id in range(pinfo.process_count):
 			pinfo.out_file.write('{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, partition_id))
-			write_loop(all_eles[partition_id], pinfo.indent+pinfo.tabIndent)
+			write_region_args(all_eles[partition_id], pinfo.indent+pinfo.tabIndent)
 			pinfo.out_file.write('{}}}\n'.format(pinfo.indent))
 	else:
 		all_eles = []
 		for geom_key, domain in geoms.items():
 			for element in domain.elements:
 				all_eles.append(element.id)
-		write_loop(all_eles, pinfo.indent)
+		write_region_args(all_eles, pinfo.indent)
+	
+	# the region tags, taken after the last analysis step id.
+	# a region cannot be re-defined with the same tag, so one tag is reserved
+	# for each stage (i.e. each AnalysesCommand)
+	num_stages = 0
+	for _, step in doc.analysisSteps.items():
+		if step.XObject is not None and step.XObject.name == 'AnalysesCommand':
+			num_stages += 1
+	region_tag = pinfo.next_analysis_step_id
+	pinfo.next_analysis_step_id += max(num_stages, 1)
 	
 	# write custom functions
-	pinfo.out_file.write('''#
+	pinfo.out_file.write('''# the last region and the last time increment set on the target elements
+set STKO_VAR_TimeIncrementUpdateRegion {}
+set STKO_VAR_TimeIncrementUpdateLast 0.0
+#
 # Time-Increment Utility Functions.
-# Define a function to be called before the current time step
-proc STKO_DT_UTIL_OnBeforeAnalyze {} {
+# Define a function to be called before the current time step.
+# All target elements are updated with a single setParameter on a region.
+# The region is created at the first increment of each stage, so that it contains
+# the elements that are in the domain at that moment (i.e. with model subsets)
+proc STKO_DT_UTIL_OnBeforeAnalyze {{}} {{
 	global STKO_VAR_increment
+	global STKO_VAR_analyze_done
 	global STKO_VAR_time_increment
 	global STKO_VAR_TimeIncrementUpdateTargets
-	# update the initial time and the committed time for the first time
-	foreach ele_id $STKO_VAR_TimeIncrementUpdateTargets {
-		if {$STKO_VAR_increment == 1} {
-			setParameter -val $STKO_VAR_time_increment -ele $ele_id dTimeCommit
-			setParameter -val $STKO_VAR_time_increment -ele $ele_id dTimeInitial
-		}
-		# always update the current time increment
-		setParameter -val $STKO_VAR_time_increment -ele $ele_id dTime
-	}
-}
+	global STKO_VAR_TimeIncrementUpdateRegion
+	global STKO_VAR_TimeIncrementUpdateLast
+	if {{[llength $STKO_VAR_TimeIncrementUpdateTargets] == 0}} {{
+		return
+	}}
+	if {{$STKO_VAR_increment == 1}} {{
+		# a stage starts after a converged step, while a failed first increment
+		# is retried (with a smaller time increment) within the same stage
+		if {{$STKO_VAR_analyze_done == 0}} {{
+			incr STKO_VAR_TimeIncrementUpdateRegion
+			region $STKO_VAR_TimeIncrementUpdateRegion {{*}}$STKO_VAR_TimeIncrementUpdateTargets
+		}}
+		# update the initial time and the committed time for the first time
+		setParameter -val $STKO_VAR_time_increment -region $STKO_VAR_TimeIncrementUpdateRegion dTimeCommit
+		setParameter -val $STKO_VAR_time_increment -region $STKO_VAR_TimeIncrementUpdateRegion dTimeInitial
+	}} elseif {{$STKO_VAR_time_increment == $STKO_VAR_TimeIncrementUpdateLast}} {{
+		# the time increment did not change
+		return
+	}}
+	# update the current time increment
+	setParameter -val $STKO_VAR_time_increment -region $STKO_VAR_TimeIncrementUpdateRegion dTime
+	set STKO_VAR_TimeIncrementUpdateLast $STKO_VAR_time_increment
+}}
 # add it to the list of functions
 lappend STKO_VAR_OnBeforeAnalyze_CustomFunctions STKO_DT_UTIL_OnBeforeAnalyze
 
-''')
\ No newline at end of file
+'''.format(region_tag - 1))
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import re
+import glob
+import hashlib
+import numpy as np
+import opensees.utils.tcl_input as tclin
+
+# the external files written by write_values_file are named STKO_timeSeries_<hash>.txt
+_VALUES_FILE_PREFIX = 'STKO_timeSeries_'
+_VALUES_FILE_PATTERN = re.compile(r'^STKO_timeSeries_[0-9a-f]{16}\.txt$')
+
+def to_array(values):
+	'''
+	converts a list of values, a numpy array or a PyMpc quantity vector
+	to a contiguous numpy array of floats
+	'''
+	if hasattr(values, 'valueAt'):
+		values = [values.valueAt(i) for i in range(len(values))]
+	return np.ascontiguousarray(values, dtype=float)
+
+def format_values(values, sep):
+	'''
+	formats the values with the shortest representation that
+	gives back the same floating point numbers, in linear time.
+	'''
+	return sep.join(map(repr, values.tolist()))
+
+def tcl_list(pinfo, values, nTab):
+	'''
+	returns the values as the body of a Tcl list, 10 values per line.
+	nTab is the indentation of continuation lines
+	'''
+	values = values.tolist()
+	sep = ' \\\n{}{}'.format(pinfo.indent, tclin.utils.nIndent(nTab))
+	return sep.join(' '.join(map(repr, values[i:i+10])) for i in range(0, len(values), 10))
+
+def write_values_file(pinfo, values):
+	'''
+	writes the values in an external text file in the output directory
+	(one value per line, as required by the -filePath and -fileTime options)
+	and returns its name, relative to the output directory.
+	files are named after the hash of their contents, so that a series
+	used many times is written only once
+	'''
+	values = to_array(values)
+	key = hashlib.md5(values.tobytes()).hexdigest()
+	files = pinfo.custom_data.setdefault('TimeSeriesFiles', {})
+	file_name = files.get(key, None)
+	if file_name is None:
+		file_name = '{}{}.txt'.format(_VALUES_FILE_PREFIX, key[:16])
+		with open(os.path.join(pinfo.out_dir, file_name), 'w', encoding='utf-8') as f:
+			f.write(format_values(values, '\n'))
+			f.write('\n')
+		files[key] = file_name
+	return file_name
+
+def remove_values_files(out_dir):
+	'''
+	removes the residual files written by write_values_file in a previous export.
+	only files with the exact name pattern are removed, so that user files are kept
+	'''
+	for f in glob.glob(os.path.join(out_dir, '{}*.txt'.format(_VALUES_FILE_PREFIX))):
+		if _VALUES_FILE_PATTERN.match(os.path.basename(f)):
+			os.remove(f)
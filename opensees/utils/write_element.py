@@ -1,4 +1,5 @@
 import importlib
+import time
 import opensees.utils.tcl_input as tclin
 import PyMpc
 import PyMpc.App
@@ -31,7 +32,75 @@ class _remapper_t:
 			if p:
 				p.id = self.pp_original_id
 
-def __write_geom_domain_partition(partition_data, pinfo, domain_collection, phys_prop_asn_on, elem_prop_asn_on):
+# cache of element formulation modules {module_name: module}
+_elem_modules = {}
+
+def get_element_module(elem_xobj):
+	'''
+	returns the element formulation module of the given element property XObject,
+	importing it only the first time
+	'''
+	elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
+	elem_module = _elem_modules.get(elem_module_name, None)
+	if elem_module is None:
+		elem_module = importlib.import_module(elem_module_name)
+		_elem_modules[elem_module_name] = elem_module
+	return elem_module
+
+# cache of pre-processing hooks {module_name: preProcessElements function or None}
+_pre_process_hooks = {}
+
+def get_pre_process_hooks(doc):
+	'''
+	returns the list of (module_name, hook) of the preProcessElements functions
+	of the element formulation modules used by the element properties of the document,
+	sorted by module name.
+	hooks are looked up only once per module, and only modules actually used are imported
+	'''
+	hooks = {}
+	for _, elem_prop in doc.elementProperties.items():
+		elem_xobj = elem_prop.XObject
+		if elem_xobj is None:
+			continue
+		elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
+		if elem_module_name in hooks:
+			continue
+		if elem_module_name not in _pre_process_hooks:
+			elem_module = get_element_module(elem_xobj)
+			_pre_process_hooks[elem_module_name] = getattr(elem_module, 'preProcessElements', None)
+		hooks[elem_module_name] = _pre_process_hooks[elem_module_name]
+	return [(name, hook) for name, hook in sorted(hooks.items()) if hook is not None]
+
+def pre_process_elements(doc, pinfo):
+	'''
+	calls the preProcessElements hooks of the element formulations used in the document.
+	they are called after materials, sections and nodes, but before elements
+	'''
+	for elem_module_name, hook in get_pre_process_hooks(doc):
+		t0 = time.perf_counter()
+		hook(pinfo)
+		print('pre-processing module: {} ({:.3f} s)'.format(elem_module_name.rsplit('.', 1)[-1], time.perf_counter() - t0))
+
+def get_element_writer(pinfo, elem_module):
+	'''
+	returns the function used to write all elements of the current
+	(pinfo.elem_prop, pinfo.phys_prop) pair.
+	modules can opt in by providing a makeTclWriter(pinfo) function, that resolves
+	all attributes once and returns a writer(pinfo) function that only substitutes
+	element ids and nodes. writers are cached in pinfo.element_writers.
+	all other modules fall back to their writeTcl(pinfo) function.
+	'''
+	if not hasattr(elem_module, 'makeTclWriter'):
+		return elem_module.writeTcl
+	phys_prop = pinfo.phys_prop
+	key = (elem_module.__name__, pinfo.elem_prop.id, -1 if phys_prop is None else phys_prop.id)
+	writer = pinfo.element_writers.get(key, None)
+	if writer is None:
+		writer = elem_module.makeTclWriter(pinfo)
+		pinfo.element_writers[key] = writer
+	return writer
+
+def __write_geom_domain_partition(pindex, pinfo, domain_collection, phys_prop_asn_on, elem_prop_asn_on, part_files):
 	# create remapper
 	remapper = _remapper_t(pinfo)
 	# for each domain (i.e. for each subshape of geom)
@@ -52,44 +121,55 @@ def __write_geom_domain_partition(partition_data, pinfo, domain_collection, phys
 		elem_xobj = elem_prop.XObject
 		if(elem_xobj is None):
 			raise Exception('null XObject in element property object')
-		elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
-		elem_module = importlib.import_module(elem_module_name)
+		elem_module = get_element_module(elem_xobj)
 		if not hasattr(elem_module, 'writeTcl'):
 			continue
 		pinfo.phys_prop = phys_prop
 		pinfo.elem_prop = elem_prop
+		elem_writer = None # resolved on first element
 		# split domain elements by partition
-		per_part_elements = [[] for i in range(len(partition_data.partitions))]
-		for elem in domain.elements:
-			if (pinfo.element_subset is not None) and (elem.id not in pinfo.element_subset):
-				continue # skip it in case of staged models if not in current stage
-			per_part_elements[partition_data.elementPartition(elem.id)].append(elem)
+		per_part_elements = pindex.splitElements(
+			elem for elem in domain.elements
+			if (pinfo.element_subset is None) or (elem.id in pinfo.element_subset)) # skip it in case of staged models if not in current stage
 		# write elements grouped by partitions
-		for processor_id in range(len(partition_data.partitions)):
+		for processor_id in range(pindex.process_count):
 			part_elements = per_part_elements[processor_id]
 			if(len(part_elements) == 0):
 				continue
 			# set process id
 			pinfo.setProcessId(processor_id)
-			# open process scope
-			pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', processor_id, '} {'))
+			# open process scope (or switch to the process file)
+			if part_files is None:
+				pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', processor_id, '} {'))
+			else:
+				pinfo.out_file = part_files[processor_id]
 			# write in process scope
 			for elem in part_elements:
+				if elem_writer is None:
+					elem_writer = get_element_writer(pinfo, elem_module)
 				try:
 					# remap
 					remapper.remap_phys_prop(phys_prop, elem.id)
 					pinfo.elem = elem
-					elem_module.writeTcl(pinfo)
+					elem_writer(pinfo)
 				finally:
 					remapper.reset_phys_prop(phys_prop)
 				pinfo.loaded_element_subset.add(elem.id) # mark as written
 				PyMpc.App.monitor().sendAutoIncrement()
 			# close process scope
-			pinfo.out_file.write('{}{}\n'.format(pinfo.indent, '}'))
+			if part_files is None:
+				pinfo.out_file.write('{}{}\n'.format(pinfo.indent, '}'))
 		pinfo.setProcessId(0) # back to default
 
-def write_geom_partition(doc, pinfo, element_file):
+def write_geom_partition(doc, pinfo, element_file, part_files = None):
+	'''
+	write elements of geometries.
+	if part_files is given (a list of files, one for each process), the elements of each
+	partition are written in their own file, otherwise they are written in element_file
+	wrapped in a if {$STKO_VAR_process_id == N} block
+	'''
 	PyMpc.App.monitor().sendMessage('write geometry...')
+	pindex = pinfo.getPartitionIndex()
 	# for each geometry ...
 	for geom_id, geom in doc.geometries.items():
 		# get the mesh of this geometry
@@ -98,9 +178,11 @@ def write_geom_partition(doc, pinfo, element_file):
 		phys_prop_asn = geom.physicalPropertyAssignment
 		elem_prop_asn = geom.elementPropertyAssignment
 		# process all subdomains
-		__write_geom_domain_partition(doc.mesh.partitionData, pinfo, mesh_of_geom.edges,  phys_prop_asn.onEdges, elem_prop_asn.onEdges)
-		__write_geom_domain_partition(doc.mesh.partitionData, pinfo, mesh_of_geom.faces,  phys_prop_asn.onFaces, elem_prop_asn.onFaces)
-		__write_geom_domain_partition(doc.mesh.partitionData, pinfo, mesh_of_geom.solids, phys_prop_asn.onSolids, elem_prop_asn.onSolids)
+		__write_geom_domain_partition(pindex, pinfo, mesh_of_geom.edges,  phys_prop_asn.onEdges, elem_prop_asn.onEdges, part_files)
+		__write_geom_domain_partition(pindex, pinfo, mesh_of_geom.faces,  phys_prop_asn.onFaces, elem_prop_asn.onFaces, part_files)
+		__write_geom_domain_partition(pindex, pinfo, mesh_of_geom.solids, phys_prop_asn.onSolids, elem_prop_asn.onSolids, part_files)
+	# back to the default file
+	pinfo.out_file = element_file
 
 def __write_geom_domain(pinfo, domain_collection, phys_prop_asn_on, elem_prop_asn_on):
 	# create remapper
@@ -123,20 +205,22 @@ def __write_geom_domain(pinfo, domain_collection, phys_prop_asn_on, elem_prop_as
 		elem_xobj = elem_prop.XObject
 		if(elem_xobj is None):
 			raise Exception('null XObject in element property object')
-		elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
-		elem_module = importlib.import_module(elem_module_name)
+		elem_module = get_element_module(elem_xobj)
 		if not hasattr(elem_module, 'writeTcl'):
 			continue
 		pinfo.phys_prop = phys_prop
 		pinfo.elem_prop = elem_prop
+		elem_writer = None # resolved on first element
 		for elem in domain.elements:
 			if (pinfo.element_subset is not None) and (elem.id not in pinfo.element_subset):
 				continue # skip it in case of staged models if not in current stage
+			if elem_writer is None:
+				elem_writer = get_element_writer(pinfo, elem_module)
 			try:
 				# remap
 				remapper.remap_phys_prop(phys_prop, elem.id)
 				pinfo.elem = elem
-				elem_module.writeTcl(pinfo)
+				elem_writer(pinfo)
 			finally:
 				remapper.reset_phys_prop(phys_prop)
 			pinfo.loaded_element_subset.add(elem.id) # mark as written
@@ -156,55 +240,69 @@ def write_geom(doc, pinfo):
 		__write_geom_domain(pinfo, mesh_of_geom.faces,  phys_prop_asn.onFaces, elem_prop_asn.onFaces)
 		__write_geom_domain(pinfo, mesh_of_geom.solids, phys_prop_asn.onSolids, elem_prop_asn.onSolids)
 
-def write_inter_partition(doc, pinfo, element_file):
+def write_inter_partition(doc, pinfo, element_file, part_files = None):
+	'''
+	write elements of interactions.
+	see write_geom_partition for the meaning of part_files
+	'''
 	PyMpc.App.monitor().sendMessage('write interactions...')
-	processor_id = 0
 	# create remapper
 	remapper = _remapper_t(pinfo)
-	for partition in doc.mesh.partitionData.partitions:
+	# collect all interactions to write, with their elements split by partition.
+	# this is done once, and not once per partition
+	pindex = pinfo.getPartitionIndex()
+	all_inter = []
+	for inter_id, inter in doc.interactions.items():
+		mesh_of_inter = doc.mesh.meshedInteractions[inter_id]
+		phys_prop = inter.physicalProperty
+		elem_prop = inter.elementProperty
+		# a null element property is not and error, it means: don't write this element
+		# (for example boundary elements)
+		# we don't do any check on the phys_prop prop, it's up to the element formulation to check
+		# whether it should be non-null
+		if(elem_prop is None):
+			continue
+		# get elem formulation module
+		elem_xobj = elem_prop.XObject
+		if(elem_xobj is None):
+			raise Exception('null XObject in element property object')
+		elem_module = get_element_module(elem_xobj)
+		if not hasattr(elem_module, 'writeTcl'):
+			continue
+		all_inter.append((phys_prop, elem_prop, elem_module, pindex.splitElements(mesh_of_inter.elements)))
+	# write elements grouped by partitions
+	for processor_id in range(pindex.process_count):
 		pinfo.setProcessId(processor_id)
-		if processor_id == 0:
+		if part_files is not None:
+			pinfo.out_file = part_files[processor_id]
+		elif processor_id == 0:
 			element_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', processor_id, '} {'))
 		else:
 			element_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', processor_id, '} {'))
-		for inter_id, inter in doc.interactions.items():
-			mesh_of_inter = doc.mesh.meshedInteractions[inter_id]
-			phys_prop = inter.physicalProperty
-			elem_prop = inter.elementProperty
+		for phys_prop, elem_prop, elem_module, per_part_elements in all_inter:
 			# begin remapper with new source
 			remapper.set_source_phys_prop(phys_prop)
-			# a null element property is not and error, it means: don't write this element
-			# (for example boundary elements)
-			# we don't do any check on the phys_prop prop, it's up to the element formulation to check
-			# whether it should be non-null
-			if(elem_prop is None):
-				continue
-			# get elem formulation module
-			elem_xobj = elem_prop.XObject
-			if(elem_xobj is None):
-				raise Exception('null XObject in element property object')
-			elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
-			elem_module = importlib.import_module(elem_module_name)
-			if not hasattr(elem_module, 'writeTcl'):
-				continue
 			pinfo.phys_prop = phys_prop
 			pinfo.elem_prop = elem_prop
-			for elem in mesh_of_inter.elements:
-				if doc.mesh.partitionData.elementPartition(elem.id) == processor_id:
-					if (pinfo.element_subset is not None) and (elem.id not in pinfo.element_subset):
-						continue # skip it in case of staged models if not in current stage
-					try:
-						# remap
-						remapper.remap_phys_prop(phys_prop, elem.id)
-						pinfo.elem = elem
-						elem_module.writeTcl(pinfo)
-					finally:
-						remapper.reset_phys_prop(phys_prop)
-					pinfo.loaded_element_subset.add(elem.id) # mark as written
-					PyMpc.App.monitor().sendAutoIncrement()
-		element_file.write('{}{}'.format(pinfo.indent, '}'))
-		processor_id +=1
+			elem_writer = None # resolved on first element
+			for elem in per_part_elements[processor_id]:
+				if (pinfo.element_subset is not None) and (elem.id not in pinfo.element_subset):
+					continue # skip it in case of staged models if not in current stage
+				if elem_writer is None:
+					elem_writer = get_element_writer(pinfo, elem_module)
+				try:
+					# remap
+					remapper.remap_phys_prop(phys_prop, elem.id)
+					pinfo.elem = elem
+					elem_writer(pinfo)
+				finally:
+					remapper.reset_phys_prop(phys_prop)
+				pinfo.loaded_element_subset.add(elem.id) # mark as written
+				PyMpc.App.monitor().sendAutoIncrement()
+		if part_files is None:
+			element_file.write('{}{}'.format(pinfo.indent, '}'))
 	pinfo.setProcessId(0) # back to default
+	pinfo.out_file = element_file
 	
 def write_inter(doc, pinfo):
 	PyMpc.App.monitor().sendMessage('write interactions...')
@@ -227,20 +325,22 @@ def write_inter(doc, pinfo):
 		elem_xobj = elem_prop.XObject
 		if(elem_xobj is None):
 			raise Exception('null XObject in element property object')
-		elem_module_name = 'opensees.element_properties.{}.{}'.format(elem_xobj.Xnamespace, elem_xobj.name)
-		elem_module = importlib.import_module(elem_module_name)
+		elem_module = get_element_module(elem_xobj)
 		if not hasattr(elem_module, 'writeTcl'):
 			continue
 		pinfo.phys_prop = phys_prop
 		pinfo.elem_prop = elem_prop
+		elem_writer = None # resolved on first element
 		for elem in mesh_of_inter.elements:
 			if (pinfo.element_subset is not None) and (elem.id not in pinfo.element_subset):
 				continue # skip it in case of staged models if not in current stage
+			if elem_writer is None:
+				elem_writer = get_element_writer(pinfo, elem_module)
 			try:
 				# remap
 				remapper.remap_phys_prop(phys_prop, elem.id)
 				pinfo.elem = elem
-				elem_module.writeTcl(pinfo)
+				elem_writer(pinfo)
 			finally:
 				remapper.reset_phys_prop(phys_prop)
 			pinfo.loaded_element_subset.add(elem.id) # mark as written
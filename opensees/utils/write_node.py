@@ -1,9 +1,12 @@
 import importlib
+import numpy as np
 import opensees.utils.tcl_input as tclin
-from opensees.utils.tcl_input import element_nodal_dims as element_nodal_dims_t
 import PyMpc
 import PyMpc.App
 
+# the node writers report the progress once every NODE_PROGRESS_BATCH nodes
+NODE_PROGRESS_BATCH = 1000
+
 def __make_list(ndf):
 	'''
 	the second item in nodal space descriptor (NDF) can be either a scalar or a list.
@@ -14,13 +17,6 @@ def __make_list(ndf):
 	else:
 		return [ndf]
 
-def __intersection(a, b):
-	'''
-	creates an a list which is intersection between a and b.
-	in the new list the order is the same as in the input items in a
-	'''
-	return [i for i in a if i in b]
-
 def fill_node_mass_map(doc, pinfo):
 	'''
 	fill the map of the masses
@@ -35,113 +31,89 @@ def fill_node_mass_map(doc, pinfo):
 		if hasattr(module, 'fillNodeMassMap'):
 			pinfo.condition = item
 			module.fillNodeMassMap(pinfo)
+	if pinfo.compact_storage:
+		pinfo.mass_to_node_map.freeze()
 
 def __postprocess_domain_collection_nodes(pinfo):
-
-	# block durations for progress monitoring
-	# this method is called by anothe one, its duration is 50% of the calling
-	# one.
-	duration_post = 0.5
-	num_elem = len(pinfo.element_nodal_dims_list)
-	num_elem *= 3 # the first loop typically converges in 2 iterations, the secon one in 1
-	increment = 0.5/max(num_elem, 1)
-	PyMpc.App.monitor().setAutoIncrement(increment)
-	if num_elem > 20:
-		PyMpc.App.monitor().setDisplayIncrement(duration_post/20)
-	else:
-		PyMpc.App.monitor().setDisplayIncrement(0.0)
-
-	# here we do some while(true) loops. they should work and stop correctly,
-	# but just to make sure they will not run indefinitely, we use a max counter
-	max_iter = 0
-	for elem in pinfo.element_nodal_dims_list:
-		max_iter += len(elem.nodes)
-	max_iter *= 10 # just some more room
-
-	# this first loop builds the pinfo.node_to_model_map starting for info in 
-	# pinfo.element_nodal_dims_list.
-	# if there are elements that support multiple dofs we make intersection
-	# of ndf (lists) at nodes.
-	iter = 0
-	while(True):
-		change_counter = 0
-		iter += 1
-		for elem in pinfo.element_nodal_dims_list:
-			for i in range(len(elem.nodes)):
-				node = elem.nodes[i]
-				dim = elem.dims[i]
-				dim = (dim[0], __make_list(dim[1]))
-				dof = dim[1]
-				if node in pinfo.node_to_model_map:
-					prev_dim = pinfo.node_to_model_map[node]
-					if prev_dim[0] != dim[0]:
-						raise Exception('Error: Different dimensions on same node (node = {}, {}-{}). You cannot mix 2D and 3D models!'.format(node, prev_dim[0], dim[0]))
-					prev_dof = __make_list(prev_dim[1])
-					if dof == prev_dof:
-						continue
-					int_dof = __intersection(prev_dof, dof)
-					l_nd = len(int_dof)
-					if l_nd == 0:
-						raise Exception('Error: Different NDF on same node (node = {}, NDF1 = {}, NDF2 = {})'.format(node, dof, prev_dof))
-					else:
-						pinfo.node_to_model_map[node] = (dim[0], int_dof)
-					elem.dims[i] = pinfo.node_to_model_map[node]
-					change_counter += 1
-				else:
-					pinfo.node_to_model_map[node] = dim
-					change_counter += 1
-			if iter < 3:
-				PyMpc.App.monitor().sendAutoIncrement()
-
-		if change_counter == 0:
-			break
-		if iter > max_iter:
-			raise Exception('cannot terminate the loop in the maximum number of iterations')
-	PyMpc.App.monitor().sendMessage('loop 1 finished in {} iterations.'.format(iter))
+	'''
+	builds the pinfo.node_to_model_map starting from info in pinfo.element_nodal_dims.
+	each node gets:
+	- the NDM of its elements (they must be all the same)
+	- the intersection of the NDF lists of its elements. if the intersection contains
+	  more than one NDF, we choose the first one in the list of the first element
+	  connected to the node. in fact, if some element or condition support multiple dof-sets per node,
+	  it should place them in order, (i.e. the one they prefer goes first).
+	this is done with a single vectorized pass, using a bitmask for each NDF list
+	'''
+	buffer = pinfo.element_nodal_dims
+	if len(buffer.nodes) == 0:
+		return
 	
-	# here we make sure that each element that has multiple dofs in its nodes,
-	# can find an intersection between them
-	iter = 0
-	while(True):
-		change_counter = 0
-		iter += 1
-		for elem in pinfo.element_nodal_dims_list:
-			for i in range(len(elem.nodes)):
-				node = elem.nodes[i]
-				common_dim = elem.dims[i] # todo: rename to local_dim
-				dim = pinfo.node_to_model_map[node] # global dim in pinfo map
-				# note: dimension are unique, not lists, so make sure the local one
-				# is equal to one in pinfo
-				if common_dim[0] != dim[0]:
-					raise Exception('incompatible moodel dimension for node {}'.format(node))
-				dof = dim[1]
-				common_dof = common_dim[1]
-				int_dof = __intersection(common_dof, dof)
-				# we are going to replace the dofs in pinfo with the intersection with 
-				# the local ones (int_dofs). do it only if they are different, and so increment the change_counter
-				if dof != int_dof:
-					pinfo.node_to_model_map[node] = (common_dim[0], int_dof)
-					change_counter += 1
-			if iter < 2:
-				PyMpc.App.monitor().sendAutoIncrement()
-		if change_counter == 0:
-			break
-		if iter > max_iter:
-			raise Exception('cannot terminate the loop in the maximum number of iterations')
-	PyMpc.App.monitor().sendMessage('loop 2 finished in {} iterations.'.format(iter))
-	PyMpc.App.monitor().setDisplayIncrement(0.0)
+	# descriptor tables (one row for each descriptor code)
+	all_ndf = sorted(set(ndf for dim in buffer.dims for ndf in dim[1]))
+	ndf_bit = {ndf : i for i, ndf in enumerate(all_ndf)}
+	code_ndm = np.array([dim[0] for dim in buffer.dims], dtype = np.int64)
+	code_mask = np.array([sum(1 << ndf_bit[ndf] for ndf in set(dim[1])) for dim in buffer.dims], dtype = np.int64)
+	
+	# sort entries by node id. use a stable sort, so that the first
+	# entry of each node is the first one that was added
+	nodes = np.frombuffer(buffer.nodes, dtype = np.int64)
+	codes = np.frombuffer(buffer.codes, dtype = np.int32)
+	order = np.argsort(nodes, kind = 'mergesort')
+	sorted_nodes = nodes[order]
+	sorted_codes = codes[order]
+	is_first = np.empty(len(sorted_nodes), dtype = bool)
+	is_first[0] = True
+	np.not_equal(sorted_nodes[1:], sorted_nodes[:-1], out = is_first[1:])
+	starts = np.flatnonzero(is_first)
+	node_ids = sorted_nodes[starts]
+	first_codes = sorted_codes[starts]
+	PyMpc.App.monitor().sendPercentage(0.65)
+	
+	# the NDM must be unique for each node
+	entry_ndm = code_ndm[sorted_codes]
+	ndm_min = np.minimum.reduceat(entry_ndm, starts)
+	ndm_max = np.maximum.reduceat(entry_ndm, starts)
+	bad = np.flatnonzero(ndm_min != ndm_max)
+	if len(bad) > 0:
+		i = bad[0]
+		raise Exception('Error: Different dimensions on same node (node = {}, {}-{}). You cannot mix 2D and 3D models!'.format(node_ids[i], ndm_min[i], ndm_max[i]))
 	
-	# if there are some some remaining multiple dofs we choose the first one.
-	# in fact, if some element or condition support multiple dof-sets per node,
-	# it should place them in order, (i.e. the one they preder goes first).
-	# then we transform each list in the ndm/ndf tuple in a integer
-	# '''
-	for node_id, dim in pinfo.node_to_model_map.items():
-		ndf = dim[1]
-		if isinstance(ndf, list):
-			dim = (dim[0], ndf[0])
-			# note: here we are updating the value (not the key)
-			pinfo.node_to_model_map[node_id] = dim
+	# the NDF is the intersection of all NDF lists at each node
+	mask = np.bitwise_and.reduceat(code_mask[sorted_codes], starts)
+	bad = np.flatnonzero(mask == 0)
+	if len(bad) > 0:
+		i = bad[0]
+		node_dofs = [buffer.dims[c][1] for c in np.unique(sorted_codes[starts[i]:(starts[i+1] if i+1 < len(starts) else len(sorted_codes))])]
+		raise Exception('Error: Different NDF on same node (node = {}, NDF = {})'.format(node_ids[i], node_dofs))
+	PyMpc.App.monitor().sendPercentage(0.8)
+	
+	# choose the NDF for each node. there are only a few unique (first_code, mask) pairs,
+	# so we can do it in python for each pair
+	pairs, inverse = np.unique(first_codes.astype(np.int64) * (1 << len(all_ndf)) + mask, return_inverse = True)
+	pair_ndf = np.zeros(len(pairs), dtype = np.int64)
+	for i, pair in enumerate(pairs.tolist()):
+		first_code = pair >> len(all_ndf)
+		pair_mask = pair & ((1 << len(all_ndf)) - 1)
+		for ndf in buffer.dims[first_code][1]:
+			if pair_mask & (1 << ndf_bit[ndf]):
+				pair_ndf[i] = ndf
+				break
+	node_ndf = pair_ndf[inverse]
+	node_ndm = code_ndm[first_codes]
+	
+	# fill the map following the order in which nodes were first found
+	first_pos = np.argsort(order[starts], kind = 'mergesort')
+	if pinfo.compact_storage:
+		# keep the arrays, and move into them what was already in the map
+		old_map = pinfo.node_to_model_map
+		pinfo.node_to_model_map = tclin.compact_node_model_map(node_ids, node_ndm, node_ndf, first_pos)
+		for node_id, dim in old_map.items():
+			if not node_id in pinfo.node_to_model_map:
+				pinfo.node_to_model_map[node_id] = dim
+	else:
+		for node_id, ndm, ndf in zip(node_ids[first_pos].tolist(), node_ndm[first_pos].tolist(), node_ndf[first_pos].tolist()):
+			pinfo.node_to_model_map[node_id] = (ndm, ndf)
 
 def __map_domain_nodes(pinfo, domain, elem_prop, phys_prop):
 	'''
@@ -167,11 +139,11 @@ def __map_domain_nodes(pinfo, domain, elem_prop, phys_prop):
 	if phys_prop is not None:
 		xobj_pp = phys_prop.XObject
 	
-	# get nodal dims for each node in element. make the dofs in dim a list
+	# get nodal dims for each node in element. make the dofs in dim a list.
+	# note: they are the same for all elements in this domain, so we store only their codes
 	node_dims = elem_module.getNodalSpatialDim(xobj, xobj_pp)
+	node_codes = [pinfo.element_nodal_dims.getCode(dim[0], __make_list(dim[1])) for dim in node_dims]
 	for elem in domain.elements:
-		elem_node_dim = []
-		elem_node_id = []
 		num_nodes = len(elem.nodes)
 		#
 		# Massimo: changed 11/10/2021 to support element properties with
@@ -185,14 +157,8 @@ def __map_domain_nodes(pinfo, domain, elem_prop, phys_prop):
 				'This happens when an element module is assigned to a wrong mesh type.'
 				.format(len(node_dims), num_nodes)
 				))
-		for j in range(num_nodes):
-			# get the original tuple, make a copy with the dof converted to a list
-			original_dims = node_dims[j]
-			copyed_dims = (original_dims[0], __make_list(original_dims[1]))
-			elem_node_dim.append(copyed_dims)
-			elem_node_id.append(elem.nodes[j].id)
-		# fill list
-		pinfo.element_nodal_dims_list.append(element_nodal_dims_t(elem_node_id, elem_node_dim))
+		# fill buffer
+		pinfo.element_nodal_dims.append([node.id for node in elem.nodes], node_codes[:num_nodes])
 		PyMpc.App.monitor().sendAutoIncrement()
 
 def __map_domain_collection_nodes(pinfo, domain_collection, elem_prop_asn_on, phys_prop_asn_on):
@@ -260,14 +226,14 @@ def node_map_ndm_ndf (doc, pinfo):
 		if hasattr(cond_module, 'getRequestedNodalSpatialDim'):
 			requested_node_dim_map = cond_module.getRequestedNodalSpatialDim(xobj)
 			# note here we interpret the whole condition as a monolithic element...
-			elem_node_dim = []
+			elem_node_code = []
 			elem_node_id = []
 			for node_id, node_dim in requested_node_dim_map.items():
 				# make the dofs in dim a list
-				elem_node_dim.append((node_dim[0], __make_list(node_dim[1])))
+				elem_node_code.append(pinfo.element_nodal_dims.getCode(node_dim[0], __make_list(node_dim[1])))
 				elem_node_id.append(node_id)
-			# fill list
-			pinfo.element_nodal_dims_list.append(element_nodal_dims_t(elem_node_id, elem_node_dim))
+			# fill buffer
+			pinfo.element_nodal_dims.append(elem_node_id, elem_node_code)
 	current_percentage += duration_cond
 	PyMpc.App.monitor().sendPercentage(current_percentage)
 
@@ -316,33 +282,65 @@ def short_map(doc, pinfo):
 	for _, v in pinfo.inv_map.items():
 		v.sort(key=lambda a:a.id)
 
-def __write_mass_and_node(pinfo, node, node_id, node_file, indent, do_mass = True):
-	FMT = pinfo.get_double_formatter()
-	mass = ''
-	if pinfo.ndm == 2: # 2D
-		# evaluate the mass option if we have masses on this node
-		if do_mass and (node_id in pinfo.mass_to_node_map):
-			mv6 = pinfo.mass_to_node_map[node_id] # get mass vector (6-components)
-			if pinfo.ndf == 2: # U
-				mass = ' -mass {} {}'.format(FMT(mv6[0]), FMT(mv6[1]))
-			elif pinfo.ndf == 3: # U or UP or UR
-				mass = ' -mass {} {} {}'.format(FMT(mv6[0]), FMT(mv6[1]), FMT(mv6[5]))
-		# write node command
-		node_file.write('{}{}node {} {} {}{}\n'.format(pinfo.indent, indent, node_id, FMT(node.x), FMT(node.y), mass))
-	else: # 3D
+class _node_writer_t:
+	'''
+	A buffered writer for node commands.
+	The command template is built once for the current NDM/NDF pair (or for the
+	given number of coordinates and mass components), then each node line is formatted
+	with the % operator and written to the file in large blocks.
+	The progress is reported once every NODE_PROGRESS_BATCH nodes: the caller should set the
+	monitor auto-increment accordingly.
+	'''
+	def __init__(self, pinfo, node_file, indent, num_coords = None, mass_components = None, mass_suffix = ''):
+		FMT = pinfo.get_double_format()
+		if num_coords is None:
+			# get templates from the current model builder
+			num_coords = pinfo.ndm
+			mass_components = ()
+			if pinfo.ndm == 2: # 2D
+				if pinfo.ndf == 2: # U
+					mass_components = (0, 1)
+				elif pinfo.ndf == 3: # U or UP or UR
+					mass_components = (0, 1, 5)
+			else: # 3D
+				num_coords = 3
+				if pinfo.ndf == 3: # U
+					mass_components = (0, 1, 2)
+				elif pinfo.ndf == 4: # UP
+					mass_components = (0, 1, 2)
+					mass_suffix = ' 0.0'
+				elif pinfo.ndf == 6: # UR
+					mass_components = (0, 1, 2, 3, 4, 5)
+		self.pinfo = pinfo
+		self.node_file = node_file
+		self.num_coords = num_coords
+		self.mass_components = mass_components
+		self.node_template = '{}{}node %d{}'.format(pinfo.indent, indent, (' ' + FMT)*num_coords)
+		self.mass_template = ' -mass{}{}'.format((' ' + FMT)*len(mass_components), mass_suffix) if mass_components else None
+		self.lines = []
+		self.counter = 0
+	def write(self, node_id, node, do_mass = True):
+		if self.num_coords == 2:
+			line = self.node_template % (node_id, node.x, node.y)
+		else:
+			line = self.node_template % (node_id, node.x, node.y, node.z)
 		# evaluate the mass option if we have masses on this node
-		if do_mass and (node_id in pinfo.mass_to_node_map):
-			mv6 = pinfo.mass_to_node_map[node_id] # get mass vector (6-components)
-			if pinfo.ndf == 3: # U
-				mass = ' -mass {} {} {}'.format(FMT(mv6[0]), FMT(mv6[1]), FMT(mv6[2]))
-			elif pinfo.ndf == 4: # UP
-				mass = ' -mass {} {} {} 0.0'.format(FMT(mv6[0]), FMT(mv6[1]), FMT(mv6[2]))
-			elif pinfo.ndf == 6: # UR
-				mass = ' -mass {} {} {} {} {} {}'.format(FMT(mv6[0]), FMT(mv6[1]), FMT(mv6[2]),   FMT(mv6[3]), FMT(mv6[4]), FMT(mv6[5]))
-		# write node command
-		node_file.write('{}{}node {} {} {} {}{}\n'.format(pinfo.indent, indent, node_id, FMT(node.x), FMT(node.y), FMT(node.z), mass))
-	pinfo.loaded_node_subset.add(node_id) # mark as written
-	PyMpc.App.monitor().sendAutoIncrement()
+		if do_mass and (self.mass_template is not None) and (node_id in self.pinfo.mass_to_node_map):
+			mv6 = self.pinfo.mass_to_node_map[node_id] # get mass vector (6-components)
+			line += self.mass_template % tuple(mv6[i] for i in self.mass_components)
+		self.lines.append(line)
+		self.pinfo.loaded_node_subset.add(node_id) # mark as written
+		self.counter += 1
+		if self.counter == NODE_PROGRESS_BATCH:
+			self.flush()
+	def flush(self):
+		if self.lines:
+			self.lines.append('')
+			self.node_file.write('\n'.join(self.lines))
+			self.lines = []
+		if self.counter > 0:
+			PyMpc.App.monitor().sendAutoIncrement()
+			self.counter = 0
 
 def write_node (doc, pinfo, node_file):
 	'''
@@ -354,37 +352,50 @@ def write_node (doc, pinfo, node_file):
 			node_file.write('{}# tag x y z\n'.format(pinfo.indent))
 		else:
 			node_file.write('{}# tag x y\n'.format(pinfo.indent))
+		writer = _node_writer_t(pinfo, node_file, pinfo.indent)
 		for node_with_age in v:
 			node_id = node_with_age.id
 			if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
 				continue # skip it in case of staged models if not in current stage
-			node = doc.mesh.nodes[node_id]
-			__write_mass_and_node(pinfo, node, node_id, node_file, pinfo.indent)
+			writer.write(node_id, doc.mesh.nodes[node_id])
+		writer.flush()
 
-def write_node_partition (doc, pinfo, node_file):
+def write_node_partition (doc, pinfo, node_file, part_files = None):
 	'''
-	write node
+	write node.
+	if part_files is given (a list of files, one for each process), the nodes of each
+	partition are written in their own file, otherwise they are written in node_file
+	wrapped in a if {$STKO_VAR_process_id == N} block
 	'''
 	
+	# split the nodes of each (ndm, ndf) pair by partition, in a single pass
+	pindex = pinfo.getPartitionIndex()
+	per_part_inv_map = [(k, pindex.splitNodes(node_with_age.id for node_with_age in v)) for k, v in pinfo.inv_map.items()]
+	
 	process_block_count = 0
-	for process_id in range(len(doc.mesh.partitionData.partitions)):
+	for process_id in range(pindex.process_count):
 		pinfo.setProcessId(process_id)
+		if part_files is not None:
+			node_file = part_files[process_id]
+			pinfo.out_file = node_file
+			node_indent = pinfo.indent
+		else:
+			node_indent = pinfo.tabIndent
 		first_done = False
-		for k, v in pinfo.inv_map.items():
+		for k, per_part_nodes in per_part_inv_map:
 			is_model_builder_already_updated = False
-			for node_with_age in v:
-				node_id = node_with_age.id
-				if not doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
-					continue # skip it, the node is not in this partition
+			writer = None
+			for node_id in per_part_nodes[process_id]:
 				if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
 					continue # skip it in case of staged models if not in current stage
-				do_write_mass = (process_id == doc.mesh.partitionData.nodePartition(node_id))
+				do_write_mass = (process_id == pindex.nodePartition(node_id))
 				node = doc.mesh.nodes[node_id]
 				if not first_done:
-					if process_block_count == 0:
-						node_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						node_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					if part_files is None:
+						if process_block_count == 0:
+							node_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+						else:
+							node_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
 					if k[0] == 3:
 						node_file.write('{}# tag x y z\n'.format(pinfo.indent))
 					else:
@@ -393,10 +404,13 @@ def write_node_partition (doc, pinfo, node_file):
 				if not is_model_builder_already_updated:
 					pinfo.updateModelBuilder(k[0], k[1])
 					is_model_builder_already_updated = True
-				__write_mass_and_node(pinfo, node, node_id, node_file, pinfo.tabIndent, do_mass = do_write_mass)
+					writer = _node_writer_t(pinfo, node_file, node_indent)
+				writer.write(node_id, node, do_mass = do_write_mass)
+			if writer is not None:
+				writer.flush()
 			if first_done:
 				process_block_count += 1
-		if process_block_count > 0 and first_done:
+		if part_files is None and process_block_count > 0 and first_done:
 			node_file.write('{}{}'.format(pinfo.indent, '}'))
 		# back to default
 		pinfo.setProcessId(0) 
@@ -411,15 +425,6 @@ def __check_model (write_node_not_assigned_boolean, node_file, pinfo, comment =
 		# note: by default they are set to 3-3
 		pinfo.updateModelBuilder(3, 3)
 
-def __write_mass_and_node_not_assigned (pinfo, node_id, node, node_file, indent, do_mass = True):
-	FMT = pinfo.get_double_formatter()
-	mass = ''
-	if do_mass and (node_id in pinfo.mass_to_node_map):
-		mv6 = pinfo.mass_to_node_map[node_id] # get mass vector (6-components)
-		mass = ' -mass {} {} {}'.format(FMT(mv6[0]), FMT(mv6[1]), FMT(mv6[2]))
-	node_file.write('{}{}node {} {} {} {}{}\n'.format(pinfo.indent, indent, node_id, FMT(node.x), FMT(node.y), FMT(node.z), mass))
-	pinfo.loaded_node_subset.add(node_id) # mark as written
-
 def write_node_not_assigned (doc, pinfo, node_file):
 	'''
 	write node not assigned, at the end of the nodes assigned
@@ -435,47 +440,66 @@ def write_node_not_assigned (doc, pinfo, node_file):
 			if not done_first:
 				node_file.write('{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
 				done_first = True
-			__write_mass_and_node_not_assigned(pinfo, node_id, node, node_file, pinfo.indent)
+				# by default they are written in 3D, with the 3 translational masses
+				writer = _node_writer_t(pinfo, node_file, pinfo.indent, 3, (0, 1, 2))
+			writer.write(node_id, node)
+	if done_first:
+		writer.flush()
 	# set them all to 3-3
 	for node_id in doc.mesh.nodes:
 		if not node_id in pinfo.node_to_model_map:
 			pinfo.node_to_model_map[node_id] = (3, 3)
 
-def write_node_not_assigned_partition (doc, pinfo, node_file):
+def write_node_not_assigned_partition (doc, pinfo, node_file, part_files = None):
 	'''
-	write node not assigned, at the end of the nodes assigned
+	write node not assigned, at the end of the nodes assigned.
+	see write_node_partition for the meaning of part_files
 	'''
+	# split the not assigned nodes by partition, in a single pass
+	pindex = pinfo.getPartitionIndex()
+	per_part_nodes = pindex.splitNodes(node_id for node_id in doc.mesh.nodes if not node_id in pinfo.node_to_model_map)
+	
 	process_block_count = 0
-	for process_id in range(len(doc.mesh.partitionData.partitions)):
+	for process_id in range(pindex.process_count):
 		pinfo.setProcessId(process_id)
+		if part_files is not None:
+			node_file = part_files[process_id]
+			pinfo.out_file = node_file
+			node_indent = pinfo.indent
+		else:
+			node_indent = pinfo.tabIndent
 		first_done = False
 		write_node_not_assigned_boolean = True
-		for node_id, node in doc.mesh.nodes.items():
-			if not node_id in pinfo.node_to_model_map:
-				if not doc.mesh.partitionData.isNodeOnPartition(node_id, process_id):
-					continue # skip it, the node is not in this partition
-				if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
-					continue # skip it in case of staged models if not in current stage
-				do_write_mass = (process_id == doc.mesh.partitionData.nodePartition(node_id))
-				if not first_done:
-					if process_block_count == 0:
-						node_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						node_file.write('{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
-						__check_model (write_node_not_assigned_boolean, node_file, pinfo, process_block_count)
-					else:
-						node_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						node_file.write('{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
-						__check_model (write_node_not_assigned_boolean, node_file, pinfo, process_block_count)
-					first_done = True
-					write_node_not_assigned_boolean = False
-				__write_mass_and_node_not_assigned(pinfo, node_id, node, node_file, pinfo.tabIndent, do_mass = do_write_mass)
+		# by default they are written in 3D, with the 3 translational masses
+		writer = _node_writer_t(pinfo, node_file, node_indent, 3, (0, 1, 2))
+		for node_id in per_part_nodes[process_id]:
+			node = doc.mesh.nodes[node_id]
+			if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
+				continue # skip it in case of staged models if not in current stage
+			do_write_mass = (process_id == pindex.nodePartition(node_id))
+			if not first_done:
+				if part_files is not None:
+					__check_model (write_node_not_assigned_boolean, node_file, pinfo)
+					node_file.write('\n{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
+				elif process_block_count == 0:
+					node_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+					node_file.write('{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
+					__check_model (write_node_not_assigned_boolean, node_file, pinfo, process_block_count)
+				else:
+					node_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					node_file.write('{}{} {} {} {} {}\n'.format(pinfo.indent, '#', 'tag', 'x', 'y', 'z'))
+					__check_model (write_node_not_assigned_boolean, node_file, pinfo, process_block_count)
+				first_done = True
+				write_node_not_assigned_boolean = False
+			writer.write(node_id, node, do_mass = do_write_mass)
 			if first_done:
 				process_block_count += 1
-		if process_block_count > 0 and first_done:
+		writer.flush()
+		if part_files is None and process_block_count > 0 and first_done:
 			node_file.write('{}{}'.format(pinfo.indent, '}'))
 		# back to default
 		pinfo.setProcessId(0)
 	# set them all to 3-3
 	for node_id in doc.mesh.nodes:
 		if not node_id in pinfo.node_to_model_map:
-			pinfo.node_to_model_map[node_id] = (3, 3)
\ No newline at end of file
+			pinfo.node_to_model_map[node_id] = (3, 3)
@@ -17,7 +17,7 @@ import opensees.utils.write_node as write_node
 import opensees.utils.time_increment_utils as dt_utils
 from io import StringIO
 
-def write_tcl_int(out_dir):
+def write_tcl_int(out_dir, added_partition_nodes = None):
 	
 	# define block durations
 	duration_mapping = 0.3
@@ -77,6 +77,11 @@ def write_tcl_int(out_dir):
 	if process_count > 1:
 		is_partitioned = True
 		pinfo.setProcessCount(process_count)
+		# build the partition index once, it will be shared by all partitioned writers.
+		# the added_partition_nodes (if any) are the nodes temporarily added to other partitions
+		# by the _mp_handler
+		PyMpc.App.monitor().sendMessage('indexing partitions...')
+		pinfo.partition_index = tclin.partition_index_t(doc, added_partition_nodes)
 	
 	# create the main script
 	main_file_name = '{}{}main.tcl'.format(out_dir, os.sep)
@@ -250,7 +255,7 @@ def write_tcl_int(out_dir):
 	PyMpc.App.monitor().setRange(current_percentage, current_percentage + duration_nodes)
 	if not has_model_subsets:
 		num_items = len(doc.mesh.nodes)
-		increment = duration_nodes / max(num_items, 1)
+		increment = duration_nodes / max(num_items, 1) * write_node.NODE_PROGRESS_BATCH
 		PyMpc.App.monitor().setAutoIncrement(increment)
 		if num_items > 20:
 			PyMpc.App.monitor().setDisplayIncrement(duration_nodes/20)
@@ -331,10 +336,12 @@ def write_tcl_int(out_dir):
 	# search for all monitors (if any) and do the first monitor initialization.
 	# if at least a monitor is defined, all analyses will have a monitor.
 	# for analyses without their own monitor, the application initializes the first monitor in the following function
+	has_monitor = False
 	for _, step in doc.analysisSteps.items() :
 		if step.XObject.name == 'monitor':
 			# pinfo.monitor = True # It is not needed because now I always call customFunction
 			write_analysis_steps.initialize_first_monitor(doc, step, pinfo)
+			has_monitor = True
 			break
 	
 	# custom time-increment utils
@@ -386,6 +393,11 @@ def write_tcl_int(out_dir):
 	main_file.write('# source analysis_steps\n')
 	main_file.write('source {}\n'.format(analysis_steps_file_name))
 	
+	# close monitor output files
+	if has_monitor:
+		main_file.write('\n# close monitor output files\n')
+		main_file.write('STKO_MonitorClose\n')
+	
 	# clear all
 	main_file.write('\nwipe\n')
 	
@@ -405,6 +417,13 @@ class _mp_handler:
 		# value = [list] of other partitions
 		self.pmap_remove = {}
 		self.verbose = False
+		# the partition index used by the ensureNodesOnPartitions methods.
+		# it is built only if needed, and it is kept in sync with the nodes added here
+		self.partition_index = None
+	def getPartitionIndex(self, doc):
+		if self.partition_index is None:
+			self.partition_index = tclin.partition_index_t(doc)
+		return self.partition_index
 	def begin(self):
 		print('MP Handler: begin')
 		doc = PyMpc.App.caeDocument()
@@ -424,7 +443,7 @@ class _mp_handler:
 				imodule = importlib.import_module('opensees.conditions.{}'.format(xobj.completeName))
 				if hasattr(imodule, 'ensureNodesOnPartitions'):
 					print(xobj.completeName, '[ensureNodesOnPartitions]')
-					imodule.ensureNodesOnPartitions(xobj, pmap)
+					imodule.ensureNodesOnPartitions(xobj, pmap, self.getPartitionIndex(doc))
 			if self.verbose:
 				print('P.MAP:')
 				for node_id, partitions in pmap.items():
@@ -441,6 +460,7 @@ class _mp_handler:
 						if self.verbose:
 							before = doc.mesh.partitionData.isNodeOnPartition(node_id, pid)
 						doc.mesh.partitionData.addNode(doc.mesh.getNode(node_id), pid)
+						self.getPartitionIndex(doc).addNode(node_id, pid)
 						if self.verbose:
 							after = doc.mesh.partitionData.isNodeOnPartition(node_id, pid)
 							print('... adding node {} to partition {} [{}, {}]'.format(node_id, pid, before, after))
@@ -477,7 +497,7 @@ def write_tcl(out_dir):
 	mp = _mp_handler()
 	try:
 		mp.begin()
-		write_tcl_int(out_dir)
+		write_tcl_int(out_dir, mp.pmap_remove)
 	finally:
 		mp.end()
 	'''
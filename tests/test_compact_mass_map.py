@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import opensees.utils.tcl_input as tclin
+from opensees.conditions.utils import accumulateNodeMass
+
+class TestCompactMassMap(unittest.TestCase):
+	'''
+	the compact_mass_map should behave as the dictionary of lists it replaces
+	in process_info.mass_to_node_map
+	'''
+	def make_pinfos(self):
+		pinfo_dict = tclin.process_info()
+		pinfo_compact = tclin.process_info()
+		pinfo_compact.useCompactStorage()
+		return pinfo_dict, pinfo_compact
+
+	def accumulate(self, pinfo):
+		node_ids = np.array([3, 1, 2])
+		lumped = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]])
+		accumulateNodeMass(pinfo, node_ids, lumped)
+		accumulateNodeMass(pinfo, node_ids[:2], lumped[:2]*0.5, first_component = 3)
+		if pinfo.compact_storage:
+			pinfo.mass_to_node_map.freeze()
+		# accumulate again on frozen rows
+		accumulateNodeMass(pinfo, node_ids[:1], lumped[:1], first_component = 0)
+
+	def test_accumulate_node_mass(self):
+		pinfo_dict, pinfo_compact = self.make_pinfos()
+		self.accumulate(pinfo_dict)
+		self.accumulate(pinfo_compact)
+		for node_id, mass in pinfo_dict.mass_to_node_map.items():
+			self.assertIn(node_id, pinfo_compact.mass_to_node_map)
+			self.assertEqual(list(pinfo_compact.mass_to_node_map[node_id]), mass)
+		self.assertEqual(len(pinfo_compact.mass_to_node_map), len(pinfo_dict.mass_to_node_map))
+
+	def test_slice_copy(self):
+		# as in BeamWithShearHinge.get_node_mass: mass_map.get(node_id, default)[:]
+		pinfo_dict, pinfo_compact = self.make_pinfos()
+		self.accumulate(pinfo_dict)
+		self.accumulate(pinfo_compact)
+		for node_id in (1, 2, 3, 4):
+			expected = pinfo_dict.mass_to_node_map.get(node_id, [0.0]*6)[:]
+			mass = pinfo_compact.mass_to_node_map.get(node_id, [0.0]*6)[:]
+			self.assertIsInstance(mass, list)
+			self.assertEqual(mass, expected)
+			# the copy must not alias the stored row
+			for i in range(len(mass)):
+				mass[i] *= 2.0
+			self.assertEqual(list(pinfo_compact.mass_to_node_map.get(node_id, [0.0]*6)), expected)
+		row = pinfo_compact.mass_to_node_map[3]
+		self.assertEqual(row[3:], pinfo_dict.mass_to_node_map[3][3:])
+		self.assertEqual(row[::-1], pinfo_dict.mass_to_node_map[3][::-1])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'STKOMonitor'))
+
+from STKOMonitorData import STKOEnvelopeDecimator, STKOPlotDataItem
+
+def write_series(file_name, y):
+	with open(file_name, 'w') as f:
+		f.write('x\ty\n')
+		for i, value in enumerate(y):
+			f.write('{}\t{}\n'.format(float(i), float(value)))
+
+class TestEnvelopeDecimator(unittest.TestCase):
+	'''
+	the decimated series should keep the peaks of the current series,
+	also when the monitor file is restarted with a longer series
+	'''
+	def test_restart_with_longer_series(self):
+		with tempfile.TemporaryDirectory() as temp_dir:
+			file_name = os.path.join(temp_dir, 'plot.plt')
+			item = STKOPlotDataItem(file_name)
+			decimator = STKOEnvelopeDecimator(10)
+			# first analysis
+			write_series(file_name, np.zeros(1000))
+			item.load()
+			decimator.update(item.x, item.y, item.restarted)
+			# restarted analysis, with a longer series and a spike
+			y = np.zeros(1500)
+			y[123] = 99.0
+			# (written aside and moved, so that the file is replaced)
+			write_series(file_name + '.new', y)
+			os.replace(file_name + '.new', file_name)
+			item.load()
+			self.assertTrue(item.restarted)
+			xd, yd = decimator.update(item.x, item.y, item.restarted)
+			_, yf = STKOEnvelopeDecimator(10).update(item.x, item.y)
+			self.assertEqual(yd.max(), 99.0)
+			self.assertEqual(yd.tolist(), yf.tolist())
+
+	def test_incremental_matches_full(self):
+		y = np.sin(np.arange(5000) * 0.37) * np.arange(5000)
+		x = np.arange(5000, dtype=float)
+		decimator = STKOEnvelopeDecimator(50)
+		for n in range(0, 5001, 377):
+			decimator.update(x[:n], y[:n])
+		xd, yd = decimator.update(x, y)
+		self.assertEqual(yd.max(), y.max())
+		self.assertEqual(yd.min(), y.min())
+
+if __name__ == '__main__':
+	unittest.main()
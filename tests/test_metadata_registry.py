@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opensees.utils.metadata_registry import MetadataRegistry
+
+class MpcXObjectMetaData:
+	pass
+
+_B = '''
+from PyMpc import *
+LABEL = '{}'
+def makeXObjectMetaData():
+	xom = MpcXObjectMetaData()
+	xom.name = LABEL
+	return xom
+'''
+
+_A = '''
+from PyMpc import *
+from fakesolver.mats.B import LABEL
+def makeXObjectMetaData():
+	xom = MpcXObjectMetaData()
+	xom.name = 'A-' + LABEL
+	return xom
+'''
+
+_C = '''
+from PyMpc import *
+from ..utils.helper import *
+def makeXObjectMetaData():
+	xom = MpcXObjectMetaData()
+	xom.name = 'C-' + LABEL
+	return xom
+'''
+
+_HELPER = '''
+from fakesolver.mats import B
+LABEL = B.LABEL
+'''
+
+def write(file_name, text):
+	with open(file_name, 'w') as f:
+		f.write(text)
+
+class TestMetadataRegistry(unittest.TestCase):
+	'''
+	a cached module should be traced again when a metadata module it imports changes,
+	directly or through a helper module
+	'''
+	def setUp(self):
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.basedir = os.path.join(self.temp_dir.name, 'fakesolver')
+		os.makedirs(os.path.join(self.basedir, 'mats'))
+		os.makedirs(os.path.join(self.basedir, 'utils'))
+		for i in ('', 'mats', 'utils'):
+			write(os.path.join(self.basedir, i, '__init__.py'), '')
+		write(os.path.join(self.basedir, 'mats', 'A.py'), _A)
+		write(os.path.join(self.basedir, 'mats', 'B.py'), _B.format('one'))
+		write(os.path.join(self.basedir, 'mats', 'C.py'), _C)
+		write(os.path.join(self.basedir, 'utils', 'helper.py'), _HELPER)
+		sys.path.insert(0, self.temp_dir.name)
+		self.pympc = sys.modules.get('PyMpc', None)
+		pympc = types.ModuleType('PyMpc')
+		pympc.MpcXObjectMetaData = MpcXObjectMetaData
+		sys.modules['PyMpc'] = pympc
+
+	def tearDown(self):
+		self.unload()
+		sys.path.remove(self.temp_dir.name)
+		if self.pympc is None:
+			del sys.modules['PyMpc']
+		else:
+			sys.modules['PyMpc'] = self.pympc
+		self.temp_dir.cleanup()
+
+	def unload(self):
+		for name in list(sys.modules.keys()):
+			if name == 'fakesolver' or name.startswith('fakesolver.'):
+				del sys.modules[name]
+
+	def load(self):
+		self.unload()
+		registry = MetadataRegistry(self.basedir, 'fakesolver')
+		names = []
+		registry.load(['mats'], lambda xom: names.append(xom.name))
+		registry.save()
+		return sorted(names), registry.num_cached
+
+	def test_dependency_changed(self):
+		self.assertEqual(self.load(), (['A-one', 'C-one', 'one'], 0))
+		self.assertEqual(self.load(), (['A-one', 'C-one', 'one'], 3))
+		self.assertNotIn('fakesolver.mats.A', sys.modules)
+		write(os.path.join(self.basedir, 'mats', 'B.py'), _B.format('three'))
+		self.assertEqual(self.load(), (['A-three', 'C-three', 'three'], 0))
+		self.assertEqual(self.load(), (['A-three', 'C-three', 'three'], 3))
+
+if __name__ == '__main__':
+	unittest.main()